@@ -0,0 +1,278 @@
+"""Measure the request/response pipeline of the API client, and track it across commits.
+
+Run with `python -m benchmarks.api_pipeline` from the repository root, add `--record` to
+append the results to `benchmarks/results/api_pipeline.jsonl` under the current commit.
+Every run is compared against the last recorded one, and with `--check` it exits with
+status 1 if any benchmark got slower by more than the threshold.
+
+The validated payloads are fixtures in `benchmarks/fixtures/api_pipeline`, recorded from
+the mock server (`deltav.spacetraders.mock`) for a seeded universe, so every run and
+every commit validates the same bytes. `--record-fixtures` records them again, e.g. after
+the shapes change. The `call` benchmarks go through the client to the mock server itself.
+Logging of the client is disabled, it would only measure the log sinks.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import UTC, datetime
+from http import HTTPStatus
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from loguru import logger
+
+from deltav.spacetraders.api import MAX_PAGE_LIMIT
+from deltav.spacetraders.api.client import (
+    SpaceTradersAPIClient,
+    handle_response,
+    httpx_request,
+)
+from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.mock.server import MockSpaceTradersServer
+from deltav.spacetraders.mock.universe import GOODS, MockUniverse
+from deltav.spacetraders.models import concat_models, merge_models
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from deltav.spacetraders.models import SpaceTradersAPIResShape
+
+RESULTS_FILE = Path(__file__).parent / 'results' / 'api_pipeline.jsonl'
+FIXTURES_DIR = Path(__file__).parent / 'fixtures' / 'api_pipeline'
+# Seconds each benchmark is timed for, the fastest of `REPEATS` runs is kept
+MIN_TIME = 0.2
+REPEATS = 5
+# Slowdown against the last recorded run that counts as a regression
+THRESHOLD = 0.3
+
+SHIPS = 200
+SYSTEMS = 40
+WAYPOINTS_PER_SYSTEM = 40
+PAGES = 100
+
+logger.disable('deltav')
+
+
+def request(endpoint: SpaceTradersAPIEndpoint, *path_params: str) -> SpaceTradersAPIRequest[Any]:
+    """A request for the first page of `endpoint`, if it is paginated."""
+    builder = SpaceTradersAPIRequest[Any]().builder().endpoint(endpoint)
+    if path_params:
+        builder = builder.path_params(*path_params)
+    if endpoint.token_type is not None:
+        builder = builder.token(server.token())
+    if endpoint.paginated:
+        builder = builder.pages().page_limit(MAX_PAGE_LIMIT)
+    return builder.build()
+
+
+def fixture_requests() -> dict[str, SpaceTradersAPIRequest[Any]]:
+    """The requests whose responses are recorded as fixtures, by fixture name."""
+    ship = next(iter(server.universe.ships.values()))
+    system_symbol, market_symbol = ship['nav']['systemSymbol'], ship['nav']['waypointSymbol']
+    return {
+        'ships_page': request(SpaceTradersAPIEndpoint.GET_SHIPS),
+        'systems_page': request(SpaceTradersAPIEndpoint.GET_ALL_SYSTEMS),
+        'market': request(SpaceTradersAPIEndpoint.GET_MARKET, system_symbol, market_symbol),
+    }
+
+
+def record_fixtures() -> None:
+    """Record the response of the mock server to every fixture request (its first page)."""
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    for name, req in fixture_requests().items():
+        res = server.handle(httpx_request(req, page=1 if req.is_paged else None))
+        # Kept as served, re-indenting would change the bytes that are validated
+        _ = (FIXTURES_DIR / f'{name}.json').write_bytes(res.read())
+        print(f'recorded {name}.json')  # noqa: T201
+
+
+def fixture(name: str) -> httpx.Response:
+    """The recorded response named `name`, see `record_fixtures`."""
+    content = (FIXTURES_DIR / f'{name}.json').read_bytes()
+    return httpx.Response(HTTPStatus.OK, content=content)
+
+
+def setup() -> MockSpaceTradersServer:
+    universe = MockUniverse.generate(
+        systems=SYSTEMS, waypoints_per_system=WAYPOINTS_PER_SYSTEM, ships=SHIPS
+    )
+    # Fill the cargo holds, and open the markets of the ships with their transactions
+    for ship in universe.ships.values():
+        ship['cargo']['inventory'] = [
+            {'symbol': good.value, 'name': good.name, 'description': '', 'units': 2}
+            for good in GOODS[:10]
+        ]
+        ship['cargo']['units'] = 20
+    market = universe.markets[next(iter(universe.ships.values()))['nav']['waypointSymbol']]
+    market['transactions'] = [
+        {
+            'waypointSymbol': market['symbol'],
+            'shipSymbol': 'MOCK-1',
+            'tradeSymbol': good['symbol'],
+            'type': 'PURCHASE',
+            'units': 1,
+            'pricePerUnit': good['purchasePrice'],
+            'totalPrice': good['purchasePrice'],
+            'timestamp': datetime.now(tz=UTC).isoformat(),
+        }
+        for good in market['tradeGoods'] * 5
+    ][:20]
+    return MockSpaceTradersServer(
+        universe, limit_per_second=1_000_000, limit_burst=1_000_000, burst_duration=3_600
+    )
+
+
+server = setup()
+
+
+def benchmarks() -> dict[str, Callable[[], object]]:
+    ship = next(iter(server.universe.ships.values()))
+    system_symbol = ship['nav']['systemSymbol']
+    market_symbol = ship['nav']['waypointSymbol']
+    token = server.token()
+
+    requests = fixture_requests()
+    ships_req, systems_req, market_req = (
+        requests['ships_page'],
+        requests['systems_page'],
+        requests['market'],
+    )
+    ships_page, systems_page = fixture('ships_page'), fixture('systems_page')
+    market_res = fixture('market')
+
+    ships_model = handle_response(ships_page, ships_req).unwrap()
+    market_model = handle_response(market_res, market_req).unwrap()
+    pages: list[SpaceTradersAPIResShape] = [ships_model] * PAGES
+
+    def build() -> SpaceTradersAPIRequest[Any]:
+        return (
+            SpaceTradersAPIRequest[Any]()
+            .builder()
+            .endpoint(SpaceTradersAPIEndpoint.GET_MARKET)
+            .path_params(system_symbol, market_symbol)
+            .token(token)
+            .build()
+        )
+
+    def call(req: SpaceTradersAPIRequest[Any]) -> Callable[[], object]:
+        return lambda: SpaceTradersAPIClient.call(req).unwrap()
+
+    uncached_req = (
+        SpaceTradersAPIRequest[Any]()
+        .builder()
+        .endpoint(SpaceTradersAPIEndpoint.GET_SHIP)
+        .path_params(ship['symbol'])
+        .token(token)
+        .bypass_cache()
+        .build()
+    )
+    all_ships_req = (
+        SpaceTradersAPIRequest[Any]()
+        .builder()
+        .endpoint(SpaceTradersAPIEndpoint.GET_SHIPS)
+        .token(token)
+        .all_pages()
+        .page_limit(MAX_PAGE_LIMIT)
+        .build()
+    )
+    return {
+        'build': build,
+        'parameterized_path': market_req.parameterized_path,
+        f'validate ships page ({MAX_PAGE_LIMIT})': lambda: handle_response(ships_page, ships_req),
+        f'validate systems page ({MAX_PAGE_LIMIT})': lambda: handle_response(
+            systems_page, systems_req
+        ),
+        'validate market': lambda: handle_response(market_res, market_req),
+        f'concat_models ({PAGES} pages)': lambda: concat_models(pages),
+        'merge_models (market)': lambda: merge_models(market_model, market_model),
+        'call (uncached)': call(uncached_req),
+        'call (cached)': call(request(SpaceTradersAPIEndpoint.GET_SYSTEM, system_symbol)),
+        f'call all pages ({SHIPS} ships)': call(all_ships_req),
+    }
+
+
+def measure(fn: Callable[[], object]) -> float:
+    """Seconds per call of `fn`, the fastest of several runs."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * MIN_TIME / max(elapsed, 1e-9)))
+    return min(timer.repeat(REPEATS, number)) / number
+
+
+def commit() -> str:
+    try:
+        rev = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, check=True, text=True
+        ).stdout.strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD'], check=False).returncode != 0
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{rev}-dirty' if dirty else rev
+
+
+def last_recorded() -> dict[str, Any] | None:
+    if not RESULTS_FILE.exists():
+        return None
+    lines = RESULTS_FILE.read_text().splitlines()
+    return json.loads(lines[-1]) if lines else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    _ = parser.add_argument('--record', action='store_true', help='append the results')
+    _ = parser.add_argument('--check', action='store_true', help='exit 1 on a regression')
+    _ = parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    _ = parser.add_argument(
+        '--record-fixtures', action='store_true', help='record the payloads again and exit'
+    )
+    args = parser.parse_args()
+
+    if args.record_fixtures:
+        record_fixtures()
+        return
+
+    previous = last_recorded()
+    baseline: dict[str, float] = previous['results'] if previous is not None else {}
+    if previous is not None:
+        print(f'compared to {previous["commit"]} ({previous["date"]})')  # noqa: T201
+
+    with server.install():
+        results: dict[str, float] = {}
+        regressions: list[str] = []
+        for name, fn in benchmarks().items():
+            results[name] = seconds = measure(fn)
+            line = f'{name:<32}{seconds * 1e6:>12,.1f} µs{1 / seconds:>12,.0f} /s'
+            if (before := baseline.get(name)) is not None:
+                change = seconds / before - 1
+                line += f'{change:>+10.1%}'
+                if change > args.threshold:
+                    regressions.append(name)
+                    line += '  REGRESSION'
+            print(line)  # noqa: T201
+
+    if args.record:
+        RESULTS_FILE.parent.mkdir(exist_ok=True)
+        entry = {
+            'commit': commit(),
+            'date': datetime.now(tz=UTC).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'results': results,
+        }
+        with RESULTS_FILE.open('a') as f:
+            _ = f.write(json.dumps(entry) + '\n')
+
+    if args.check and regressions:
+        print(f'{len(regressions)} regressions over {args.threshold:.0%}')  # noqa: T201
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
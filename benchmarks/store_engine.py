@@ -0,0 +1,136 @@
+"""Compare the tuned store engine profile against the previous default SQLite setup.
+
+Run with `python -m benchmarks.store_engine` from the repository root. Each profile
+gets a fresh database in a temporary directory. The previous setup also had
+`echo=True`, which is left out here since it would only measure logging.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+
+from deltav.store.db import DB_FILE_NAME, create_store_engine
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy import Engine
+
+SINGLE_INSERTS = 2_000
+BULK_INSERTS = 100_000
+POINT_QUERIES = 20_000
+CONCURRENT_SECONDS = 2.0
+READERS = 4
+
+metadata = MetaData()
+waypoints = Table(
+    'waypoints',
+    metadata,
+    Column('id', Integer, primary_key=True),
+    Column('symbol', String, unique=True),
+    Column('system_symbol', String),
+    Column('x', Integer),
+    Column('y', Integer),
+)
+
+
+def row(i: int) -> dict[str, str | int]:
+    return {'symbol': f'X1-{i}', 'system_symbol': f'X1-{i // 50}', 'x': i % 800, 'y': i // 800}
+
+
+def single_inserts(engine: Engine) -> float:
+    """Rows per second, one transaction per row as in the per-record sessions."""
+    start = perf_counter()
+    for i in range(SINGLE_INSERTS):
+        with engine.begin() as conn:
+            _ = conn.execute(insert(waypoints), row(BULK_INSERTS + i))
+    return SINGLE_INSERTS / (perf_counter() - start)
+
+
+def bulk_inserts(engine: Engine) -> float:
+    """Rows per second, one executemany in a single transaction."""
+    start = perf_counter()
+    with engine.begin() as conn:
+        _ = conn.execute(insert(waypoints), [row(i) for i in range(BULK_INSERTS)])
+    return BULK_INSERTS / (perf_counter() - start)
+
+
+def point_queries(engine: Engine) -> float:
+    """Queries per second, looking up waypoints by symbol."""
+    query = select(waypoints).where(waypoints.c.symbol == '')
+    start = perf_counter()
+    with engine.connect() as conn:
+        for i in range(POINT_QUERIES):
+            _ = conn.execute(query.params(symbol_1=f'X1-{i}')).first()
+    return POINT_QUERIES / (perf_counter() - start)
+
+
+def concurrent_reads(engine: Engine) -> float:
+    """Queries per second across all readers, while one writer commits continuously."""
+    stop = threading.Event()
+    counts = [0] * READERS
+
+    def write() -> None:
+        i = BULK_INSERTS + SINGLE_INSERTS
+        while not stop.is_set():
+            with engine.begin() as conn:
+                _ = conn.execute(insert(waypoints), row(i))
+            i += 1
+
+    def read(reader: int) -> None:
+        query = select(waypoints.c.x).where(waypoints.c.system_symbol == 'X1-7')
+        with engine.connect() as conn:
+            while not stop.is_set():
+                _ = conn.execute(query).all()
+                conn.rollback()  # End the read transaction so it sees new commits
+                counts[reader] += 1
+
+    threads = [threading.Thread(target=write)]
+    threads += [threading.Thread(target=read, args=(r,)) for r in range(READERS)]
+    for thread in threads:
+        thread.start()
+    stop.wait(CONCURRENT_SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / CONCURRENT_SECONDS
+
+
+BENCHMARKS: list[Callable[[Engine], float]] = [
+    bulk_inserts,
+    single_inserts,
+    point_queries,
+    concurrent_reads,
+]
+
+
+def run(name: str, make_engine: Callable[[Path], Engine]) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(Path(directory))
+        metadata.create_all(engine)
+        results = {benchmark.__name__: benchmark(engine) for benchmark in BENCHMARKS}
+        engine.dispose()
+
+    print(name)  # noqa: T201
+    for benchmark, ops in results.items():
+        print(f'\t{benchmark:<20}{ops:>12,.0f} /s')  # noqa: T201
+    return results
+
+
+def main() -> None:
+    legacy = run('legacy', lambda d: create_engine(f'sqlite:///{d / DB_FILE_NAME}'))
+    tuned = run('tuned', create_store_engine)
+
+    print('speedup')  # noqa: T201
+    for benchmark in legacy:
+        print(f'\t{benchmark:<20}{tuned[benchmark] / legacy[benchmark]:>12.2f}x')  # noqa: T201
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Measure bulk ingest of universe data into a fresh store.
+
+Run with `python -m benchmarks.universe_ingest` from the repository root. Shapes are
+built with `model_construct` so that only the store is measured, not validation.
+"""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+from random import Random
+from time import perf_counter
+
+from deltav.spacetraders.enums.faction import FactionSymbol
+from deltav.spacetraders.enums.system import SystemType
+from deltav.spacetraders.enums.waypoint import (
+    WaypointModifierSymbol,
+    WaypointTraitSymbol,
+    WaypointType,
+)
+from deltav.spacetraders.models.faction import FactionSymbolShape
+from deltav.spacetraders.models.systems import SystemShape, SystemWaypointShape
+from deltav.spacetraders.models.waypoint import (
+    WaypointModifierShape,
+    WaypointOrbitalShape,
+    WaypointShape,
+    WaypointTraitShape,
+)
+from deltav.store.db import Base, create_store_engine, universe
+from deltav.store.db.migrations import migrate
+
+SYSTEMS = 5_000
+WAYPOINTS_PER_SYSTEM = 20
+TRAITS_PER_WAYPOINT = 4
+
+random = Random(0)
+traits = [
+    WaypointTraitShape.model_construct(symbol=symbol, name=symbol.name, description='')
+    for symbol in WaypointTraitSymbol
+]
+modifiers = [
+    WaypointModifierShape.model_construct(symbol=symbol, name=symbol.name, description='')
+    for symbol in WaypointModifierSymbol
+]
+
+
+def system(i: int) -> SystemShape:
+    return SystemShape.model_construct(
+        constellation='',
+        symbol=f'X1-{i}',
+        sector_symbol='X1',
+        type=SystemType.RED_STAR,
+        x=i % 800,
+        y=i // 800,
+        waypoints=[
+            SystemWaypointShape.model_construct(
+                symbol=f'X1-{i}-{w}',
+                type=WaypointType.PLANET,
+                system_symbol=f'X1-{i}',
+                x=w,
+                y=w,
+                orbitals=[WaypointOrbitalShape.model_construct(symbol=f'X1-{i}-{w}M')],
+                orbits=None,
+            )
+            for w in range(WAYPOINTS_PER_SYSTEM)
+        ],
+        factions=[],
+        name='',
+    )
+
+
+def waypoint(listed: SystemWaypointShape) -> WaypointShape:
+    return WaypointShape.model_construct(
+        **listed.__dict__,
+        faction=FactionSymbolShape.model_construct(symbol=FactionSymbol.COSMIC),
+        traits=random.sample(traits, TRAITS_PER_WAYPOINT),
+        modifiers=random.sample(modifiers, 1),
+        chart=None,
+        is_under_construction=False,
+    )
+
+
+def main() -> None:
+    systems = [system(i) for i in range(SYSTEMS)]
+    waypoints = [waypoint(listed) for s in systems for listed in s.waypoints]
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_store_engine(Path(directory))
+        Base.metadata.create_all(engine)
+        _ = migrate(engine)
+
+        runs = [
+            ('systems', {'system_shapes': systems}),
+            ('waypoints', {'waypoint_shapes': waypoints}),
+            ('systems again', {'system_shapes': systems}),
+        ]
+        for name, shapes in runs:
+            start = perf_counter()
+            universe.ingest(engine, **shapes)
+            elapsed = perf_counter() - start
+            rate = len(waypoints) / elapsed
+            print(f'{name:<16}{elapsed:>8.2f} s{rate:>12,.0f} waypoints/s')  # noqa: T201
+
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
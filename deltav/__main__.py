@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import signal
 import sys
 from types import FrameType
@@ -8,33 +9,50 @@ from loguru import logger
 from sqlalchemy import Engine, create_engine, select
 
 from deltav import cli
-from deltav.spacetraders.api.client import SpaceTradersAPIClient
-from deltav.store.db import Base, Session, engine
+from deltav.config.config import Config
+from deltav.spacetraders.api.client import AsyncSpaceTradersAPIClient, SpaceTradersAPIClient
+from deltav.spacetraders.game import GAME
+from deltav.store import db
+from deltav.store.db import Base, Session
+from deltav.store.db.migrations import migrate
 from deltav.store.db.ship import ShipRecord
 
 
 def signal_handler(sig: int, frame: FrameType | None) -> None:
     match sig:
         case signal.SIGINT:
-            SpaceTradersAPIClient.http_client.close()
+            SpaceTradersAPIClient.close()
             sys.exit(0)
         case _:
             pass
 
 
+def configure(config: Config) -> None:
+    """Apply the [deltav] settings to everything that was built with defaults at import."""
+    logger.trace('Configuring store')
+    db.configure(config.deltav)
+
+    logger.trace('Configuring SpaceTradersAPIClient')
+    accounts = list(config.spacetraders.accounts.values())
+    SpaceTradersAPIClient.configure(config.deltav, accounts)
+    asyncio.run(AsyncSpaceTradersAPIClient.configure(config.deltav, accounts))
+
+
 def main():
     logger.trace('Registering signal handlers')
     _ = signal.signal(signal.SIGINT, signal_handler)
 
-    Base.metadata.create_all(engine)
+    config = Config()
+    configure(config)
 
-    sys.exit()
+    Base.metadata.create_all(db.engine)
+    _ = migrate(db.engine)
+    GAME.load_galaxy(db.engine)
 
-    logger.trace('Initializing SpaceTradersAPIClient')
-    _ = SpaceTradersAPIClient()
+    sys.exit()
 
     logger.trace('Running CLI')
-    cli.run()
+    cli.run(config)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,239 @@
+"""What ships of a fleet do, one cycle at a time.
+
+A behavior is stepped by the fleet engine for as long as it returns True. A step
+awaits the actions of its ship, which sleep until arrivals and cooldowns, so a step
+never holds the event loop while the ship cannot act. Ships travel along the routes of
+the pathfinder of their controller, refuelling and jumping on the way.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from deltav.automation.timers import WakeReason
+from deltav.planning.trade import TradeShip
+from deltav.spacetraders.enums.market import TradeSymbol
+from deltav.spacetraders.market import MarketSide, market_index
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    from deltav.automation.ship import ShipController
+    from deltav.planning.trade import TradePlanner
+    from deltav.spacetraders.models.contract import ContractShape
+    from deltav.spacetraders.models.market import MarketShape
+
+# Seconds to wait before looking again when there is nothing to do
+IDLE_SECONDS: float = 60
+
+
+class Behavior(ABC):
+    """A task for one ship, performed one cycle at a time."""
+
+    @abstractmethod
+    async def step(self, ship: ShipController) -> bool:
+        """Perform one cycle of the behavior.
+
+        Returns:
+            Whether the behavior should be stepped again.
+        """
+
+    def __str__(self) -> str:
+        return type(self).__name__
+
+
+class MiningBehavior(Behavior):
+    """Extract at an asteroid until the cargo hold is full, then sell it all at a market.
+
+    Goods the market does not buy are jettisoned, unless they are kept.
+    """
+
+    def __init__(
+        self, asteroid_symbol: str, market_symbol: str, keep: Iterable[TradeSymbol] = ()
+    ) -> None:
+        self.asteroid_symbol: str = asteroid_symbol
+        self.market_symbol: str = market_symbol
+        self.keep: frozenset[TradeSymbol] = frozenset(keep)
+
+    async def step(self, ship: ShipController) -> bool:
+        if ship.cargo_units_remaining > 0:
+            await ship.travel(self.asteroid_symbol)
+            _ = await ship.extract()
+            return True
+
+        await ship.travel(self.market_symbol)
+        await ship.dock()
+        market = await ship.fetch_market()
+        await _sell_all(ship, market, self.keep)
+        for item in list(ship.ship.cargo.inventory):
+            if item.symbol not in self.keep:
+                await ship.jettison(item.symbol, item.units)
+        if _sells_fuel(market):
+            await ship.refuel()
+        return True
+
+
+class TradingBehavior(Behavior):
+    """Fly the most profitable route the trade planner knows for the ship, over and over.
+
+    The planner is updated with the known prices of the system of the ship before every
+    route, see `MarketIndex.listings()`.
+    """
+
+    def __init__(self, planner: TradePlanner, credit_limit: int | None = None) -> None:
+        self.planner: TradePlanner = planner
+        self.credit_limit: int | None = credit_limit
+
+    async def step(self, ship: ShipController) -> bool:
+        self.planner.update(market_index.listings(ship.system_symbol))
+        routes = self.planner.routes(
+            TradeShip(
+                symbol=ship.symbol,
+                waypoint_symbol=ship.waypoint_symbol,
+                speed=ship.ship.engine.speed,
+                fuel=ship.ship.fuel.current,
+                fuel_capacity=ship.ship.fuel.capacity,
+                cargo_space=ship.cargo_units_remaining,
+                credit_limit=self.credit_limit,
+            ),
+            k=1,
+        )
+        if not routes:
+            logger.info(f'{ship.symbol}: No profitable trade route, waiting')
+            await ship.idle(IDLE_SECONDS)
+            return True
+
+        route = routes[0]
+        trade_symbol = TradeSymbol(route.trade_symbol)
+        logger.info(
+            f'{ship.symbol}: Trading {route.units} {route.trade_symbol} from '
+            f'{route.buy_waypoint_symbol} to {route.sell_waypoint_symbol}'
+        )
+
+        await ship.travel(route.buy_waypoint_symbol)
+        await ship.dock()
+        market = await ship.fetch_market()
+        if _sells_fuel(market):
+            await ship.refuel()
+        await _buy(ship, trade_symbol, route.units)
+
+        await ship.travel(route.sell_waypoint_symbol)
+        await ship.dock()
+        market = await ship.fetch_market()
+        await _sell_all(ship, market)
+        if _sells_fuel(market):
+            await ship.refuel()
+        return True
+
+
+class ScoutingBehavior(Behavior):
+    """Visit markets in turn to keep their prices fresh.
+
+    With `once`, the behavior finishes after visiting every market once.
+    """
+
+    def __init__(self, market_symbols: Sequence[str], *, once: bool = False) -> None:
+        self.market_symbols: Sequence[str] = market_symbols
+        self.once: bool = once
+        self.__next: int = 0
+
+    async def step(self, ship: ShipController) -> bool:
+        if not self.market_symbols:
+            return False
+
+        await ship.travel(self.market_symbols[self.__next])
+        _ = await ship.fetch_market()
+        self.__next = (self.__next + 1) % len(self.market_symbols)
+        return not (self.once and self.__next == 0)
+
+
+class ContractHaulingBehavior(Behavior):
+    """Buy the goods of a procurement contract at the cheapest known market in the system
+    and deliver them, then fulfill the contract.
+
+    The behavior gives up once the deadline of the contract has passed. While it waits
+    for cargo space or a market, it is woken at the deadline if that comes first.
+    """
+
+    def __init__(self, contract: ContractShape) -> None:
+        self.contract: ContractShape = contract
+
+    async def step(self, ship: ShipController) -> bool:
+        term = next(
+            (
+                term
+                for term in self.contract.terms.deliver
+                if term.units_fulfilled < term.units_required
+            ),
+            None,
+        )
+        if term is not None and self.contract.terms.deadline <= datetime.now(tz=UTC):
+            logger.warning(f'{ship.symbol}: Contract {self.contract.id} is past its deadline')
+            return False
+
+        if term is None:
+            self.contract = await ship.fulfill(self.contract.id)
+            logger.info(f'{ship.symbol}: Fulfilled contract {self.contract.id}')
+            return False
+
+        remaining = term.units_required - term.units_fulfilled
+        carried = ship.cargo_units(term.trade_symbol)
+        wanted = min(remaining, carried + ship.cargo_units_remaining)
+        if wanted == 0:
+            logger.warning(f'{ship.symbol}: No cargo space for {term.trade_symbol.value}')
+            await self.__idle(ship)
+            return True
+
+        if carried < wanted:
+            best = market_index.best(MarketSide.BUY, term.trade_symbol, ship.system_symbol)
+            if best is None:
+                logger.info(f'{ship.symbol}: No known market sells {term.trade_symbol.value}')
+                await self.__idle(ship)
+                return True
+
+            await ship.travel(best.waypoint_symbol)
+            await _buy(ship, term.trade_symbol, wanted - carried)
+            carried = ship.cargo_units(term.trade_symbol)
+
+        await ship.travel(term.destination_symbol)
+        units = min(carried, remaining)
+        self.contract = await ship.deliver(self.contract.id, term.trade_symbol, units)
+        return True
+
+    async def __idle(self, ship: ShipController) -> None:
+        deadline = self.contract.terms.deadline
+        if deadline - datetime.now(tz=UTC) < timedelta(seconds=IDLE_SECONDS):
+            _ = await ship.wait_until(deadline, WakeReason.DEADLINE)
+        else:
+            await ship.idle(IDLE_SECONDS)
+
+
+async def _buy(ship: ShipController, trade_symbol: TradeSymbol, units: int) -> None:
+    """Buy `units` at the current market, in transactions of at most its trade volume."""
+    listing = market_index.listing(ship.waypoint_symbol, trade_symbol)
+    volume = listing.trade_volume if listing is not None else units
+    while units > 0:
+        res = await ship.purchase(trade_symbol, min(units, volume))
+        units -= res.units
+
+
+async def _sell_all(
+    ship: ShipController, market: MarketShape, keep: frozenset[TradeSymbol] = frozenset()
+) -> None:
+    """Sell all cargo the market buys, in transactions of at most its trade volume."""
+    volumes = {good.symbol: good.trade_volume for good in market.trade_goods}
+    for item in list(ship.ship.cargo.inventory):
+        if item.symbol in keep or (volume := volumes.get(item.symbol.value)) is None:
+            continue
+        units = item.units
+        while units > 0:
+            res = await ship.sell(item.symbol, min(units, volume))
+            units -= res.units
+
+
+def _sells_fuel(market: MarketShape) -> bool:
+    return any(good.symbol == TradeSymbol.FUEL.value for good in market.trade_goods)
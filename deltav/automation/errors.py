@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from deltav.spacetraders.api.error import SpaceTradersAPIError
+
+
+class ShipActionError(Exception):
+    def __init__(self, message: str, error: SpaceTradersAPIError | None = None) -> None:
+        self.message: str = message
+        self.error: SpaceTradersAPIError | None = error
+        super().__init__(self.message)
@@ -0,0 +1,166 @@
+"""An asyncio engine driving every ship of a fleet concurrently.
+
+Every assigned ship runs its behavior in a task of its own. Ships spend nearly all
+their time waiting on arrivals and cooldowns, which they sleep through, so one event
+loop drives a fleet of any size while the shared client keeps it within the ratelimit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from deltav.automation.errors import ShipActionError
+from deltav.automation.ship import ShipController
+from deltav.automation.timers import WakeReason, WakeScheduler
+from deltav.spacetraders.api.client import AsyncSpaceTradersAPIClient
+from deltav.spacetraders.api.error import SpaceTradersAPIError
+from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.enums.request import RequestPriority
+from deltav.spacetraders.models.ship import ShipsShape
+
+if TYPE_CHECKING:
+    from deltav.automation.behaviors import Behavior
+    from deltav.planning.pathfinding import Pathfinder
+    from deltav.spacetraders.models.ship import ShipShape
+    from deltav.spacetraders.token import AgentToken
+
+# Seconds to back off after the first failed step of a ship, doubled for every
+# further failure in a row
+BACKOFF_SECONDS: float = 1
+MAX_BACKOFF_SECONDS: float = 60
+
+
+async def fetch_ships(token: AgentToken) -> list[ShipShape]:
+    """Fetch every ship of the agent."""
+    res = (
+        await AsyncSpaceTradersAPIClient.call(
+            SpaceTradersAPIRequest[ShipsShape]()
+            .builder()
+            .endpoint(SpaceTradersAPIEndpoint.GET_SHIPS)
+            .token(token)
+            .priority(RequestPriority.FLEET_ACTION)
+            .all_pages()
+            .build()
+        )
+    ).unwrap()
+    if isinstance(res, SpaceTradersAPIError):
+        msg = f'Fetching ships failed with {res.code}: {res.message}'
+        raise ShipActionError(msg, res)
+    return res.ships
+
+
+class Fleet:
+    """Ships of an agent, each running a behavior until it finishes or the fleet stops.
+
+    A step of a behavior that raises is logged and retried after an exponential backoff,
+    with the state of the ship refreshed, so one failing ship never stops the others.
+
+    Attributes:
+        scheduler: The wake-ups of every ship, and how late they were.
+        pathfinder: Plans the travel of every ship, see `ShipController.travel()`.
+    """
+
+    def __init__(self, token: AgentToken, pathfinder: Pathfinder | None = None) -> None:
+        self.scheduler: WakeScheduler = WakeScheduler()
+        self.pathfinder: Pathfinder | None = pathfinder
+        self.__token: AgentToken = token
+        self.__ships: dict[str, tuple[ShipController, Behavior]] = {}
+        self.__tasks: dict[str, asyncio.Task[None]] = {}
+        self.__running: bool = False
+        self.__changed: asyncio.Event | None = None
+
+    def __len__(self) -> int:
+        return len(self.__ships)
+
+    def __contains__(self, ship_symbol: str) -> bool:
+        return ship_symbol in self.__ships
+
+    def controller(self, ship_symbol: str) -> ShipController | None:
+        entry = self.__ships.get(ship_symbol)
+        return entry[0] if entry is not None else None
+
+    def assign(self, ship: ShipShape, behavior: Behavior) -> ShipController:
+        """Run `behavior` with `ship`, replacing the behavior it runs, if any.
+
+        Ships can be assigned while the fleet runs.
+        """
+        self.unassign(ship.symbol)
+        controller = ShipController(ship, self.__token, self.scheduler, self.pathfinder)
+        self.__ships[ship.symbol] = (controller, behavior)
+        if self.__running:
+            self.__start(ship.symbol)
+        return controller
+
+    def unassign(self, ship_symbol: str) -> None:
+        """Stop the behavior of a ship, and forget the ship."""
+        _ = self.__ships.pop(ship_symbol, None)
+        if (task := self.__tasks.pop(ship_symbol, None)) is not None:
+            _ = task.cancel()
+        self.__notify()
+
+    async def run(self) -> None:
+        """Run the behaviors of every ship until they all finish or `stop()` is called."""
+        self.__running = True
+        self.__changed = asyncio.Event()
+        try:
+            for ship_symbol in self.__ships:
+                self.__start(ship_symbol)
+            while self.__running and self.__tasks:
+                _ = await self.__changed.wait()
+                self.__changed.clear()
+        finally:
+            self.__running = False
+            tasks = list(self.__tasks.values())
+            self.__tasks.clear()
+            for task in tasks:
+                _ = task.cancel()
+            _ = await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Make `run()` cancel every behavior and return."""
+        self.__running = False
+        self.__notify()
+
+    def __start(self, ship_symbol: str) -> None:
+        controller, behavior = self.__ships[ship_symbol]
+        task = asyncio.create_task(self.__drive(controller, behavior), name=ship_symbol)
+        task.add_done_callback(lambda task: self.__finished(ship_symbol, task))
+        self.__tasks[ship_symbol] = task
+
+    def __finished(self, ship_symbol: str, task: asyncio.Task[None]) -> None:
+        if self.__tasks.get(ship_symbol) is task:
+            del self.__tasks[ship_symbol]
+        self.__notify()
+
+    def __notify(self) -> None:
+        if self.__changed is not None:
+            self.__changed.set()
+
+    @staticmethod
+    async def __drive(controller: ShipController, behavior: Behavior) -> None:
+        logger.info(f'{controller.symbol}: Running {behavior}')
+        failures = 0
+        while True:
+            try:
+                if not await behavior.step(controller):
+                    break
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                backoff = min(BACKOFF_SECONDS * 2 ** (failures - 1), MAX_BACKOFF_SECONDS)
+                logger.exception(
+                    f'{controller.symbol}: {behavior} failed ({failures} in a row), '
+                    f'retrying in {backoff}s. {e}'
+                )
+                await controller.idle(backoff, WakeReason.BACKOFF)
+                try:
+                    await controller.refresh()
+                except ShipActionError as refresh_error:
+                    logger.error(refresh_error.message)
+        logger.info(f'{controller.symbol}: Finished {behavior}')
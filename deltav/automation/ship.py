@@ -0,0 +1,369 @@
+"""Asynchronous ship actions for the fleet engine.
+
+A `ShipController` keeps the last known state of one ship and performs its actions
+through `AsyncSpaceTradersAPIClient`, so every ship of a fleet shares the same
+ratelimit budget and connection pool. State returned by an action (nav, fuel, cargo,
+cooldown) is applied to the ship, so behaviors never refetch it. Waits for arrivals and
+cooldowns go through a `WakeScheduler`, and travel follows the routes of a `Pathfinder`.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from functools import partial
+from typing import TYPE_CHECKING, TypeVar
+
+from deltav.automation.errors import ShipActionError
+from deltav.automation.timers import WakeReason, WakeScheduler
+from deltav.planning import pathfinding
+from deltav.planning.pathfinding import RouteLegType
+from deltav.spacetraders.api.client import AsyncSpaceTradersAPIClient
+from deltav.spacetraders.api.error import SpaceTradersAPIError
+from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.enums.request import RequestPriority
+from deltav.spacetraders.enums.ship import ShipNavFlightMode, ShipNavStatus
+from deltav.spacetraders.market import market_index
+from deltav.spacetraders.models.contract import (
+    ContractDeliverReqShape,
+    ContractDeliverResShape,
+    ContractShape,
+)
+from deltav.spacetraders.models.market import MarketShape, MarketTransactionShape
+from deltav.spacetraders.models.ship import (
+    CargoItemReqShape,
+    ShipCargoInventoryShape,
+    ShipCargoShape,
+    ShipExtractionShape,
+    ShipFlightModeShape,
+    ShipNavigationShape,
+    ShipNavShape,
+    ShipNavUpdateShape,
+    ShipRefuelReqShape,
+    ShipRefuelResShape,
+    ShipShape,
+)
+from deltav.spacetraders.models.waypoint import WaypointSymbolReqShape
+from deltav.store.db import writer
+from deltav.store.db.market import record_markets, record_transactions
+
+if TYPE_CHECKING:
+    from deltav.planning.pathfinding import Pathfinder
+    from deltav.spacetraders.enums.market import TradeSymbol
+    from deltav.spacetraders.models import SpaceTradersAPIReqShape, SpaceTradersAPIResShape
+    from deltav.spacetraders.token import AgentToken
+
+T = TypeVar('T', bound='SpaceTradersAPIResShape')
+
+
+class ShipController:
+    """One ship of a fleet, acting through the shared asynchronous client.
+
+    The first action after every wake-up is recorded in the `action_lateness` of the
+    scheduler, see `WakeScheduler`. Routes to other waypoints are planned by the
+    pathfinder, which has to know the systems on the way, see `Pathfinder.add_system()`.
+    """
+
+    def __init__(
+        self,
+        ship: ShipShape,
+        token: AgentToken,
+        scheduler: WakeScheduler | None = None,
+        pathfinder: Pathfinder | None = None,
+    ) -> None:
+        self.ship: ShipShape = ship
+        self.scheduler: WakeScheduler = scheduler if scheduler is not None else WakeScheduler()
+        self.pathfinder: Pathfinder = (
+            pathfinder if pathfinder is not None else pathfinding.pathfinder
+        )
+        self.__token: AgentToken = token
+        # The last wake-up, until the action following it completes
+        self.__woken: tuple[datetime, WakeReason] | None = None
+
+    @property
+    def symbol(self) -> str:
+        return self.ship.symbol
+
+    @property
+    def waypoint_symbol(self) -> str:
+        return self.ship.nav.waypoint_symbol
+
+    @property
+    def system_symbol(self) -> str:
+        return self.ship.nav.system_symbol
+
+    @property
+    def status(self) -> ShipNavStatus:
+        return ShipNavStatus(self.ship.nav.status)
+
+    @property
+    def cargo_units_remaining(self) -> int:
+        return self.ship.cargo.capacity - self.ship.cargo.units
+
+    def cargo_units(self, trade_symbol: TradeSymbol) -> int:
+        return sum(item.units for item in self.ship.cargo.inventory if item.symbol is trade_symbol)
+
+    async def refresh(self) -> None:
+        """Replace the state of the ship with the current one from the API."""
+        self.ship = await self.__call(SpaceTradersAPIEndpoint.GET_SHIP, ShipShape)
+
+    async def wait_for_arrival(self) -> None:
+        """Sleep until the ship arrives, if it is in transit."""
+        if self.status is ShipNavStatus.IN_TRANSIT and await self.wait_until(
+            self.ship.nav.route.arrival, WakeReason.ARRIVAL
+        ):
+            self.ship.nav.status = ShipNavStatus.IN_ORBIT.value
+
+    async def wait_for_cooldown(self) -> None:
+        """Sleep until the cooldown of the ship expires, if it has one."""
+        if self.ship.cooldown.remaining_seconds > 0 and await self.wait_until(
+            self.ship.cooldown.expiration, WakeReason.COOLDOWN
+        ):
+            self.ship.cooldown.remaining_seconds = 0
+
+    async def wait_until(self, when: datetime, reason: WakeReason) -> bool:
+        """Sleep until `when`, or not at all if it has passed.
+
+        Returns:
+            Whether `when` was reached, `False` if the wake-up was cancelled early.
+        """
+        if when <= datetime.now(tz=UTC):
+            return True
+        if not await self.scheduler.wait(self.symbol, when, reason):
+            return False
+        self.__woken = (when, reason)
+        return True
+
+    async def idle(self, seconds: float, reason: WakeReason = WakeReason.IDLE) -> None:
+        """Sleep for `seconds`, e.g. when there is nothing to do."""
+        _ = await self.scheduler.sleep(self.symbol, seconds, reason)
+
+    async def orbit(self) -> None:
+        await self.wait_for_arrival()
+        if self.status is ShipNavStatus.DOCKED:
+            self.ship.nav = await self.__call(SpaceTradersAPIEndpoint.ORBIT_SHIP, ShipNavShape)
+
+    async def dock(self) -> None:
+        await self.wait_for_arrival()
+        if self.status is ShipNavStatus.IN_ORBIT:
+            self.ship.nav = await self.__call(SpaceTradersAPIEndpoint.DOCK_SHIP, ShipNavShape)
+
+    async def travel(self, destination: str) -> None:
+        """Fly to any waypoint along the fastest route, and wait until the ship arrives.
+
+        Every leg of the route is flown in its flight mode, the ship refuels where the
+        route refuels and jumps through the gates on the way, see `Pathfinder.route()`.
+
+        Raises:
+            ShipActionError: If `pathfinder` knows no route to `destination`.
+        """
+        await self.wait_for_arrival()
+        if destination == self.waypoint_symbol:
+            return
+
+        route = self.pathfinder.route_ship(self.ship, destination)
+        if route is None:
+            msg = f'{self.symbol}: No known route from {self.waypoint_symbol} to {destination}'
+            raise ShipActionError(msg)
+
+        for leg in route.legs:
+            if leg.refuel:
+                await self.refuel()
+            if leg.type is RouteLegType.JUMP:
+                await self.jump(leg.destination)
+                continue
+            if leg.mode is not None:
+                await self.set_flight_mode(leg.mode)
+            await self.navigate(leg.destination)
+
+    async def navigate(self, waypoint_symbol: str, *, wait: bool = True) -> None:
+        """Fly straight to a waypoint in the system of the ship, and wait until it arrives.
+
+        Use `travel()` to refuel and jump on the way.
+
+        Args:
+            waypoint_symbol: The destination.
+            wait: Whether to wait for the arrival.
+        """
+        await self.orbit()
+        if waypoint_symbol == self.waypoint_symbol:
+            return
+
+        res = await self.__call(
+            SpaceTradersAPIEndpoint.NAVIGATE_SHIP,
+            ShipNavigationShape,
+            WaypointSymbolReqShape(waypoint_symbol=waypoint_symbol),
+        )
+        self.ship.nav = res.nav
+        self.ship.fuel = res.fuel
+        if wait:
+            await self.wait_for_arrival()
+
+    async def set_flight_mode(self, mode: ShipNavFlightMode) -> None:
+        """Fly the following navigations in `mode`."""
+        if ShipNavFlightMode(self.ship.nav.flight_mode) is mode:
+            return
+
+        res = await self.__call(
+            SpaceTradersAPIEndpoint.UPDATE_NAV_STATUS,
+            ShipNavUpdateShape,
+            ShipFlightModeShape(flight_mode=mode),
+        )
+        self.ship.nav = res.nav
+        self.ship.fuel = res.fuel
+
+    async def jump(self, waypoint_symbol: str) -> None:
+        """Jump to a connected jump gate once the cooldown expires, and apply the cooldown
+        of the jump.
+        """
+        await self.orbit()
+        await self.wait_for_cooldown()
+        _ = await self.__call(
+            SpaceTradersAPIEndpoint.JUMP_SHIP,
+            MarketTransactionShape,
+            WaypointSymbolReqShape(waypoint_symbol=waypoint_symbol),
+        )
+        # The jump response does not include the new state of the ship
+        await self.refresh()
+
+    async def refuel(self) -> None:
+        """Refuel to capacity at the current waypoint, if the ship is not full."""
+        missing = self.ship.fuel.capacity - self.ship.fuel.current
+        if missing <= 0:
+            return
+
+        await self.dock()
+        res = await self.__call(
+            SpaceTradersAPIEndpoint.REFUEL_SHIP,
+            ShipRefuelResShape,
+            ShipRefuelReqShape(units=missing, from_cargo=False),
+        )
+        self.ship.fuel = res.fuel
+        self.ship.cargo = res.cargo
+
+    async def extract(self) -> ShipExtractionShape:
+        """Extract resources at the current waypoint once the cooldown expires."""
+        await self.orbit()
+        await self.wait_for_cooldown()
+        res = await self.__call(SpaceTradersAPIEndpoint.EXTRACT_RESOURCES, ShipExtractionShape)
+        self.ship.cargo = res.cargo
+        self.ship.cooldown = res.cooldown
+        return res
+
+    async def purchase(self, trade_symbol: TradeSymbol, units: int) -> MarketTransactionShape:
+        await self.dock()
+        res = await self.__call(
+            SpaceTradersAPIEndpoint.PURCHASE_CARGO,
+            MarketTransactionShape,
+            CargoItemReqShape(symbol=trade_symbol, units=units),
+        )
+        market_index.record_transaction(res)
+        writer.call(partial(record_transactions, shapes=[res]))
+        self.__adjust_cargo(trade_symbol, res.units)
+        return res
+
+    async def sell(self, trade_symbol: TradeSymbol, units: int) -> MarketTransactionShape:
+        await self.dock()
+        res = await self.__call(
+            SpaceTradersAPIEndpoint.SELL_CARGO,
+            MarketTransactionShape,
+            CargoItemReqShape(symbol=trade_symbol, units=units),
+        )
+        market_index.record_transaction(res)
+        writer.call(partial(record_transactions, shapes=[res]))
+        self.__adjust_cargo(trade_symbol, -res.units)
+        return res
+
+    async def jettison(self, trade_symbol: TradeSymbol, units: int) -> None:
+        self.ship.cargo = await self.__call(
+            SpaceTradersAPIEndpoint.JETTISON_CARGO,
+            ShipCargoShape,
+            CargoItemReqShape(symbol=trade_symbol, units=units),
+        )
+
+    async def deliver(
+        self, contract_id: str, trade_symbol: TradeSymbol, units: int
+    ) -> ContractShape:
+        """Deliver cargo to a contract at the current waypoint.
+
+        Returns:
+            The contract, with the delivered units counted.
+        """
+        await self.dock()
+        res = await self.__call(
+            SpaceTradersAPIEndpoint.DELIVER_CONTRACT,
+            ContractDeliverResShape,
+            ContractDeliverReqShape(
+                ship_symbol=self.symbol, trade_symbol=trade_symbol.value, units=units
+            ),
+            path_params=(contract_id,),
+        )
+        self.ship.cargo = res.cargo
+        return res.contract
+
+    async def fulfill(self, contract_id: str) -> ContractShape:
+        return await self.__call(
+            SpaceTradersAPIEndpoint.FULFILL_CONTRACT, ContractShape, path_params=(contract_id,)
+        )
+
+    async def fetch_market(self) -> MarketShape:
+        """Fetch the market at the current waypoint and record its prices."""
+        res = await self.__call(
+            SpaceTradersAPIEndpoint.GET_MARKET,
+            MarketShape,
+            path_params=(self.system_symbol, self.waypoint_symbol),
+        )
+        observed_at = datetime.now(tz=UTC)
+        market_index.update(res, observed_at)
+        writer.call(partial(record_markets, shapes=[res], observed_at=observed_at))
+        return res
+
+    async def fetch_cargo(self) -> ShipCargoShape:
+        self.ship.cargo = await self.__call(SpaceTradersAPIEndpoint.GET_SHIP_CARGO, ShipCargoShape)
+        return self.ship.cargo
+
+    def __adjust_cargo(self, trade_symbol: TradeSymbol, units: int) -> None:
+        """Apply a purchase or sale to the cargo, as the responses do not include it."""
+        cargo = self.ship.cargo
+        for item in cargo.inventory:
+            if item.symbol is trade_symbol:
+                item.units += units
+                break
+        else:
+            cargo.inventory.append(
+                ShipCargoInventoryShape.model_construct(
+                    symbol=trade_symbol, name=trade_symbol.value, description='', units=units
+                )
+            )
+        cargo.inventory = [item for item in cargo.inventory if item.units > 0]
+        cargo.units = sum(item.units for item in cargo.inventory)
+
+    async def __call(
+        self,
+        endpoint: SpaceTradersAPIEndpoint,
+        shape: type[T],
+        data: SpaceTradersAPIReqShape | None = None,
+        path_params: tuple[str, ...] | None = None,
+    ) -> T:
+        builder = (
+            SpaceTradersAPIRequest[shape]()
+            .builder()
+            .endpoint(endpoint)
+            .path_params(*(path_params or (self.symbol,)))
+            .priority(RequestPriority.FLEET_ACTION)
+        )
+        if data is not None:
+            builder = builder.data(data)
+        if endpoint.token_type is not None:
+            builder = builder.token(self.__token)
+
+        res = (await AsyncSpaceTradersAPIClient.call(builder.build())).unwrap()
+        if self.__woken is not None:
+            due, reason = self.__woken
+            self.__woken = None
+            lateness = (datetime.now(tz=UTC) - due).total_seconds()
+            self.scheduler.action_lateness[reason].observe(lateness)
+        if isinstance(res, SpaceTradersAPIError):
+            msg = f'{self.symbol}: {endpoint.name} failed with {res.code}: {res.message}'
+            raise ShipActionError(msg, res)
+        return res
@@ -0,0 +1,232 @@
+"""Wake-ups of ships at the moments they can act again.
+
+Ships become actionable at known times: when their cooldown expires, when they arrive,
+or when they should look again for something to do. Every waiting ship has one pending
+wake-up in a `WakeScheduler`, which wakes it with a single event loop timer armed for
+the earliest of them, and records how late every wake-up and the action that follows
+it were.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+from collections import deque
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from itertools import count
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# Wake-ups kept per reason for percentiles
+LATENESS_WINDOW: int = 1024
+
+
+class WakeReason(Enum):
+    """Why a ship waits.
+
+    ARRIVAL
+    COOLDOWN
+    DEADLINE
+    IDLE
+    BACKOFF
+    """
+
+    ARRIVAL = 'ARRIVAL'
+    COOLDOWN = 'COOLDOWN'
+    DEADLINE = 'DEADLINE'
+    IDLE = 'IDLE'
+    BACKOFF = 'BACKOFF'
+
+
+class LatenessStats:
+    """How late things happened after they were due, in seconds.
+
+    Totals cover every observation, percentiles the last `LATENESS_WINDOW` ones.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+        self.__recent: deque[float] = deque(maxlen=LATENESS_WINDOW)
+
+    def __str__(self) -> str:
+        return (
+            f'n={self.count} mean={self.mean:.3f}s p50={self.percentile(50):.3f}s '
+            f'p95={self.percentile(95):.3f}s max={self.max:.3f}s'
+        )
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def observe(self, lateness: float) -> None:
+        lateness = max(lateness, 0)
+        self.count += 1
+        self.total += lateness
+        self.max = max(self.max, lateness)
+        self.__recent.append(lateness)
+
+    def percentile(self, q: float) -> float:
+        if not self.__recent:
+            return 0
+        recent = sorted(self.__recent)
+        return recent[min(len(recent) - 1, int(len(recent) * q / 100))]
+
+
+class _Wake:
+    def __init__(self, key: str, due: datetime, reason: WakeReason, seq: int) -> None:
+        self.key: str = key
+        self.due: datetime = due
+        self.reason: WakeReason = reason
+        self.seq: int = seq
+        self.waiters: list[asyncio.Future[bool]] = []
+
+
+class WakeScheduler:
+    """Pending wake-ups keyed by ship symbol, at most one per ship.
+
+    Wake-ups are kept in a heap ordered by due time. Rescheduling pushes a new entry and
+    leaves the old one to be discarded when it reaches the top, so scheduling,
+    rescheduling and cancelling all take O(log n). Only the earliest wake-up has an event
+    loop timer, however many ships wait.
+
+    Lateness is recorded twice per reason: `wake_lateness` is how late the timer fired,
+    which grows when the event loop is saturated, and `action_lateness` is how late the
+    first action after the wake-up completed, which grows when the ratelimit is the
+    bottleneck. See `ShipController`.
+    """
+
+    def __init__(self) -> None:
+        self.wake_lateness: dict[WakeReason, LatenessStats] = {
+            reason: LatenessStats() for reason in WakeReason
+        }
+        self.action_lateness: dict[WakeReason, LatenessStats] = {
+            reason: LatenessStats() for reason in WakeReason
+        }
+        self.__wakes: dict[str, _Wake] = {}
+        # (due, seq, key), entries whose seq is not the current one of their key are stale
+        self.__heap: list[tuple[datetime, int, str]] = []
+        self.__seq: Iterator[int] = count()
+        self.__timer: asyncio.TimerHandle | None = None
+        self.__timer_due: datetime | None = None
+
+    def __len__(self) -> int:
+        return len(self.__wakes)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__wakes
+
+    def due(self, key: str) -> datetime | None:
+        """When `key` is woken, if it waits."""
+        wake = self.__wakes.get(key)
+        return wake.due if wake is not None else None
+
+    def pending(self) -> list[tuple[str, datetime, WakeReason]]:
+        """Every pending wake-up as (key, due, reason), earliest first."""
+        return sorted(
+            ((wake.key, wake.due, wake.reason) for wake in self.__wakes.values()),
+            key=lambda entry: entry[1],
+        )
+
+    async def wait(self, key: str, due: datetime, reason: WakeReason) -> bool:
+        """Sleep until `key` is woken, at `due` unless it is rescheduled.
+
+        Waiting on a key that already waits reschedules it, and both waiters are woken
+        together.
+
+        Returns:
+            Whether `key` was woken, `False` if its wake-up was cancelled.
+        """
+        self.schedule(key, due, reason)
+        wake = self.__wakes[key]
+        future: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        wake.waiters.append(future)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # The waiting task was cancelled, drop the wake-up if nothing else waits on it
+            wake.waiters.remove(future)
+            if not wake.waiters and self.__wakes.get(key) is wake:
+                self.cancel(key)
+            raise
+
+    async def sleep(self, key: str, seconds: float, reason: WakeReason) -> bool:
+        return await self.wait(key, datetime.now(tz=UTC) + timedelta(seconds=seconds), reason)
+
+    def schedule(self, key: str, due: datetime, reason: WakeReason) -> None:
+        """Wake `key` at `due`, replacing the time and reason of its pending wake-up."""
+        seq = next(self.__seq)
+        if (wake := self.__wakes.get(key)) is None:
+            wake = self.__wakes[key] = _Wake(key, due, reason, seq)
+        else:
+            wake.due, wake.reason, wake.seq = due, reason, seq
+        heapq.heappush(self.__heap, (due, seq, key))
+        self.__compact()
+        self.__arm()
+
+    def wake(self, key: str) -> None:
+        """Wake `key` now, if it waits."""
+        if key in self.__wakes:
+            self.schedule(key, datetime.now(tz=UTC), self.__wakes[key].reason)
+
+    def cancel(self, key: str) -> None:
+        """Forget the wake-up of `key`, its waiters return `False` without being woken."""
+        if (wake := self.__wakes.pop(key, None)) is None:
+            return
+        for future in wake.waiters:
+            if not future.done():
+                future.set_result(False)
+        self.__compact()
+
+    def __fire(self) -> None:
+        self.__timer = self.__timer_due = None
+        now = datetime.now(tz=UTC)
+        heap = self.__heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if not self.__is_live(entry):
+                continue
+            due, _, key = entry
+            wake = self.__wakes.pop(key)
+            self.wake_lateness[wake.reason].observe((now - due).total_seconds())
+            for future in wake.waiters:
+                if not future.done():
+                    future.set_result(True)
+        self.__arm()
+
+    def __arm(self) -> None:
+        """Keep one timer armed for the earliest live wake-up."""
+        heap = self.__heap
+        while heap and not self.__is_live(heap[0]):
+            _ = heapq.heappop(heap)
+
+        if not heap:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = self.__timer_due = None
+            return
+
+        due = heap[0][0]
+        if self.__timer is not None:
+            if self.__timer_due == due:
+                return
+            self.__timer.cancel()
+
+        loop = asyncio.get_running_loop()
+        delay = max((due - datetime.now(tz=UTC)).total_seconds(), 0)
+        self.__timer = loop.call_at(loop.time() + delay, self.__fire)
+        self.__timer_due = due
+
+    def __is_live(self, entry: tuple[datetime, int, str]) -> bool:
+        wake = self.__wakes.get(entry[2])
+        return wake is not None and wake.seq == entry[1]
+
+    def __compact(self) -> None:
+        """Drop stale entries once they make up most of the heap."""
+        if len(self.__heap) > 2 * len(self.__wakes) + 64:
+            self.__heap = [(wake.due, wake.seq, wake.key) for wake in self.__wakes.values()]
+            heapq.heapify(self.__heap)
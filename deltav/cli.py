@@ -638,7 +638,7 @@ def cli_ships(active_agent: AgentShape | None):
         functions_in_transit(chosen_ship['symbol'])
 
 
-def run():
+def run(config: Config):
     quit = False
     # contract_id = 'cmb8cutehk6lxuo6x23gs1gu1'
     # active_agent = cast(AgentShape, {
@@ -650,7 +650,6 @@ def run():
     #     'account_id': None
     # })
 
-    config = Config()
     agent_config = config.get_agent('snxwman', 'snxw')
     my_agent = Agent(agent_config.token)
 
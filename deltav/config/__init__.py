@@ -8,6 +8,14 @@ from deltav.config.errors import UnsupportedPlatformError
 
 SUPPORTED_PLATFORMS = ['Linux', 'Darwin', 'Windows']
 
+# SQLite engine profile for deltav.db
+DEFAULT_DB_JOURNAL_MODE = 'WAL'
+DEFAULT_DB_SYNCHRONOUS = 'NORMAL'  # Safe from corruption in WAL mode
+DEFAULT_DB_MMAP_SIZE = 256 * 1024 * 1024  # bytes
+DEFAULT_DB_CACHE_SIZE = 64 * 1024  # KiB per connection
+DEFAULT_DB_BUSY_TIMEOUT = 5.0  # seconds
+DEFAULT_DB_POOL_SIZE = 8  # Reader connections, there is always one more for the writer
+
 
 def expand_path(p: Path) -> Path:
     _p = os.path.expandvars(p)
@@ -19,7 +19,17 @@ from loguru import logger
 from tomlkit import TOMLDocument
 from tomlkit.items import AoT, Table
 
-from deltav.config import get_default_config_paths, get_default_db_path, get_default_log_path
+from deltav.config import (
+    DEFAULT_DB_BUSY_TIMEOUT,
+    DEFAULT_DB_CACHE_SIZE,
+    DEFAULT_DB_JOURNAL_MODE,
+    DEFAULT_DB_MMAP_SIZE,
+    DEFAULT_DB_POOL_SIZE,
+    DEFAULT_DB_SYNCHRONOUS,
+    get_default_config_paths,
+    get_default_db_path,
+    get_default_log_path,
+)
 from deltav.config.errors import ConfigNotFoundError
 from deltav.spacetraders.enums.faction import FactionSymbol
 from deltav.spacetraders.token import AccountToken, AgentToken
@@ -48,6 +58,19 @@ class DeltavConfig:
     log_level: LogLevel = LogLevel.default()
     log_directory: Path = get_default_log_path()
     db_directory: Path = get_default_db_path()
+    db_journal_mode: str = DEFAULT_DB_JOURNAL_MODE
+    db_synchronous: str = DEFAULT_DB_SYNCHRONOUS
+    db_mmap_size: int = DEFAULT_DB_MMAP_SIZE
+    db_cache_size: int = DEFAULT_DB_CACHE_SIZE
+    db_busy_timeout: float = DEFAULT_DB_BUSY_TIMEOUT
+    db_pool_size: int = DEFAULT_DB_POOL_SIZE
+    db_echo: bool = False
+    http2: bool = False
+    http_max_connections: int = 32
+    http_max_keepalive_connections: int = 32
+    http_keepalive_expiry: float = 60.0
+    cache_max_entries: int = 4096
+    cache_directory: Path | None = None
 
     @override
     def __str__(self) -> str:
@@ -55,7 +78,19 @@ class DeltavConfig:
             'DeltaV',
             f'Proxy: {self.proxy}',
             f'Logging:\n\t\tLevel: {self.log_level.name.lower()}\n\t\tDir: {self.log_directory}',
-            f'Database:\n\t\tDir: {self.db_directory}',
+            f'Database:\n\t\tDir: {self.db_directory}'
+            f'\n\t\tJournal Mode: {self.db_journal_mode}'
+            f'\n\t\tSynchronous: {self.db_synchronous}'
+            f'\n\t\tMmap Size: {self.db_mmap_size}'
+            f'\n\t\tCache Size: {self.db_cache_size}'
+            f'\n\t\tBusy Timeout: {self.db_busy_timeout}'
+            f'\n\t\tPool Size: {self.db_pool_size}'
+            f'\n\t\tEcho: {self.db_echo}',
+            f'HTTP:\n\t\tHTTP/2: {self.http2}'
+            f'\n\t\tMax Connections: {self.http_max_connections}'
+            f'\n\t\tMax Keep-Alive Connections: {self.http_max_keepalive_connections}'
+            f'\n\t\tKeep-Alive Expiry: {self.http_keepalive_expiry}',
+            f'Cache:\n\t\tMax Entries: {self.cache_max_entries}\n\t\tDir: {self.cache_directory}',
         ])  # fmt: skip
 
 
@@ -166,11 +201,37 @@ class Config:
         log_level = toml_deltav.get('log').get('level', self.deltav.log_level)
         if isinstance(log_level, str):
             log_level = LogLevel[log_level.upper()]
+        toml_db: Table = toml_deltav.get('db', {})
+        db_directory = toml_db.get('directory', None)
+        toml_http: Table = toml_deltav.get('http', {})
+        toml_cache: Table = toml_deltav.get('cache', {})
+        cache_directory = toml_cache.get('directory', None)
         self.deltav = DeltavConfig(
             proxy=toml_deltav.get('proxy', None),
             log_level=log_level,
             log_directory=toml_deltav.get('log.directory', self.deltav.log_directory),
-            db_directory=toml_deltav.get('directory', self.deltav.db_directory),
+            db_directory=(
+                Path(db_directory).expanduser() if db_directory else self.deltav.db_directory
+            ),
+            db_journal_mode=toml_db.get('journal_mode', self.deltav.db_journal_mode),
+            db_synchronous=toml_db.get('synchronous', self.deltav.db_synchronous),
+            db_mmap_size=toml_db.get('mmap_size', self.deltav.db_mmap_size),
+            db_cache_size=toml_db.get('cache_size', self.deltav.db_cache_size),
+            db_busy_timeout=toml_db.get('busy_timeout', self.deltav.db_busy_timeout),
+            db_pool_size=toml_db.get('pool_size', self.deltav.db_pool_size),
+            db_echo=toml_db.get('echo', self.deltav.db_echo),
+            http2=toml_http.get('http2', self.deltav.http2),
+            http_max_connections=toml_http.get(
+                'max_connections', self.deltav.http_max_connections
+            ),
+            http_max_keepalive_connections=toml_http.get(
+                'max_keepalive_connections', self.deltav.http_max_keepalive_connections
+            ),
+            http_keepalive_expiry=toml_http.get(
+                'keepalive_expiry', self.deltav.http_keepalive_expiry
+            ),
+            cache_max_entries=toml_cache.get('max_entries', self.deltav.cache_max_entries),
+            cache_directory=Path(cache_directory).expanduser() if cache_directory else None,
         )
 
         logger.remove()
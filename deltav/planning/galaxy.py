@@ -0,0 +1,353 @@
+"""The systems and waypoints of the universe, with spatial indexes over their coordinates.
+
+The galaxy is loaded once from the store at startup, and kept up to date with the systems
+and waypoints fetched afterwards. It answers nearest-N and within-radius queries over
+systems, and over the waypoints of a system, without scanning them all.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy import select
+
+from deltav.planning.spatial import SpatialGrid
+from deltav.spacetraders import Coordinate
+from deltav.spacetraders.enums.system import SystemType
+from deltav.spacetraders.enums.waypoint import WaypointTraitSymbol, WaypointType
+from deltav.spacetraders.models.waypoint import WaypointShape
+from deltav.store.db.universe import systems, trait_types, traits, waypoints
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from sqlalchemy import Engine
+
+    from deltav.spacetraders.models.systems import SystemShape, SystemWaypointShape
+
+# Systems are hundreds of units apart, the waypoints of a system tens of units
+SYSTEM_CELL_SIZE: float = 500
+WAYPOINT_CELL_SIZE: float = 50
+
+
+@dataclass(frozen=True, slots=True)
+class GalaxySystem:
+    """
+    ```
+    GalaxySystem
+        symbol: str
+        sector_symbol: str
+        constellation: str | None
+        type: SystemType
+        coordinate: Coordinate
+    ```
+    """
+
+    symbol: str
+    sector_symbol: str
+    constellation: str | None
+    type: SystemType
+    coordinate: Coordinate
+
+
+@dataclass(frozen=True, slots=True)
+class GalaxyWaypoint:
+    """
+    ```
+    GalaxyWaypoint
+        symbol: str
+        system_symbol: str
+        type: WaypointType
+        coordinate: Coordinate
+        traits: frozenset[WaypointTraitSymbol]
+    ```
+    """
+
+    symbol: str
+    system_symbol: str
+    type: WaypointType
+    coordinate: Coordinate
+    traits: frozenset[WaypointTraitSymbol]  # Empty until the waypoint is fetched
+
+
+class Galaxy:
+    """Every known system and waypoint, indexed by coordinate.
+
+    Systems are indexed in one grid, the waypoints of every system in a grid of their own.
+    For every waypoint trait there is also a grid of the systems with a waypoint of that
+    trait, so "the nearest system with a shipyard" only visits systems that have one.
+    Updates and queries may come from any thread, `where` filters must not call back into
+    the galaxy.
+
+    Attributes:
+        systems: Every system, by symbol.
+        sectors: The systems of every sector.
+        constellations: The systems of every constellation.
+    """
+
+    def __init__(self) -> None:
+        self.__lock: threading.Lock = threading.Lock()
+        self.systems: dict[str, GalaxySystem] = {}
+        self.sectors: dict[str, list[GalaxySystem]] = {}
+        self.constellations: dict[str, list[GalaxySystem]] = {}
+
+        self.__waypoints: dict[str, GalaxyWaypoint] = {}
+        self.__system_waypoints: dict[str, dict[str, GalaxyWaypoint]] = {}
+        self.__system_grid: SpatialGrid[str] = SpatialGrid(SYSTEM_CELL_SIZE)
+        self.__waypoint_grids: dict[str, SpatialGrid[str]] = {}
+        # trait -> system symbol -> waypoints of the trait in the system
+        self.__trait_counts: dict[WaypointTraitSymbol, dict[str, int]] = {}
+        self.__trait_grids: dict[WaypointTraitSymbol, SpatialGrid[str]] = {}
+
+    def load(self, engine: Engine) -> None:
+        """Add or replace every stored system and waypoint, see `store.db.universe`."""
+        with engine.connect() as conn, self.__lock:
+            for row in conn.execute(
+                select(
+                    systems.c.symbol,
+                    systems.c.sector_symbol,
+                    systems.c.constellation,
+                    systems.c.type,
+                    systems.c.x,
+                    systems.c.y,
+                )
+            ):
+                self.__add_system(
+                    GalaxySystem(
+                        symbol=row.symbol,
+                        sector_symbol=row.sector_symbol,
+                        constellation=row.constellation,
+                        type=SystemType(row.type),
+                        coordinate=Coordinate(row.x, row.y),
+                    )
+                )
+
+            waypoint_traits: dict[int, set[WaypointTraitSymbol]] = {}
+            for waypoint_id, symbol in conn.execute(
+                select(traits.c.waypoint_id, trait_types.c.symbol).join(
+                    trait_types, traits.c.trait_id == trait_types.c.id
+                )
+            ):
+                waypoint_traits.setdefault(waypoint_id, set()).add(WaypointTraitSymbol(symbol))
+
+            for row in conn.execute(
+                select(
+                    waypoints.c.id,
+                    waypoints.c.symbol,
+                    waypoints.c.system_symbol,
+                    waypoints.c.type,
+                    waypoints.c.x,
+                    waypoints.c.y,
+                )
+            ):
+                self.__add_waypoint(
+                    GalaxyWaypoint(
+                        symbol=row.symbol,
+                        system_symbol=row.system_symbol,
+                        type=WaypointType(row.type),
+                        coordinate=Coordinate(row.x, row.y),
+                        traits=frozenset(waypoint_traits.get(row.id, ())),
+                    )
+                )
+
+    def update_systems(self, shapes: Iterable[SystemShape]) -> None:
+        """Add or replace systems and the waypoints listed in them."""
+        with self.__lock:
+            for shape in shapes:
+                self.__add_system(
+                    GalaxySystem(
+                        symbol=shape.symbol,
+                        sector_symbol=shape.sector_symbol,
+                        constellation=shape.constellation,
+                        type=shape.type,
+                        coordinate=Coordinate(shape.x, shape.y),
+                    )
+                )
+                self.__update_waypoints(shape.waypoints)
+
+    def update_waypoints(self, shapes: Iterable[SystemWaypointShape | WaypointShape]) -> None:
+        """Add or replace waypoints.
+
+        Waypoints listed in a system do not include traits, the known traits of those
+        waypoints are kept.
+        """
+        with self.__lock:
+            self.__update_waypoints(shapes)
+
+    def waypoint(self, waypoint_symbol: str) -> GalaxyWaypoint | None:
+        return self.__waypoints.get(waypoint_symbol)
+
+    def waypoints(self, system_symbol: str) -> list[GalaxyWaypoint]:
+        with self.__lock:
+            return list(self.__system_waypoints.get(system_symbol, {}).values())
+
+    def __update_waypoints(self, shapes: Iterable[SystemWaypointShape | WaypointShape]) -> None:
+        for shape in shapes:
+            if isinstance(shape, WaypointShape):
+                waypoint_traits = frozenset(trait.symbol for trait in shape.traits)
+            elif (known := self.__waypoints.get(shape.symbol)) is not None:
+                waypoint_traits = known.traits
+            else:
+                waypoint_traits = frozenset()
+
+            self.__add_waypoint(
+                GalaxyWaypoint(
+                    symbol=shape.symbol,
+                    system_symbol=shape.system_symbol,
+                    type=shape.type,
+                    coordinate=Coordinate(shape.x, shape.y),
+                    traits=waypoint_traits,
+                )
+            )
+
+    def nearest_systems(
+        self,
+        coordinate: Coordinate,
+        n: int = 1,
+        trait: WaypointTraitSymbol | None = None,
+        where: Callable[[GalaxySystem], bool] | None = None,
+    ) -> list[GalaxySystem]:
+        """The `n` systems nearest to `coordinate`, nearest first.
+
+        Args:
+            coordinate: A coordinate in the galaxy, e.g. of a system.
+            n: The number of systems.
+            trait: Only systems with a waypoint of this trait, e.g. `SHIPYARD`.
+            where: Only systems for which this is true, e.g. the ones not yet charted.
+        """
+        with self.__lock:
+            grid = self.__grid(trait)
+            found = grid.nearest(coordinate, n, self.__filter(self.systems, where))
+            return [self.systems[symbol] for _, symbol in found]
+
+    def systems_within(
+        self,
+        coordinate: Coordinate,
+        radius: float,
+        trait: WaypointTraitSymbol | None = None,
+        where: Callable[[GalaxySystem], bool] | None = None,
+    ) -> list[GalaxySystem]:
+        """The systems within `radius` of `coordinate`, nearest first. See `nearest_systems()`."""
+        with self.__lock:
+            grid = self.__grid(trait)
+            found = grid.within(coordinate, radius, self.__filter(self.systems, where))
+            return [self.systems[symbol] for _, symbol in found]
+
+    def nearest_waypoints(
+        self,
+        system_symbol: str,
+        coordinate: Coordinate,
+        n: int = 1,
+        trait: WaypointTraitSymbol | None = None,
+        where: Callable[[GalaxyWaypoint], bool] | None = None,
+    ) -> list[GalaxyWaypoint]:
+        """The `n` waypoints of a system nearest to `coordinate`, nearest first.
+
+        Args:
+            system_symbol: The system of the waypoints.
+            coordinate: A coordinate in the system, e.g. of a waypoint.
+            n: The number of waypoints.
+            trait: Only waypoints with this trait, e.g. `MARKETPLACE`.
+            where: Only waypoints for which this is true, e.g. the ones selling FUEL.
+        """
+        with self.__lock:
+            if (grid := self.__waypoint_grids.get(system_symbol)) is None:
+                return []
+            found = grid.nearest(coordinate, n, self.__waypoint_filter(trait, where))
+            return [self.__waypoints[symbol] for _, symbol in found]
+
+    def waypoints_within(
+        self,
+        system_symbol: str,
+        coordinate: Coordinate,
+        radius: float,
+        trait: WaypointTraitSymbol | None = None,
+        where: Callable[[GalaxyWaypoint], bool] | None = None,
+    ) -> list[GalaxyWaypoint]:
+        """The waypoints of a system within `radius` of `coordinate`, nearest first. See
+        `nearest_waypoints()`.
+        """
+        with self.__lock:
+            if (grid := self.__waypoint_grids.get(system_symbol)) is None:
+                return []
+            found = grid.within(coordinate, radius, self.__waypoint_filter(trait, where))
+            return [self.__waypoints[symbol] for _, symbol in found]
+
+    def __grid(self, trait: WaypointTraitSymbol | None) -> SpatialGrid[str]:
+        if trait is None:
+            return self.__system_grid
+        if trait not in self.__trait_grids:
+            self.__trait_counts[trait] = {}
+            self.__trait_grids[trait] = SpatialGrid(SYSTEM_CELL_SIZE)
+        return self.__trait_grids[trait]
+
+    @staticmethod
+    def __filter(
+        systems: dict[str, GalaxySystem], where: Callable[[GalaxySystem], bool] | None
+    ) -> Callable[[str], bool] | None:
+        if where is None:
+            return None
+        return lambda symbol: where(systems[symbol])
+
+    def __waypoint_filter(
+        self, trait: WaypointTraitSymbol | None, where: Callable[[GalaxyWaypoint], bool] | None
+    ) -> Callable[[str], bool] | None:
+        if trait is None and where is None:
+            return None
+
+        def matches(symbol: str) -> bool:
+            waypoint = self.__waypoints[symbol]
+            return (trait is None or trait in waypoint.traits) and (
+                where is None or where(waypoint)
+            )
+
+        return matches
+
+    def __add_system(self, system: GalaxySystem) -> None:
+        if (previous := self.systems.get(system.symbol)) is not None:
+            self.sectors[previous.sector_symbol].remove(previous)
+            if previous.constellation is not None:
+                self.constellations[previous.constellation].remove(previous)
+
+        self.systems[system.symbol] = system
+        self.sectors.setdefault(system.sector_symbol, []).append(system)
+        if system.constellation is not None:
+            self.constellations.setdefault(system.constellation, []).append(system)
+        self.__system_grid.insert(system.symbol, system.coordinate)
+        for trait, counts in self.__trait_counts.items():
+            if system.symbol in counts:
+                self.__trait_grids[trait].insert(system.symbol, system.coordinate)
+
+    def __add_waypoint(self, waypoint: GalaxyWaypoint) -> None:
+        if (previous := self.__waypoints.get(waypoint.symbol)) is not None:
+            self.__count_traits(previous, -1)
+
+        self.__waypoints[waypoint.symbol] = waypoint
+        self.__system_waypoints.setdefault(waypoint.system_symbol, {})[waypoint.symbol] = waypoint
+        if (grid := self.__waypoint_grids.get(waypoint.system_symbol)) is None:
+            grid = self.__waypoint_grids[waypoint.system_symbol] = SpatialGrid(WAYPOINT_CELL_SIZE)
+        grid.insert(waypoint.symbol, waypoint.coordinate)
+        self.__count_traits(waypoint, 1)
+
+    def __count_traits(self, waypoint: GalaxyWaypoint, delta: int) -> None:
+        """Keep the trait grids in step with the traits of the waypoints of every system."""
+        system_symbol = waypoint.system_symbol
+        for trait in waypoint.traits:
+            if (counts := self.__trait_counts.get(trait)) is None:
+                counts = self.__trait_counts[trait] = {}
+                self.__trait_grids[trait] = SpatialGrid(SYSTEM_CELL_SIZE)
+
+            count = counts.get(system_symbol, 0) + delta
+            if count <= 0:
+                _ = counts.pop(system_symbol, None)
+                self.__trait_grids[trait].remove(system_symbol)
+                continue
+
+            counts[system_symbol] = count
+            if count == delta and (system := self.systems.get(system_symbol)) is not None:
+                self.__trait_grids[trait].insert(system_symbol, system.coordinate)
+
+
+galaxy: Galaxy = Galaxy()
@@ -0,0 +1,48 @@
+"""Travel distance, fuel and time between waypoints, as computed by the game."""
+
+from __future__ import annotations
+
+from math import hypot
+from typing import TYPE_CHECKING
+
+from deltav.spacetraders.enums.ship import ShipNavFlightMode
+
+if TYPE_CHECKING:
+    from deltav.spacetraders import Coordinate
+
+# Seconds per unit of distance at an engine speed of 1
+FLIGHT_TIME_MULTIPLIER: dict[ShipNavFlightMode, float] = {
+    ShipNavFlightMode.BURN: 12.5,
+    ShipNavFlightMode.CRUISE: 25,
+    ShipNavFlightMode.DRIFT: 250,
+    ShipNavFlightMode.STEALTH: 30,
+}
+# Fuel per unit of distance, drifting always takes 1 fuel
+FUEL_MULTIPLIER: dict[ShipNavFlightMode, float] = {
+    ShipNavFlightMode.BURN: 2,
+    ShipNavFlightMode.CRUISE: 1,
+    ShipNavFlightMode.DRIFT: 0,
+    ShipNavFlightMode.STEALTH: 1,
+}
+# Seconds added to every flight
+FLIGHT_TIME_BASE: int = 15
+# Ship fuel per FUEL cargo unit bought at a market
+FUEL_PER_UNIT: int = 100
+
+
+def distance(a: Coordinate, b: Coordinate) -> float:
+    return hypot(a.x - b.x, a.y - b.y)
+
+
+def fuel_cost(dist: float, mode: ShipNavFlightMode = ShipNavFlightMode.CRUISE) -> int:
+    """The fuel to fly `dist` between two different waypoints."""
+    if mode is ShipNavFlightMode.DRIFT:
+        return 1
+    return max(1, round(dist * FUEL_MULTIPLIER[mode]))
+
+
+def flight_time(
+    dist: float, speed: int, mode: ShipNavFlightMode = ShipNavFlightMode.CRUISE
+) -> int:
+    """The seconds to fly `dist` between two different waypoints with an engine of `speed`."""
+    return round(max(1, round(dist)) * FLIGHT_TIME_MULTIPLIER[mode] / speed + FLIGHT_TIME_BASE)
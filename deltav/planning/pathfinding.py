@@ -0,0 +1,498 @@
+"""Plan routes for ships, within a system and across systems through jump gates.
+
+Within a system, routes are planned with A* over waypoint coordinates. A leg may be
+flown in any allowed flight mode, and ships may refuel at waypoints that sell fuel.
+Across systems, routes are planned over the jump gate graph, and the legs within the
+first and last system are added around the jumps.
+"""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+from deltav.planning.navigation import (
+    FLIGHT_TIME_MULTIPLIER,
+    distance,
+    flight_time,
+    fuel_cost,
+)
+from deltav.spacetraders.enums.ship import ShipNavFlightMode
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from deltav.spacetraders import Coordinate
+    from deltav.spacetraders.models.ship import ShipShape
+    from deltav.spacetraders.models.systems import JumpgateShape
+    from deltav.spacetraders.ship import Ship
+
+# A state of the search: (waypoint, fuel on arrival, parent label, leg into the waypoint)
+_Label = tuple[int, int, int, tuple[ShipNavFlightMode, int, int, bool] | None]
+
+# (origin, destination, fuel, fuel capacity, speed, flight modes)
+_PathKey = tuple[str, str, int, int, int, tuple[ShipNavFlightMode, ...]]
+
+MAX_CACHED_PATHS: int = 4096
+DEFAULT_FLIGHT_MODES: tuple[ShipNavFlightMode, ...] = (
+    ShipNavFlightMode.BURN,
+    ShipNavFlightMode.CRUISE,
+    ShipNavFlightMode.DRIFT,
+)
+
+
+class RouteLegType(Enum):
+    """
+
+    NAVIGATE
+    JUMP
+    """
+
+    NAVIGATE = 'NAVIGATE'
+    JUMP = 'JUMP'
+
+
+@dataclass(frozen=True, slots=True)
+class RouteLeg:
+    """One navigation or jump of a route.
+
+    ```
+    RouteLeg
+        type: RouteLegType
+        origin: str
+        destination: str
+        mode: ShipNavFlightMode | None
+        fuel: int
+        duration: int
+        refuel: bool
+    ```
+    """
+
+    type: RouteLegType
+    origin: str
+    destination: str
+    mode: ShipNavFlightMode | None  # None for jumps
+    fuel: int
+    duration: int  # Seconds of flight, jumps do not include the cooldown
+    refuel: bool  # Refuel at the origin before leaving
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """
+    ```
+    Route
+        legs: tuple[RouteLeg, ...]
+    ```
+    """
+
+    legs: tuple[RouteLeg, ...]
+
+    @property
+    def fuel(self) -> int:
+        return sum(leg.fuel for leg in self.legs)
+
+    @property
+    def duration(self) -> int:
+        return sum(leg.duration for leg in self.legs)
+
+    @property
+    def jumps(self) -> int:
+        return sum(1 for leg in self.legs if leg.type is RouteLegType.JUMP)
+
+    def __add__(self, other: Route) -> Route:
+        return Route(self.legs + other.legs)
+
+
+class SystemGraph:
+    """The waypoints of one system, with the distance between every pair precomputed.
+
+    Fuel costs per flight mode and flight times per engine speed and flight mode are
+    derived from the distances the first time they are needed and kept. Ships of a fleet
+    are often alike, so the most recently planned paths are kept as well.
+    """
+
+    def __init__(self, waypoints: Mapping[str, Coordinate], refuel: Iterable[str] = ()) -> None:
+        """
+        Args:
+            waypoints: The coordinates of every waypoint in the system.
+            refuel: The waypoints where ships can refuel, e.g. markets selling FUEL.
+        """
+        self.__symbols: list[str] = list(waypoints)
+        self.__index: dict[str, int] = {symbol: i for i, symbol in enumerate(self.__symbols)}
+        coordinates = list(waypoints.values())
+        self.__distances: list[list[float]] = [
+            [distance(a, b) for b in coordinates] for a in coordinates
+        ]
+        refuel = set(refuel)
+        self.__refuel: list[bool] = [symbol in refuel for symbol in self.__symbols]
+
+        self.__fuel: dict[ShipNavFlightMode, list[list[int]]] = {}
+        self.__times: dict[tuple[int, ShipNavFlightMode], list[list[int]]] = {}
+        self.__paths: OrderedDict[_PathKey, Route | None] = OrderedDict()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __contains__(self, waypoint_symbol: str) -> bool:
+        return waypoint_symbol in self.__index
+
+    def distance(self, origin: str, destination: str) -> float:
+        return self.__distances[self.__index[origin]][self.__index[destination]]
+
+    def path(
+        self,
+        origin: str,
+        destination: str,
+        fuel: int,
+        fuel_capacity: int,
+        speed: int,
+        modes: Iterable[ShipNavFlightMode] = DEFAULT_FLIGHT_MODES,
+    ) -> Route | None:
+        """The fastest route from `origin` to `destination` on the fuel a ship has.
+
+        Ships refuel to capacity at refuel waypoints when that gets them there sooner. A
+        leg is flown in a slower mode only if it uses less fuel, and drifting only if no
+        other mode is affordable. Ships without a fuel capacity, like probes, do not use
+        fuel.
+
+        Returns:
+            The route, or None if the ship cannot reach `destination`.
+        """
+        modes = tuple(sorted(set(modes), key=FLIGHT_TIME_MULTIPLIER.__getitem__))
+        key = (origin, destination, fuel, fuel_capacity, speed, modes)
+        with self.__lock:
+            if key in self.__paths:
+                self.__paths.move_to_end(key)
+                return self.__paths[key]
+
+        route = self.__search(origin, destination, fuel, fuel_capacity, speed, modes)
+        with self.__lock:
+            self.__paths[key] = route
+            while len(self.__paths) > MAX_CACHED_PATHS:
+                _ = self.__paths.popitem(last=False)
+        return route
+
+    def __search(
+        self,
+        origin: str,
+        destination: str,
+        fuel: int,
+        fuel_capacity: int,
+        speed: int,
+        modes: tuple[ShipNavFlightMode, ...],
+    ) -> Route | None:
+        start, goal = self.__index[origin], self.__index[destination]
+        if start == goal:
+            return Route(())
+
+        uses_fuel = fuel_capacity > 0
+        n = len(self.__symbols)
+        # (mode, fuel costs, flight times) of every allowed mode
+        costs = [
+            (
+                mode,
+                self.__fuel_costs(mode) if uses_fuel else None,
+                self.__flight_times(speed, mode),
+            )
+            for mode in modes
+        ]
+        # The direct flight in the fastest mode is never slower than any route, since
+        # every leg adds the base flight time. Labels are therefore settled in order of
+        # arrival at every waypoint, and a label is only worth expanding if it arrives
+        # with more fuel than every label settled there before.
+        heuristic = [min(times[goal][i] for _, _, times in costs) for i in range(n)]
+        settled = [-1] * n
+        zeros = [0] * n
+
+        labels: list[_Label] = [(start, fuel, -1, None)]
+        # (estimate, time, refuels, label), the fewest refuels first among equal times
+        frontier: list[tuple[int, int, int, int]] = [(heuristic[start], 0, 0, 0)]
+
+        while frontier:
+            _, time, refuels, label = heapq.heappop(frontier)
+            i, remaining, _, _ = labels[label]
+            if i == goal:
+                return Route(tuple(self.__legs(labels, label)))
+            if remaining <= settled[i]:
+                continue
+            settled[i] = remaining
+
+            departures = [(remaining, False)]
+            if uses_fuel and self.__refuel[i] and remaining < fuel_capacity:
+                departures.append((fuel_capacity, True))
+
+            fuel_rows = [
+                fuel_costs[i] if fuel_costs is not None else zeros for _, fuel_costs, _ in costs
+            ]
+            time_rows = [times[i] for _, _, times in costs]
+            for available, refuel in departures:
+                for j in range(n):
+                    if j == i:
+                        continue
+                    # Modes are tried fastest first, a slower mode only if it saves fuel
+                    cheapest = available + 1
+                    for mode, fuel_row, time_row in zip(modes, fuel_rows, time_rows, strict=True):
+                        cost = fuel_row[j]
+                        if cost >= cheapest:
+                            continue
+                        # Drifting is a last resort
+                        if mode is ShipNavFlightMode.DRIFT and cheapest <= available:
+                            break
+                        cheapest = cost
+                        if available - cost <= settled[j]:
+                            continue
+                        duration = time_row[j]
+                        arrival = time + duration
+                        labels.append((j, available - cost, label, (mode, cost, duration, refuel)))
+                        heapq.heappush(
+                            frontier,
+                            (arrival + heuristic[j], arrival, refuels + refuel, len(labels) - 1),
+                        )
+
+        return None
+
+    def __legs(self, labels: list[_Label], label: int) -> list[RouteLeg]:
+        legs: list[RouteLeg] = []
+        while (leg := labels[label][3]) is not None:
+            j, _, label, _ = labels[label]
+            mode, fuel, duration, refuel = leg
+            legs.append(
+                RouteLeg(
+                    type=RouteLegType.NAVIGATE,
+                    origin=self.__symbols[labels[label][0]],
+                    destination=self.__symbols[j],
+                    mode=mode,
+                    fuel=fuel,
+                    duration=duration,
+                    refuel=refuel,
+                )
+            )
+        legs.reverse()
+        return legs
+
+    def __fuel_costs(self, mode: ShipNavFlightMode) -> list[list[int]]:
+        with self.__lock:
+            if (costs := self.__fuel.get(mode)) is None:
+                costs = self.__fuel[mode] = [
+                    [0 if i == j else fuel_cost(d, mode) for j, d in enumerate(row)]
+                    for i, row in enumerate(self.__distances)
+                ]
+            return costs
+
+    def __flight_times(self, speed: int, mode: ShipNavFlightMode) -> list[list[int]]:
+        with self.__lock:
+            if (times := self.__times.get((speed, mode))) is None:
+                times = self.__times[speed, mode] = [
+                    [0 if i == j else flight_time(d, speed, mode) for j, d in enumerate(row)]
+                    for i, row in enumerate(self.__distances)
+                ]
+            return times
+
+
+class GateGraph:
+    """The systems connected by jump gates.
+
+    Paths are planned with A* over the distances between systems and are kept until the
+    graph changes, so a fleet travelling between the same systems plans each path once.
+    """
+
+    def __init__(self, systems: Mapping[str, Coordinate]) -> None:
+        """
+        Args:
+            systems: The coordinates of every system, used to weigh jumps.
+        """
+        self.__systems: dict[str, Coordinate] = dict(systems)
+        # system symbol -> jump gate waypoint symbol
+        self.__gates: dict[str, str] = {}
+        # system symbol -> connected system symbols
+        self.__connections: dict[str, set[str]] = {}
+        self.__paths: dict[tuple[str, str], list[str] | None] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def add_system(self, system_symbol: str, coordinate: Coordinate) -> None:
+        with self.__lock:
+            self.__systems[system_symbol] = coordinate
+            self.__paths.clear()
+
+    def add_jump_gate(self, gate: JumpgateShape) -> None:
+        """Add a jump gate and its connections. Connections are used in both directions."""
+        system_symbol = _system_symbol(gate.symbol)
+        with self.__lock:
+            self.__gates[system_symbol] = gate.symbol
+            connected = self.__connections.setdefault(system_symbol, set())
+            for connection in gate.connections:
+                other = _system_symbol(connection)
+                self.__gates.setdefault(other, connection)
+                connected.add(other)
+                self.__connections.setdefault(other, set()).add(system_symbol)
+            self.__paths.clear()
+
+    def gate(self, system_symbol: str) -> str | None:
+        """The jump gate waypoint of a system, if known."""
+        return self.__gates.get(system_symbol)
+
+    def path(self, origin: str, destination: str) -> list[str] | None:
+        """The jump gates to pass through from system `origin` to system `destination`.
+
+        Returns:
+            The gate waypoint symbols, from the gate in `origin` to the gate in
+            `destination`, or None if there is no path.
+        """
+        with self.__lock:
+            key = (origin, destination)
+            if key not in self.__paths:
+                self.__paths[key] = self.__search(origin, destination)
+            return self.__paths[key]
+
+    def __search(self, origin: str, destination: str) -> list[str] | None:
+        if origin not in self.__gates or destination not in self.__gates:
+            return None
+        if origin == destination:
+            return [self.__gates[origin]]
+
+        goal = self.__systems.get(destination)
+        # (estimate, distance, system)
+        frontier: list[tuple[float, float, str]] = [(0.0, 0.0, origin)]
+        best: dict[str, float] = {origin: 0.0}
+        parents: dict[str, str] = {}
+
+        while frontier:
+            _, travelled, system = heapq.heappop(frontier)
+            if system == destination:
+                path = [system]
+                while path[-1] != origin:
+                    path.append(parents[path[-1]])
+                return [self.__gates[s] for s in reversed(path)]
+            if travelled > best[system]:
+                continue
+
+            here = self.__systems.get(system)
+            for other in self.__connections.get(system, ()):
+                there = self.__systems.get(other)
+                # Without coordinates every jump weighs the same
+                step = distance(here, there) if here is not None and there is not None else 1.0
+                if travelled + step >= best.get(other, float('inf')):
+                    continue
+                best[other] = travelled + step
+                parents[other] = system
+                estimate = distance(there, goal) if there is not None and goal is not None else 0.0
+                heapq.heappush(frontier, (travelled + step + estimate, travelled + step, other))
+
+        return None
+
+
+class Pathfinder:
+    """Plans routes between any two known waypoints, within a system or across systems.
+
+    Systems are added with the coordinates of their waypoints and the waypoints where
+    ships can refuel, jump gates with their connections.
+    """
+
+    def __init__(self) -> None:
+        self.__systems: dict[str, SystemGraph] = {}
+        self.__gates: GateGraph = GateGraph({})
+
+    def add_system(
+        self,
+        system_symbol: str,
+        coordinate: Coordinate,
+        waypoints: Mapping[str, Coordinate],
+        refuel: Iterable[str] = (),
+    ) -> None:
+        """Add or replace a system, see `SystemGraph`."""
+        self.__systems[system_symbol] = SystemGraph(waypoints, refuel)
+        self.__gates.add_system(system_symbol, coordinate)
+
+    def add_jump_gate(self, gate: JumpgateShape) -> None:
+        self.__gates.add_jump_gate(gate)
+
+    def system(self, system_symbol: str) -> SystemGraph | None:
+        return self.__systems.get(system_symbol)
+
+    def route(
+        self,
+        origin: str,
+        destination: str,
+        fuel: int,
+        fuel_capacity: int,
+        speed: int,
+        modes: Iterable[ShipNavFlightMode] = DEFAULT_FLIGHT_MODES,
+    ) -> Route | None:
+        """The route from waypoint `origin` to waypoint `destination`.
+
+        Within a system this is the fastest route, see `SystemGraph.path()`. Across
+        systems the ship flies to the jump gate, jumps along the shortest chain of gates
+        and flies from the last gate to `destination`. Jumps do not use fuel.
+
+        Returns:
+            The route, or None if the ship cannot reach `destination`, or a system on the
+            way is not known.
+        """
+        origin_system, destination_system = _system_symbol(origin), _system_symbol(destination)
+        first = self.__systems.get(origin_system)
+        last = self.__systems.get(destination_system)
+        if first is None or last is None:
+            return None
+
+        modes = tuple(modes)
+        if origin_system == destination_system:
+            return first.path(origin, destination, fuel, fuel_capacity, speed, modes)
+
+        gates = self.__gates.path(origin_system, destination_system)
+        if gates is None or gates[0] not in first or gates[-1] not in last:
+            return None
+
+        to_gate = first.path(origin, gates[0], fuel, fuel_capacity, speed, modes)
+        if to_gate is None:
+            return None
+
+        jumps = Route(
+            tuple(
+                RouteLeg(
+                    type=RouteLegType.JUMP,
+                    origin=a,
+                    destination=b,
+                    mode=None,
+                    fuel=0,
+                    duration=0,
+                    refuel=False,
+                )
+                for a, b in pairwise(gates)
+            )
+        )
+
+        remaining = fuel
+        for leg in to_gate.legs:
+            remaining = (fuel_capacity if leg.refuel else remaining) - leg.fuel
+        from_gate = last.path(gates[-1], destination, remaining, fuel_capacity, speed, modes)
+        if from_gate is None:
+            return None
+
+        return to_gate + jumps + from_gate
+
+    def route_ship(
+        self,
+        ship: Ship | ShipShape,
+        destination: str,
+        modes: Iterable[ShipNavFlightMode] = DEFAULT_FLIGHT_MODES,
+    ) -> Route | None:
+        """The route for `ship` from where it is, see `route()`."""
+        return self.route(
+            ship.nav.waypoint_symbol,
+            destination,
+            ship.fuel.current,
+            ship.fuel.capacity,
+            ship.engine.speed,
+            modes,
+        )
+
+
+def _system_symbol(waypoint_symbol: str) -> str:
+    return waypoint_symbol.rsplit('-', 1)[0]
+
+
+pathfinder: Pathfinder = Pathfinder()
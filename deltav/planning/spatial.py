@@ -0,0 +1,140 @@
+"""A uniform grid over 2D coordinates for nearest-N and within-radius queries."""
+
+from __future__ import annotations
+
+import heapq
+from math import floor, hypot
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+    from deltav.spacetraders import Coordinate
+
+K = TypeVar('K')
+
+# (cell x, cell y)
+_Cell = tuple[int, int]
+
+
+class SpatialGrid(Generic[K]):
+    """Keys placed at coordinates, bucketed into square cells of `cell_size`.
+
+    Queries only visit the cells around the queried coordinate, ring by ring, so they
+    cost about the number of keys near it rather than the number of keys in the grid.
+    Cells should be about as large as the typical distance between neighbouring keys.
+    """
+
+    def __init__(self, cell_size: float) -> None:
+        self.cell_size: float = cell_size
+        self.__cells: dict[_Cell, dict[K, Coordinate]] = {}
+        self.__coordinates: dict[K, Coordinate] = {}
+        # Bounds of the cells in use, rings beyond them are empty
+        self.__min: _Cell = (0, 0)
+        self.__max: _Cell = (0, 0)
+
+    def __len__(self) -> int:
+        return len(self.__coordinates)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.__coordinates
+
+    def insert(self, key: K, coordinate: Coordinate) -> None:
+        """Place `key` at `coordinate`, moving it if it is already placed."""
+        if key in self.__coordinates:
+            self.remove(key)
+
+        cell = self.__cell(coordinate)
+        if not self.__cells:
+            self.__min = self.__max = cell
+        else:
+            self.__min = (min(self.__min[0], cell[0]), min(self.__min[1], cell[1]))
+            self.__max = (max(self.__max[0], cell[0]), max(self.__max[1], cell[1]))
+        self.__cells.setdefault(cell, {})[key] = coordinate
+        self.__coordinates[key] = coordinate
+
+    def remove(self, key: K) -> None:
+        if (coordinate := self.__coordinates.pop(key, None)) is None:
+            return
+        cell = self.__cell(coordinate)
+        del self.__cells[cell][key]
+        if not self.__cells[cell]:
+            del self.__cells[cell]
+
+    def coordinate(self, key: K) -> Coordinate | None:
+        return self.__coordinates.get(key)
+
+    def nearest(
+        self, center: Coordinate, n: int = 1, where: Callable[[K], bool] | None = None
+    ) -> list[tuple[float, K]]:
+        """The `n` keys nearest to `center`, nearest first, with their distance.
+
+        Only keys for which `where` is true are considered, if given.
+        """
+        if n <= 0 or not self.__cells:
+            return []
+
+        # Max-heap of the best candidates so far, as (-distance, order, key)
+        best: list[tuple[float, int, K]] = []
+        order = 0
+        for ring, cells in enumerate(self.__rings(center)):
+            # Keys in this ring and beyond are at least this far from the center
+            reach = max(0, ring - 1) * self.cell_size
+            if len(best) == n and -best[0][0] <= reach:
+                break
+
+            for cell in cells:
+                for key, coordinate in self.__cells[cell].items():
+                    if where is not None and not where(key):
+                        continue
+                    dist = hypot(coordinate.x - center.x, coordinate.y - center.y)
+                    if len(best) < n:
+                        heapq.heappush(best, (-dist, order, key))
+                    elif dist < -best[0][0]:
+                        _ = heapq.heapreplace(best, (-dist, order, key))
+                    order += 1
+
+        return [(-dist, key) for dist, _, key in sorted(best, reverse=True)]
+
+    def within(
+        self, center: Coordinate, radius: float, where: Callable[[K], bool] | None = None
+    ) -> list[tuple[float, K]]:
+        """Every key within `radius` of `center`, nearest first, with their distance.
+
+        Only keys for which `where` is true are considered, if given.
+        """
+        found: list[tuple[float, K]] = []
+        x0, y0 = self.__cell((center.x - radius, center.y - radius))
+        x1, y1 = self.__cell((center.x + radius, center.y + radius))
+        for cx in range(max(x0, self.__min[0]), min(x1, self.__max[0]) + 1):
+            for cy in range(max(y0, self.__min[1]), min(y1, self.__max[1]) + 1):
+                for key, coordinate in self.__cells.get((cx, cy), {}).items():
+                    dist = hypot(coordinate.x - center.x, coordinate.y - center.y)
+                    if dist <= radius and (where is None or where(key)):
+                        found.append((dist, key))
+
+        found.sort(key=lambda entry: entry[0])
+        return found
+
+    def __cell(self, coordinate: Coordinate | tuple[float, float]) -> _Cell:
+        return (floor(coordinate[0] / self.cell_size), floor(coordinate[1] / self.cell_size))
+
+    def __rings(self, center: Coordinate) -> Iterator[list[_Cell]]:
+        """The occupied cells at every Chebyshev distance from the cell of `center`."""
+        cx, cy = self.__cell(center)
+        last = max(
+            abs(cx - self.__min[0]),
+            abs(cx - self.__max[0]),
+            abs(cy - self.__min[1]),
+            abs(cy - self.__max[1]),
+        )
+        cells = self.__cells
+        for ring in range(last + 1):
+            if ring == 0:
+                ring_cells = [(cx, cy)]
+            else:
+                xs = range(cx - ring, cx + ring + 1)
+                ys = range(cy - ring + 1, cy + ring)
+                ring_cells = [(x, y) for x in xs for y in (cy - ring, cy + ring)]
+                ring_cells += [(x, y) for x in (cx - ring, cx + ring) for y in ys]
+            yield [cell for cell in ring_cells if cell in cells]
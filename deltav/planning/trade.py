@@ -0,0 +1,405 @@
+"""Plan the most profitable buy-then-sell trade routes for ships.
+
+A route flies a ship from where it is to a market, buys a good, flies to another market
+and sells it there. Routes are scored by expected profit per second of flight, after the
+fuel burnt on the way.
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import compress, repeat
+from operator import mul, sub, truediv
+from typing import TYPE_CHECKING
+
+from deltav.planning.navigation import (
+    FUEL_PER_UNIT,
+    distance,
+    flight_time,
+    fuel_cost,
+)
+from deltav.spacetraders.enums.market import ActivityLevel, SupplyLevel
+from deltav.spacetraders.enums.ship import ShipNavFlightMode
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from deltav.spacetraders import Coordinate
+    from deltav.spacetraders.market import MarketListing
+    from deltav.spacetraders.ship import Ship
+
+FUEL_SYMBOL: str = 'FUEL'
+
+# Rough share of the quoted margin that survives a trade. Prices rise while buying from
+# a market with little supply, and fall while selling to a market with plenty.
+BUY_SUPPLY_FACTOR: dict[SupplyLevel, float] = {
+    SupplyLevel.SCARCE: 0.6,
+    SupplyLevel.LIMITED: 0.8,
+    SupplyLevel.MODERATE: 1.0,
+    SupplyLevel.HIGH: 1.0,
+    SupplyLevel.ABUNDANT: 1.0,
+}
+SELL_SUPPLY_FACTOR: dict[SupplyLevel, float] = {
+    SupplyLevel.SCARCE: 1.0,
+    SupplyLevel.LIMITED: 1.0,
+    SupplyLevel.MODERATE: 1.0,
+    SupplyLevel.HIGH: 0.8,
+    SupplyLevel.ABUNDANT: 0.6,
+}
+# Markets with weak activity recover slowly from trades
+ACTIVITY_FACTOR: dict[ActivityLevel | None, float] = {
+    ActivityLevel.WEAK: 0.9,
+    ActivityLevel.GROWING: 1.0,
+    ActivityLevel.STRONG: 1.0,
+    ActivityLevel.RESTRICTED: 0.8,
+    None: 1.0,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class TradeShip:
+    """What the planner needs to know about a ship.
+
+    ```
+    TradeShip
+        symbol: str
+        waypoint_symbol: str
+        speed: int
+        fuel: int
+        fuel_capacity: int
+        cargo_space: int
+        credit_limit: int | None = None
+    ```
+    """
+
+    symbol: str
+    waypoint_symbol: str
+    speed: int
+    fuel: int
+    fuel_capacity: int
+    cargo_space: int
+    credit_limit: int | None = None  # Credits the ship may spend, if limited
+
+    @classmethod
+    def from_ship(cls, ship: Ship, credit_limit: int | None = None) -> TradeShip:
+        return cls(
+            symbol=ship.symbol,
+            waypoint_symbol=ship.nav.waypoint_symbol,
+            speed=ship.engine.speed,
+            fuel=ship.fuel.current,
+            fuel_capacity=ship.fuel.capacity,
+            cargo_space=ship.cargo_units_remaining,
+            credit_limit=credit_limit,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TradeRoute:
+    """Buy `units` of a good at one market and sell them at another.
+
+    ```
+    TradeRoute
+        ship_symbol: str
+        trade_symbol: str
+        buy_waypoint_symbol: str
+        sell_waypoint_symbol: str
+        units: int
+        purchase_price: int
+        sell_price: int
+        fuel: int
+        duration: int
+        profit: float
+    ```
+    """
+
+    ship_symbol: str
+    trade_symbol: str
+    buy_waypoint_symbol: str
+    sell_waypoint_symbol: str
+    units: int
+    purchase_price: int
+    sell_price: int
+    fuel: int
+    duration: int  # Seconds of flight
+    profit: float  # Expected credits, after fuel
+
+    @property
+    def profit_per_second(self) -> float:
+        return self.profit / self.duration
+
+
+class _Good:
+    """The markets of one trade good as flat columns, best price first.
+
+    For every buy market, the sell markets that pay more are a prefix of the sell
+    columns (`sell_rows`), and the expected margin of each of them is precomputed
+    (`weights`), so routes only add the parts that depend on the ship.
+    """
+
+    def __init__(
+        self, listings: list[tuple[int, MarketListing]], fuel: list[list[int]]
+    ) -> None:
+        # A price of 0 is no real offer, e.g. a listing restored without prices
+        buys = sorted(
+            (entry for entry in listings if entry[1].purchase_price > 0),
+            key=lambda entry: entry[1].purchase_price,
+        )
+        sells = sorted(listings, key=lambda entry: -entry[1].sell_price)
+
+        self.buy_waypoints: list[int] = [i for i, _ in buys]
+        self.buy_prices: list[int] = [listing.purchase_price for _, listing in buys]
+        self.buy_volumes: list[int] = [listing.trade_volume for _, listing in buys]
+        self.buy_factors: list[float] = [
+            BUY_SUPPLY_FACTOR[listing.supply] * ACTIVITY_FACTOR[listing.activity]
+            for _, listing in buys
+        ]
+
+        self.sell_waypoints: list[int] = [i for i, _ in sells]
+        self.sell_prices: list[int] = [listing.sell_price for _, listing in sells]
+        self.sell_volumes: list[int] = [listing.trade_volume for _, listing in sells]
+        self.sell_factors: list[float] = [
+            SELL_SUPPLY_FACTOR[listing.supply] * ACTIVITY_FACTOR[listing.activity]
+            for _, listing in sells
+        ]
+
+        # Per buy market, the prefix of the sell columns that pays more
+        descending = [-price for price in self.sell_prices]
+        counts = [bisect_left(descending, -price) for price in self.buy_prices]
+        self.sell_rows: list[list[int]] = [self.sell_waypoints[:n] for n in counts]
+        self.sell_volume_rows: list[list[int]] = [self.sell_volumes[:n] for n in counts]
+        self.weights: list[list[float]] = [
+            [
+                (sell_price - buy_price) * buy_factor * sell_factor
+                for sell_price, sell_factor in zip(
+                    self.sell_prices[:n], self.sell_factors[:n], strict=True
+                )
+            ]
+            for buy_price, buy_factor, n in zip(
+                self.buy_prices, self.buy_factors, counts, strict=True
+            )
+        ]
+        self.fuel_rows: list[list[int]] = [
+            [fuel[a][b] for b in sells]
+            for a, sells in zip(self.buy_waypoints, self.sell_rows, strict=True)
+        ]
+        # Per row bounds, to skip rows that cannot place before scoring them
+        self.max_weights: list[float] = [max(row, default=0.0) for row in self.weights]
+        self.min_fuel: list[int] = [min(row, default=0) for row in self.fuel_rows]
+        # speed -> flight times of the sell rows, and the shortest of each row
+        self.__time_rows: dict[int, tuple[list[list[int]], list[int]]] = {}
+
+    def time_rows(
+        self, speed: int, times: list[list[int]]
+    ) -> tuple[list[list[int]], list[int]]:
+        """The flight times of the sell rows and the shortest of each, at `speed`."""
+        if (cached := self.__time_rows.get(speed)) is None:
+            rows = [
+                [times[a][b] for b in sells]
+                for a, sells in zip(self.buy_waypoints, self.sell_rows, strict=True)
+            ]
+            cached = self.__time_rows[speed] = (rows, [min(row, default=0) for row in rows])
+        return cached
+
+
+class TradePlanner:
+    """Finds the most profitable trade routes between the markets of a set of waypoints.
+
+    Distances, fuel costs and flight times between all waypoints are computed once. Each
+    good keeps its markets as columns sorted by price, with the margin of every buy and
+    sell pair that pays precomputed. A route search scores the sell markets of each buy
+    market as whole columns, and picks the best of all of them at once. Price updates
+    only rebuild the columns of the goods they touch.
+
+    Only one transaction is assumed at each market, so at most the trade volume of both
+    markets is traded, at the listed prices.
+    """
+
+    def __init__(
+        self,
+        waypoints: Mapping[str, Coordinate],
+        mode: ShipNavFlightMode = ShipNavFlightMode.CRUISE,
+        fuel_price: float | None = None,
+    ) -> None:
+        """
+        Args:
+            waypoints: The coordinates of every waypoint routes may use.
+            mode: The flight mode of every leg.
+            fuel_price: Credits per unit of ship fuel. If not given, it is taken from the
+                cheapest market selling FUEL.
+        """
+        self.mode: ShipNavFlightMode = mode
+        self.__fuel_price: float | None = fuel_price
+
+        self.__symbols: list[str] = list(waypoints)
+        self.__index: dict[str, int] = {symbol: i for i, symbol in enumerate(self.__symbols)}
+        coordinates = list(waypoints.values())
+        self.__distances: list[list[float]] = [
+            [distance(a, b) for b in coordinates] for a in coordinates
+        ]
+        self.__fuel: list[list[int]] = [
+            [0 if i == j else fuel_cost(d, mode) for j, d in enumerate(row)]
+            for i, row in enumerate(self.__distances)
+        ]
+        self.__times: dict[int, list[list[int]]] = {}
+
+        # trade symbol -> waypoint index -> listing
+        self.__listings: dict[str, dict[int, MarketListing]] = {}
+        self.__goods: dict[str, _Good] = {}
+
+    def update(self, listings: Iterable[MarketListing]) -> None:
+        """Add or replace market listings, e.g. from `MarketIndex.listings()`."""
+        changed: set[str] = set()
+        for listing in listings:
+            if (i := self.__index.get(listing.waypoint_symbol)) is not None:
+                self.__listings.setdefault(listing.trade_symbol, {})[i] = listing
+                changed.add(listing.trade_symbol)
+
+        for trade_symbol in changed:
+            listings_by_waypoint = list(self.__listings[trade_symbol].items())
+            self.__goods[trade_symbol] = _Good(listings_by_waypoint, self.__fuel)
+
+    @property
+    def fuel_price(self) -> float:
+        """Credits per unit of ship fuel."""
+        if self.__fuel_price is not None:
+            return self.__fuel_price
+        if (fuel := self.__goods.get(FUEL_SYMBOL)) is not None:
+            return fuel.buy_prices[0] / FUEL_PER_UNIT
+        return 0.0
+
+    def routes(self, ship: TradeShip, k: int = 5) -> list[TradeRoute]:
+        """The `k` routes with the most expected profit per second for `ship`, best first."""
+        start = self.__index.get(ship.waypoint_symbol)
+        if start is None or ship.cargo_space <= 0:
+            return []
+
+        times = self.__flight_times(ship.speed)
+        needs_fuel = ship.fuel_capacity > 0
+        fuel = self.__fuel if needs_fuel else None
+        fuel_price = self.fuel_price if needs_fuel else 0.0
+        refuel = self.__goods.get(FUEL_SYMBOL)
+        refuel_at = set(refuel.buy_waypoints) if refuel is not None else set()
+
+        # (score, tiebreak, row, column) of the k best candidates, worst first
+        best: list[tuple[float, int, int, int]] = []
+        rows: list[tuple[str, int, int, list[int], list[int], list[int], list[float]]] = []
+        count = 0
+        for trade_symbol, good in self.__goods.items():
+            time_rows, min_times = good.time_rows(ship.speed, times)
+            for (
+                a, buy_price, buy_volume, sells, volumes, weights, max_weight,
+                fuel_row, min_fuel, time_row, min_time,
+            ) in zip(
+                good.buy_waypoints,
+                good.buy_prices,
+                good.buy_volumes,
+                good.sell_rows,
+                good.sell_volume_rows,
+                good.weights,
+                good.max_weights,
+                good.fuel_rows,
+                good.min_fuel,
+                time_rows,
+                min_times,
+                strict=True,
+            ):  # fmt: skip
+                # Buy prices only rise from here, so no later market pays more either
+                if not sells:
+                    break
+
+                units = min(ship.cargo_space, buy_volume)
+                if ship.credit_limit is not None:
+                    units = min(units, ship.credit_limit // buy_price)
+                if units <= 0:
+                    continue
+
+                fuel_to_a = fuel[start][a] if fuel is not None else 0
+                if fuel_to_a > ship.fuel:
+                    continue
+                fuel_at_a = ship.fuel_capacity if a in refuel_at else ship.fuel - fuel_to_a
+                if fuel is not None and min_fuel > fuel_at_a:
+                    continue
+
+                # Skip the row if even its best margin over its shortest flight cannot place
+                time_to_a = times[start][a]
+                floor = best[0][0] if len(best) == k else 0.0
+                if units * max_weight <= floor * (time_to_a + min_time):
+                    continue
+
+                # Score every sell market of the row at once
+                n = len(sells)
+                fuel_to_b = fuel_row if fuel is not None else [0] * n
+                used = list(map(fuel_to_a.__add__, fuel_to_b))
+                traded = list(map(min, repeat(units, n), volumes))
+                profits = list(map(sub, map(mul, traded, weights), map(fuel_price.__mul__, used)))
+                durations = list(map(time_to_a.__add__, time_row))
+                scores = list(map(truediv, profits, durations))
+                if max(scores) <= floor:
+                    continue
+
+                row = len(rows)
+                rows.append((trade_symbol, a, buy_price, traded, used, durations, profits))
+                for column in compress(range(n), map(floor.__lt__, scores)):
+                    if sells[column] == a or fuel_to_b[column] > fuel_at_a:
+                        continue
+                    if profits[column] <= 0:
+                        continue
+                    entry = (scores[column], count, row, column)
+                    count += 1
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        _ = heapq.heapreplace(best, entry)
+
+        routes: list[TradeRoute] = []
+        for _, _, row, column in sorted(best, reverse=True):
+            trade_symbol, a, buy_price, traded, used, durations, profits = rows[row]
+            good = self.__goods[trade_symbol]
+            routes.append(
+                TradeRoute(
+                    ship_symbol=ship.symbol,
+                    trade_symbol=trade_symbol,
+                    buy_waypoint_symbol=self.__symbols[a],
+                    sell_waypoint_symbol=self.__symbols[good.sell_waypoints[column]],
+                    units=traded[column],
+                    purchase_price=buy_price,
+                    sell_price=good.sell_prices[column],
+                    fuel=used[column],
+                    duration=durations[column],
+                    profit=profits[column],
+                )
+            )
+        return routes
+
+    def plan(self, ships: Iterable[TradeShip], k: int = 5) -> dict[str, TradeRoute | None]:
+        """Assign every ship its best route, so that no two ships buy the same good at the
+        same market.
+
+        The considered routes are the `k` best of every ship, and the best remaining route
+        overall is assigned first.
+        """
+        ships = list(ships)
+        candidates = sorted(
+            (route for ship in ships for route in self.routes(ship, k)),
+            key=lambda route: route.profit_per_second,
+            reverse=True,
+        )
+
+        assigned: dict[str, TradeRoute | None] = dict.fromkeys(ship.symbol for ship in ships)
+        taken: set[tuple[str, str]] = set()
+        for route in candidates:
+            key = (route.trade_symbol, route.buy_waypoint_symbol)
+            if assigned[route.ship_symbol] is None and key not in taken:
+                assigned[route.ship_symbol] = route
+                taken.add(key)
+        return assigned
+
+    def __flight_times(self, speed: int) -> list[list[int]]:
+        if (times := self.__times.get(speed)) is None:
+            times = self.__times[speed] = [
+                [0 if i == j else flight_time(d, speed, self.mode) for j, d in enumerate(row)]
+                for i, row in enumerate(self.__distances)
+            ]
+        return times
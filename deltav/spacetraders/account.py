@@ -11,7 +11,7 @@ from deltav.spacetraders.api.error import SpaceTradersAPIError
 from deltav.spacetraders.api.request import SpaceTradersAPIRequest
 from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
 from deltav.spacetraders.models.account import AccountShape, MyAccountShape
-from deltav.store.db import Session
+from deltav.store.db import writer
 from deltav.store.db.account import AccountRecord
 
 if TYPE_CHECKING:
@@ -132,11 +132,13 @@ class Account:
         return cls._ACCOUNTS.get(account_id, None)
 
     def __update_db(self, data: AccountShape | None = None) -> None:
-        account = AccountRecord(
-            account_id=self.id, created_at=self.created_at, email=self.email, token=self.token
-        )
-
-        with Session() as session:
-            session.add(account)
+        account = {
+            'account_id': self.id,
+            'created_at': self.created_at,
+            'email': self.email,
+            'token': str(self.token),
+            'updated_at': datetime.now(tz=UTC),
+        }
+        writer.upsert(AccountRecord.__table__, [account], key=['token'])
 
     def __update_db_from_shape(self, data: MyAccountShape) -> None: ...
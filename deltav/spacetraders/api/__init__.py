@@ -6,3 +6,6 @@ SPACETRADERS_API_URL: str = f'{BASE_URL}/{VERSION}'
 
 DEFAULT_PAGE_LIMIT = 10
 MAX_PAGE_LIMIT = 20
+
+# One full burst plus the sustained rate, any more would only queue on the ratelimit
+MAX_CONCURRENT_PAGES = 32
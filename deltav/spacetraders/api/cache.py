@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from time import time
+from typing import TYPE_CHECKING
+
+import httpx
+from loguru import logger
+
+if TYPE_CHECKING:
+    from datetime import timedelta
+    from pathlib import Path
+
+DEFAULT_MAX_ENTRIES: int = 4096
+CACHE_FILE_NAME: str = 'responses.db'
+# Headers describing the body as it was sent, the cached content is already decoded
+ENCODING_HEADERS: frozenset[str] = frozenset({'content-encoding', 'content-length'})
+
+
+def decoded_headers(headers: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """`headers` without the ones that no longer hold for the decoded content."""
+    return [(name, value) for name, value in headers if name.lower() not in ENCODING_HEADERS]
+
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    headers: list[tuple[str, str]]
+    content: bytes
+    expires: float
+
+    @property
+    def is_expired(self) -> bool:
+        return time() >= self.expires
+
+    def to_response(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            self.status_code, headers=self.headers, content=self.content, request=request
+        )
+
+
+class ResponseCache:
+    """A cache of successful responses from endpoints that declare a `cache_ttl`.
+
+    Entries are kept in an in-memory LRU of at most `max_entries` responses and, if a
+    directory is configured, written through to an SQLite file so they survive restarts.
+    Raw responses are cached rather than parsed ones, so every hit is parsed into a new
+    `SpaceTradersAPIResponse` that callers are free to modify.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, directory: Path | None = None):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+        self.__max_entries: int = max_entries
+        self.__memory: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.__disk: sqlite3.Connection | None = None
+        self.configure(max_entries, directory)
+
+    def configure(self, max_entries: int, directory: Path | None = None) -> None:
+        """Resize the in-memory tier and (re)open the on-disk tier in `directory`, if any."""
+        with self.__lock:
+            self.__max_entries = max_entries
+            self.__evict()
+
+            if self.__disk is not None:
+                self.__disk.close()
+                self.__disk = None
+
+            if directory is not None:
+                directory.mkdir(parents=True, exist_ok=True)
+                self.__disk = sqlite3.connect(directory / CACHE_FILE_NAME, check_same_thread=False)
+                _ = self.__disk.execute(
+                    'CREATE TABLE IF NOT EXISTS responses ('
+                    'key TEXT PRIMARY KEY, expires REAL, status INTEGER, headers TEXT, content BLOB'
+                    ')'
+                )
+
+    @staticmethod
+    def key(req: httpx.Request) -> str:
+        """The cache key of a request, its method, path and sorted query parameters."""
+        params = sorted(req.url.params.multi_items())
+        return f'{req.method} {req.url.copy_with(params=params)}'
+
+    def get(self, req: httpx.Request) -> httpx.Response | None:
+        """The cached response to `req`, or None if there is no fresh entry."""
+        key = ResponseCache.key(req)
+        with self.__lock:
+            entry = self.__memory.get(key)
+            if entry is None:
+                entry = self.__load(key)
+                if entry is not None:
+                    self.__memory[key] = entry
+                    self.__evict()
+
+            if entry is None or entry.is_expired:
+                if entry is not None:
+                    self.__remove(key)
+                self.misses += 1
+                return None
+
+            self.__memory.move_to_end(key)
+            self.hits += 1
+
+        logger.debug(f'Cache hit for {req.url}')
+        return entry.to_response(req)
+
+    def put(self, req: httpx.Request, res: httpx.Response, ttl: timedelta) -> None:
+        """Cache `res` as the response to `req` for `ttl`."""
+        key = ResponseCache.key(req)
+        entry = CachedResponse(
+            status_code=res.status_code,
+            headers=decoded_headers(res.headers.multi_items()),
+            content=res.content,
+            expires=time() + ttl.total_seconds(),
+        )
+
+        with self.__lock:
+            self.__memory[key] = entry
+            self.__memory.move_to_end(key)
+            self.__evict()
+            self.__store(key, entry)
+
+    def clear(self) -> None:
+        """Drop every cached response, e.g. after the server has been reset."""
+        with self.__lock:
+            self.__memory.clear()
+            if self.__disk is not None:
+                with self.__disk:
+                    _ = self.__disk.execute('DELETE FROM responses')
+
+    def __len__(self) -> int:
+        return len(self.__memory)
+
+    def __evict(self) -> None:
+        while len(self.__memory) > self.__max_entries:
+            _ = self.__memory.popitem(last=False)
+
+    def __remove(self, key: str) -> None:
+        _ = self.__memory.pop(key, None)
+        if self.__disk is not None:
+            with self.__disk:
+                _ = self.__disk.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def __load(self, key: str) -> CachedResponse | None:
+        if self.__disk is None:
+            return None
+
+        row = self.__disk.execute(
+            'SELECT status, headers, content, expires FROM responses WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        status, headers, content, expires = row
+        return CachedResponse(
+            status_code=status,
+            headers=[tuple(header) for header in json.loads(headers)],
+            content=content,
+            expires=expires,
+        )
+
+    def __store(self, key: str, entry: CachedResponse) -> None:
+        if self.__disk is None:
+            return
+
+        with self.__disk:
+            _ = self.__disk.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                (key, entry.expires, entry.status_code, json.dumps(entry.headers), entry.content),
+            )
@@ -1,46 +1,267 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from copy import copy
+from importlib.util import find_spec
+from itertools import count, islice
 from time import sleep
-from typing import TypeVar
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import httpx
 from loguru import logger
+from pydantic import ValidationError
 
+from deltav.config.config import DeltavConfig
+from deltav.spacetraders.api.cache import ResponseCache
+from deltav.spacetraders.api.dispatcher import BudgetDispatcher
 from deltav.spacetraders.api.error import SpaceTradersAPIError
 from deltav.spacetraders.api.ratelimit import Ratelimit
 from deltav.spacetraders.api.request import SpaceTradersAPIRequest
 from deltav.spacetraders.api.response import SpaceTradersAPIResponse
-from deltav.spacetraders.models import SpaceTradersAPIResShape, merge_models
+from deltav.spacetraders.api.retry import log_retry, retry_delay
+from deltav.spacetraders.api.scheduler import RequestScheduler
+from deltav.spacetraders.api.singleflight import AsyncSingleFlight, SingleFlight
+from deltav.spacetraders.models import SpaceTradersAPIResShape, concat_models, paged_field
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Iterable, Iterator
+
+    from deltav.config.config import StAccountConfig
 
 T = TypeVar('T', bound=SpaceTradersAPIResShape)
 
+# Failures of a single page that are recorded as page errors instead of ending the crawl
+PAGE_EXCEPTIONS = (httpx.TransportError, ValidationError)
+
+
+def httpx_request(req: SpaceTradersAPIRequest[T], page: int | None = None) -> httpx.Request:
+    """Construct the httpx request for a SpaceTraders API request, optionally for a given page."""
+    if page is not None:
+        req = copy(req)
+        req._current_page = page  # noqa: SLF001  # pyright: ignore[reportPrivateUsage]
+
+    timeout = httpx.Timeout(req.timeout_response, connect=req.timeout_connect)
+    return httpx.Request(
+        method=req.endpoint.method,
+        headers=req.headers,
+        url=req.url,
+        json=req.json_data,
+        params=req.params,
+        extensions={'timeout': timeout.as_dict()},
+    )
+
+
+def flight_key(req: httpx.Request) -> str | None:
+    """The key under which identical in-flight requests are coalesced, None if they must not be.
+
+    Only GET requests are coalesced. The token is part of the key, so responses are
+    never shared between agents.
+    """
+    if req.method != 'GET':
+        return None
+    return f'{ResponseCache.key(req)} {req.headers.get("Authorization", "")}'
+
+
+def http_client_options(config: DeltavConfig) -> dict[str, Any]:
+    """The connection pool options shared by the sync and async httpx clients."""
+    http2 = config.http2
+    if http2 and find_spec('h2') is None:
+        logger.warning('HTTP/2 requires the deltav[http2] extra, falling back to HTTP/1.1')
+        http2 = False
+
+    return {
+        'http2': http2,
+        'proxy': config.proxy,
+        'limits': httpx.Limits(
+            max_connections=config.http_max_connections,
+            max_keepalive_connections=config.http_max_keepalive_connections,
+            keepalive_expiry=config.http_keepalive_expiry,
+        ),
+    }
+
+
+def handle_response(
+    res: httpx.Response, req: SpaceTradersAPIRequest[T]
+) -> SpaceTradersAPIResponse[T] | SpaceTradersAPIError:
+    if res.status_code >= 300:
+        logger.error(res.status_code)
+        return SpaceTradersAPIError(res)
+
+    logger.success(res.status_code)
+    return SpaceTradersAPIResponse[T](req.endpoint, res)
+
+
+def remaining_pages(
+    req: SpaceTradersAPIRequest[T], first: SpaceTradersAPIResponse[T] | SpaceTradersAPIError
+) -> list[int]:
+    """The pages still to be fetched for an `all_pages()` request after fetching page 1."""
+    if not isinstance(first, SpaceTradersAPIResponse):
+        msg = 'Aborting since initial request failed'
+        raise RuntimeError(msg)
+
+    if first.meta is not None:
+        req.total_items = first.meta.total
+
+    return list(range(2, req.total_pages + 1))
+
+
+def page_items(
+    page: int, res: SpaceTradersAPIResponse[T] | SpaceTradersAPIError
+) -> list[SpaceTradersAPIResShape]:
+    """The items of one page of a paged list shape, or the whole model for any other shape."""
+    if isinstance(res, SpaceTradersAPIError):
+        logger.warning(f'Skipping items of page {page}, failed with {res.code}')
+        return []
+
+    name = paged_field(type(res.data))
+    return [res.data] if name is None else getattr(res.data, name)
+
+
+def merge_responses(
+    responses: list[tuple[int, SpaceTradersAPIResponse[T] | SpaceTradersAPIError]],
+) -> SpaceTradersAPIResponse[T] | SpaceTradersAPIError:
+    """Merge the pages of a paged request in page order.
+
+    Failed pages are recorded in `page_errors` of the returned response. If every page
+    failed, the error for the first page is returned.
+    """
+    responses = sorted(responses, key=lambda response: response[0])
+    page_errors: dict[int, SpaceTradersAPIError] = {}
+
+    pages: list[SpaceTradersAPIResponse[T]] = []
+    for page, res in responses:
+        if isinstance(res, SpaceTradersAPIError):
+            page_errors[page] = res
+        else:
+            pages.append(res)
+
+    if not pages:
+        return responses[0][1]
+
+    # Page responses may be shared with coalesced requests, so never modify them
+    ret = copy(pages[0])
+    if len(pages) > 1:
+        ret.data = concat_models([res.data for res in pages])
+
+    if page_errors:
+        logger.warning(f'Failed to fetch pages {list(page_errors)} of {len(responses)}')
+    ret.page_errors = page_errors
+    return ret
+
 
 class SpaceTradersAPIClient:
-    """Client that handles sending requests to the SpaceTraders API."""
+    """Client that handles sending requests to the SpaceTraders API.
 
-    http_client: httpx.Client = httpx.Client()
+    The connection pool is created by `configure()`, or with the default HTTP settings
+    by the first request sent without it.
+    """
+
+    http_client: httpx.Client | None = None
     ratelimit: Ratelimit = Ratelimit()
+    scheduler: RequestScheduler = RequestScheduler(ratelimit)
+    cache: ResponseCache = ResponseCache()
+    flights: SingleFlight = SingleFlight()
+    dispatcher: BudgetDispatcher = BudgetDispatcher()
+    __lock: threading.Lock = threading.Lock()
+
+    def __init__(
+        self, config: DeltavConfig | None = None, accounts: Iterable[StAccountConfig] = ()
+    ) -> None:
+        if config is not None:
+            SpaceTradersAPIClient.configure(config, accounts)
+
+    @classmethod
+    def configure(cls, config: DeltavConfig, accounts: Iterable[StAccountConfig] = ()) -> None:
+        """Replace the connection pool with one using the HTTP settings of `config`.
+
+        Every account in `accounts` gets its own ratelimit budget, which is shared with
+        `AsyncSpaceTradersAPIClient`. Requests made with any other token, or without a
+        token, use the default budget. Only the sync connection pools of the replaced
+        budgets can be closed here, the async ones are closed by
+        `AsyncSpaceTradersAPIClient.configure()`.
+        """
+        options = http_client_options(config)
+        with cls.__lock:
+            old, cls.http_client = cls.http_client, httpx.Client(**options)
+        if old is not None:
+            old.close()
+        cls.cache.configure(config.cache_max_entries, config.cache_directory)
+        cls.dispatcher.close()
+        cls.dispatcher.configure(accounts, options, config.proxy)
+
+    @classmethod
+    def close(cls) -> None:
+        with cls.__lock:
+            old, cls.http_client = cls.http_client, None
+        if old is not None:
+            old.close()
+        cls.dispatcher.close()
 
-    def __init__(self) -> None:
-        SpaceTradersAPIClient.http_client = httpx.Client()
+    @classmethod
+    def __default_client(cls) -> httpx.Client:
+        if (http_client := cls.http_client) is not None:
+            return http_client
+        with cls.__lock:
+            if cls.http_client is None:
+                cls.http_client = httpx.Client(**http_client_options(DeltavConfig()))
+            return cls.http_client
+
+    @classmethod
+    def __route(cls, req: SpaceTradersAPIRequest[T]) -> tuple[httpx.Client, RequestScheduler]:
+        """The connection pool and scheduler of the budget `req` is sent with."""
+        if (budget := cls.dispatcher.route(req)) is not None:
+            return budget.http_client, budget.scheduler
+        return cls.__default_client(), cls.scheduler
 
     @classmethod
     def __call(
         cls, _req: httpx.Request, req: SpaceTradersAPIRequest[T]
     ) -> SpaceTradersAPIResponse[T] | SpaceTradersAPIError:
-        # QUESTION: How to handle partial success for paged requests
         # TODO: Log the request and response properly
 
-        logger.info(f'Requesting {_req.url}')
-        res = cls.http_client.send(_req)
+        ttl = req.endpoint.cache_ttl
+        if ttl is not None and not req.bypass_cache:
+            # Cache hits are served without taking a ratelimit slot
+            if (cached := cls.cache.get(_req)) is not None:
+                return handle_response(cached, req)
+
+        if (key := flight_key(_req)) is not None:
+            return cls.flights.do(key, lambda: cls.__send(_req, req))
+        return cls.__send(_req, req)
 
-        if res.status_code >= 300:
-            logger.error(res.status_code)
-            return SpaceTradersAPIError(res)
+    @classmethod
+    def __send(
+        cls, _req: httpx.Request, req: SpaceTradersAPIRequest[T]
+    ) -> SpaceTradersAPIResponse[T] | SpaceTradersAPIError:
+        ttl = req.endpoint.cache_ttl
+        http_client, scheduler = cls.__route(req)
+        for attempt in count():
+            scheduler.acquire(req.priority)
+            logger.info(f'Requesting {_req.url}')
+            try:
+                res = http_client.send(_req)
+            except httpx.TransportError as e:
+                if (delay := retry_delay(req, attempt, e)) is None:
+                    raise
+                log_retry(_req.url, delay, attempt + 1, req.retries)
+                sleep(delay)
+                continue
+
+            scheduler.ratelimit.update_from_headers(res.headers)
+            ret = handle_response(res, req)
+            if isinstance(ret, SpaceTradersAPIResponse):
+                if ttl is not None:
+                    cls.cache.put(_req, res, ttl)
+                return ret
+            if (delay := retry_delay(req, attempt, ret)) is None:
+                return ret
+            log_retry(_req.url, delay, attempt + 1, req.retries)
+            sleep(delay)
 
-        logger.success(res.status_code)
-        return SpaceTradersAPIResponse[T](req.endpoint, res)
+        raise AssertionError  # unreachable, count() never ends
 
     # FIX: REALLY BAD, probably need to refactor SpaceTradersAPIResponse
     @classmethod
@@ -56,55 +277,243 @@ class SpaceTradersAPIClient:
             ValidationError: If the actual response does not conform to the
             pydantic model specification.
         """
-        requests: list[tuple[int, httpx.Request]] = []
-        responses: list[tuple[int, SpaceTradersAPIResponse[T] | SpaceTradersAPIError]] = []
-
-        def httpx_request(req: SpaceTradersAPIRequest[T], page: int | None = None) -> httpx.Request:
-            if page is not None:
-                req = copy(req)
-                req._current_page = page  # noqa: SLF001  # pyright: ignore[reportPrivateUsage]
-
-            return httpx.Request(
-                method=req.endpoint.method,
-                headers=req.headers,
-                url=req.url,
-                json=req.json_data,
-                params=req.params,
-            )
+        if not req.is_paged:
+            return cls.__call(httpx_request(req), req)
+
+        return merge_responses(list(cls.iter_pages(req)))
 
-        if req.is_paged and req.all_pages:
-            res = cls.__call(httpx_request(req, page=1), req)
-            responses.append((1, res))
-            if isinstance(res, SpaceTradersAPIResponse):
-                if res.meta is not None:
-                    req.total_items = res.meta.total
-
-                for i in range(req.total_pages - 1):
-                    page = i + 2
-                    requests.append((page, httpx_request(req, page)))
-            else:
-                msg = 'Aborting since initial request failed'
-                raise RuntimeError(msg)
-        elif req.is_paged and not req.all_pages:
-            for page in range(req.start_page, req.end_page + 1):
-                requests.append((page, httpx_request(req, page)))
+    @classmethod
+    def iter_pages(
+        cls, req: SpaceTradersAPIRequest[T]
+    ) -> Iterator[tuple[int, SpaceTradersAPIResponse[T] | SpaceTradersAPIError]]:
+        """Call a SpaceTraders API endpoint, yielding each page as soon as it arrives.
+
+        Pages are yielded in page order as `(page, response)`. At most `concurrent_pages`
+        pages are held at once, regardless of how many pages there are in total. A page
+        that failed with a transport error or an invalid response is yielded as a
+        `SpaceTradersAPIError`, and the remaining pages are still fetched.
+        """
+        if not req.is_paged:
+            yield 1, cls.__call(httpx_request(req), req)
+            return
+
+        if req.all_pages:
+            first = cls.__call(httpx_request(req, page=1), req)
+            yield 1, first
+            pages = remaining_pages(req, first)
         else:
-            return cls.__call(httpx_request(req), req)
+            pages = list(range(req.start_page, req.end_page + 1))
 
-        for page, _req in requests:
-            responses.append((page, cls.__call(_req, req)))
-            sleep(0.5)
+        yield from cls.__call_pages(req, pages)
 
-        ret: SpaceTradersAPIResponse[T] | None = None
-        for _, res in responses:
-            if isinstance(res, SpaceTradersAPIResponse):
-                if ret is None:
-                    ret = res
-                    continue
+    @classmethod
+    def iter_items(cls, req: SpaceTradersAPIRequest[T]) -> Iterator[SpaceTradersAPIResShape]:
+        """Call a SpaceTraders API endpoint, yielding the items of each page as it arrives.
 
-                ret.data = merge_models(ret.data, res.data)
+        For paged list shapes (e.g. `SystemsShape`) every item of the list is yielded,
+        for any other shape the whole model is. Failed pages are logged and skipped,
+        use `iter_pages()` to handle them.
+        """
+        for page, res in cls.iter_pages(req):
+            yield from page_items(page, res)
+
+    @classmethod
+    def __call_pages(
+        cls, req: SpaceTradersAPIRequest[T], pages: list[int]
+    ) -> Iterator[tuple[int, SpaceTradersAPIResponse[T] | SpaceTradersAPIError]]:
+        def call_page(page: int) -> tuple[int, SpaceTradersAPIResponse[T] | SpaceTradersAPIError]:
+            _req = httpx_request(req, page)
+            try:
+                return page, cls.__call(_req, req)
+            except PAGE_EXCEPTIONS as e:
+                return page, SpaceTradersAPIError.from_exception(_req, e)
+
+        if req.concurrent_pages == 1 or len(pages) <= 1:
+            yield from map(call_page, pages)
+            return
+
+        pending = iter(pages)
+        with ThreadPoolExecutor(max_workers=req.concurrent_pages) as pool:
+            window = deque(
+                pool.submit(call_page, page) for page in islice(pending, req.concurrent_pages)
+            )
+            while window:
+                res = window.popleft().result()
+                if (page := next(pending, None)) is not None:
+                    window.append(pool.submit(call_page, page))
+                yield res
+
+
+class AsyncSpaceTradersAPIClient:
+    """Asynchronous client that handles sending requests to the SpaceTraders API.
+
+    All requests share one connection pool, and the ratelimit budgets and request
+    schedulers are shared with `SpaceTradersAPIClient`, so any number of concurrent
+    callers stay within the same budgets. The connection pool is created like the one of
+    `SpaceTradersAPIClient`.
+    """
+
+    http_client: httpx.AsyncClient | None = None
+    ratelimit: Ratelimit = SpaceTradersAPIClient.ratelimit
+    scheduler: RequestScheduler = SpaceTradersAPIClient.scheduler
+    cache: ResponseCache = SpaceTradersAPIClient.cache
+    flights: AsyncSingleFlight = AsyncSingleFlight()
+    dispatcher: BudgetDispatcher = SpaceTradersAPIClient.dispatcher
+
+    @classmethod
+    async def configure(
+        cls, config: DeltavConfig, accounts: Iterable[StAccountConfig] = ()
+    ) -> None:
+        """Replace the connection pool with one using the HTTP settings of `config`.
+
+        Like `SpaceTradersAPIClient.configure()`, but also closes the async connection
+        pools of the replaced account budgets.
+        """
+        options = http_client_options(config)
+        old, cls.http_client = cls.http_client, httpx.AsyncClient(**options)
+        if old is not None:
+            await old.aclose()
+        cls.cache.configure(config.cache_max_entries, config.cache_directory)
+        await cls.dispatcher.aclose()
+        cls.dispatcher.close()
+        cls.dispatcher.configure(accounts, options, config.proxy)
+
+    @classmethod
+    async def aclose(cls) -> None:
+        old, cls.http_client = cls.http_client, None
+        if old is not None:
+            await old.aclose()
+        await cls.dispatcher.aclose()
+
+    @classmethod
+    def __route(
+        cls, req: SpaceTradersAPIRequest[T]
+    ) -> tuple[httpx.AsyncClient, RequestScheduler]:
+        """The connection pool and scheduler of the budget `req` is sent with."""
+        if (budget := cls.dispatcher.route(req)) is not None:
+            return budget.async_http_client, budget.scheduler
+        if cls.http_client is None:
+            cls.http_client = httpx.AsyncClient(**http_client_options(DeltavConfig()))
+        return cls.http_client, cls.scheduler
+
+    @classmethod
+    async def __call(
+        cls, _req: httpx.Request, req: SpaceTradersAPIRequest[T]
+    ) -> SpaceTradersAPIResponse[T] | SpaceTradersAPIError:
+        ttl = req.endpoint.cache_ttl
+        if ttl is not None and not req.bypass_cache:
+            # Cache hits are served without taking a ratelimit slot
+            if (cached := cls.cache.get(_req)) is not None:
+                return handle_response(cached, req)
+
+        if (key := flight_key(_req)) is not None:
+            return await cls.flights.do(key, lambda: cls.__send(_req, req))
+        return await cls.__send(_req, req)
+
+    @classmethod
+    async def __send(
+        cls, _req: httpx.Request, req: SpaceTradersAPIRequest[T]
+    ) -> SpaceTradersAPIResponse[T] | SpaceTradersAPIError:
+        ttl = req.endpoint.cache_ttl
+        http_client, scheduler = cls.__route(req)
+        for attempt in count():
+            await scheduler.acquire_async(req.priority)
+            logger.info(f'Requesting {_req.url}')
+            try:
+                res = await http_client.send(_req)
+            except httpx.TransportError as e:
+                if (delay := retry_delay(req, attempt, e)) is None:
+                    raise
+                log_retry(_req.url, delay, attempt + 1, req.retries)
+                await asyncio.sleep(delay)
+                continue
 
-        if ret is None:
-            return responses[0][1]
+            scheduler.ratelimit.update_from_headers(res.headers)
+            ret = handle_response(res, req)
+            if isinstance(ret, SpaceTradersAPIResponse):
+                if ttl is not None:
+                    cls.cache.put(_req, res, ttl)
+                return ret
+            if (delay := retry_delay(req, attempt, ret)) is None:
+                return ret
+            log_retry(_req.url, delay, attempt + 1, req.retries)
+            await asyncio.sleep(delay)
+
+        raise AssertionError  # unreachable, count() never ends
+
+    @classmethod
+    async def call(
+        cls, req: SpaceTradersAPIRequest[T]
+    ) -> SpaceTradersAPIResponse[T] | SpaceTradersAPIError:
+        """Call a SpaceTraders API endpoint by passing a request object.
+
+        Mirrors `SpaceTradersAPIClient.call()`, but yields to the event loop while
+        waiting on the ratelimit and the network.
+
+        Args:
+            req: The request object used to construct the API call.
+
+        Raises:
+            ValidationError: If the actual response does not conform to the
+            pydantic model specification.
+        """
+        if not req.is_paged:
+            return await cls.__call(httpx_request(req), req)
+
+        return merge_responses([res async for res in cls.iter_pages(req)])
+
+    @classmethod
+    async def iter_pages(
+        cls, req: SpaceTradersAPIRequest[T]
+    ) -> AsyncIterator[tuple[int, SpaceTradersAPIResponse[T] | SpaceTradersAPIError]]:
+        """Asynchronous variant of `SpaceTradersAPIClient.iter_pages()`."""
+        if not req.is_paged:
+            yield 1, await cls.__call(httpx_request(req), req)
+            return
+
+        if req.all_pages:
+            first = await cls.__call(httpx_request(req, page=1), req)
+            yield 1, first
+            pages = remaining_pages(req, first)
+        else:
+            pages = list(range(req.start_page, req.end_page + 1))
+
+        async for res in cls.__call_pages(req, pages):
+            yield res
+
+    @classmethod
+    async def iter_items(
+        cls, req: SpaceTradersAPIRequest[T]
+    ) -> AsyncIterator[SpaceTradersAPIResShape]:
+        """Asynchronous variant of `SpaceTradersAPIClient.iter_items()`."""
+        async for page, res in cls.iter_pages(req):
+            for item in page_items(page, res):
+                yield item
+
+    @classmethod
+    async def __call_pages(
+        cls, req: SpaceTradersAPIRequest[T], pages: list[int]
+    ) -> AsyncIterator[tuple[int, SpaceTradersAPIResponse[T] | SpaceTradersAPIError]]:
+        async def call_page(
+            page: int,
+        ) -> tuple[int, SpaceTradersAPIResponse[T] | SpaceTradersAPIError]:
+            _req = httpx_request(req, page)
+            try:
+                return page, await cls.__call(_req, req)
+            except PAGE_EXCEPTIONS as e:
+                return page, SpaceTradersAPIError.from_exception(_req, e)
 
-        return ret
+        pending = iter(pages)
+        window = deque(
+            asyncio.create_task(call_page(page))
+            for page in islice(pending, req.concurrent_pages)
+        )
+        try:
+            while window:
+                res = await window.popleft()
+                if (page := next(pending, None)) is not None:
+                    window.append(asyncio.create_task(call_page(page)))
+                yield res
+        finally:
+            for task in window:
+                _ = task.cancel()
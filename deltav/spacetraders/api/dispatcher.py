@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from loguru import logger
+
+from deltav.config.config import Config
+from deltav.spacetraders.api.ratelimit import Ratelimit
+from deltav.spacetraders.api.scheduler import RequestScheduler
+from deltav.spacetraders.token import AccountToken, AgentToken
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from deltav.config.config import StAccountConfig
+    from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+
+
+class RateBudget:
+    """The ratelimit of one account, and the connections used to spend it."""
+
+    def __init__(
+        self, name: str, http_client: httpx.Client, async_http_client: httpx.AsyncClient
+    ) -> None:
+        self.name: str = name
+        self.http_client: httpx.Client = http_client
+        self.async_http_client: httpx.AsyncClient = async_http_client
+        self.ratelimit: Ratelimit = Ratelimit()
+        self.scheduler: RequestScheduler = RequestScheduler(self.ratelimit)
+
+
+class BudgetDispatcher:
+    """Routes requests made with an account's tokens to that account's `RateBudget`.
+
+    SpaceTraders limits every account separately, and every IP address when proxied, so
+    each configured account gets its own ratelimit and request scheduler. Accounts that
+    use the same proxy share one connection pool. Requests without a token, or with a
+    token of an account that is not configured, are not routed and use the client's
+    default budget.
+    """
+
+    def __init__(self) -> None:
+        self.__lock: threading.Lock = threading.Lock()
+        self.__budgets: dict[str, RateBudget] = {}
+        self.__pools: dict[str | None, tuple[httpx.Client, httpx.AsyncClient]] = {}
+        self.__routes: dict[str, RateBudget | None] = {}
+
+    @property
+    def budgets(self) -> dict[str, RateBudget]:
+        return dict(self.__budgets)
+
+    def configure(
+        self,
+        accounts: Iterable[StAccountConfig],
+        client_options: dict[str, Any],
+        default_proxy: str | None = None,
+    ) -> None:
+        """Create a budget for every account, replacing any existing budgets.
+
+        The connection pools of the replaced budgets are not closed, use `close()` and
+        `aclose()` first.
+        """
+        budgets: dict[str, RateBudget] = {}
+        pools: dict[str | None, tuple[httpx.Client, httpx.AsyncClient]] = {}
+        for account in accounts:
+            proxy = account.proxy or default_proxy
+            if proxy not in pools:
+                options = client_options | {'proxy': proxy}
+                pools[proxy] = (httpx.Client(**options), httpx.AsyncClient(**options))
+
+            budgets[account.nickname] = RateBudget(account.nickname, *pools[proxy])
+            logger.debug(f'Created rate budget for account {account.nickname} (proxy: {proxy})')
+
+        with self.__lock:
+            self.__budgets = budgets
+            self.__pools = pools
+            self.__routes.clear()
+
+    def route(self, req: SpaceTradersAPIRequest[Any]) -> RateBudget | None:
+        """The budget to spend on `req`, or None to use the default budget."""
+        token = req.token
+        if token is None or not self.__budgets:
+            return None
+
+        with self.__lock:
+            if token.encoded in self.__routes:
+                return self.__routes[token.encoded]
+
+        match token:
+            case AgentToken():
+                account = Config.get_account_from_agent_token(token)
+            case AccountToken():
+                account = Config.get_account_from_token(token)
+
+        budget = None if account is None else self.__budgets.get(account.nickname)
+        with self.__lock:
+            self.__routes[token.encoded] = budget
+        return budget
+
+    def close(self) -> None:
+        for http_client, _ in self.__pools.values():
+            http_client.close()
+
+    async def aclose(self) -> None:
+        for _, async_http_client in self.__pools.values():
+            await async_http_client.aclose()
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from http import HTTPStatus
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from httpx import Response
 from loguru import logger
@@ -10,30 +10,72 @@ from pydantic import ValidationError
 from deltav.spacetraders.enums.error import SpaceTradersAPIErrorCodes
 from deltav.spacetraders.models.error import HttpErrorShape, SpaceTradersAPIErrorShape
 
+if TYPE_CHECKING:
+    from httpx import Headers, Request
+
 
-# TODO: Implement
-#  - Handle HTTP 429 (and possibly others) errors (sent unmodified from spacetraders cloud infra)
-#  - Handle HTTP 502 errors (recommended to wait a few minutes for retry)
 class SpaceTradersAPIError:
     def __init__(self, res: Response):
-        logger.error(res.json())
+        logger.error(res.text)
         self.__res: Response = res
         self.__data: SpaceTradersAPIErrorShape | HttpErrorShape
         self.code: SpaceTradersAPIErrorCodes | HTTPStatus
         self.message: str
         self.data: Any  # TODO: Type could be improved
         self.request_id: str | None
+        # The exception that stood in for a response, see `from_exception()`
+        self.exception: Exception | None = None
+
+        # HTTP 429 and 502 errors may be sent unmodified by the SpaceTraders cloud
+        # infrastructure, in which case the body is not (SpaceTraders) json.
+        try:
+            body = res.json()
+        except ValueError:
+            self.__init_status_error(res)
+            return
 
         try:
-            data = SpaceTradersAPIErrorShape.model_validate(res.json()['error'])
+            data = SpaceTradersAPIErrorShape.model_validate(body['error'])
             self.__init_spacetraders_error(data)
-        except ValidationError:
-            data = HttpErrorShape.model_validate(res.json())
-            self.__init_http_error(data)
+        except (ValidationError, KeyError, TypeError):
+            try:
+                data = HttpErrorShape.model_validate(body)
+                self.__init_http_error(data)
+            except ValidationError:
+                self.__init_status_error(res)
+
+    @classmethod
+    def from_exception(cls, req: Request, e: Exception) -> SpaceTradersAPIError:
+        """An error for a request that got no usable response, e.g. one page of a crawl.
+
+        Responses that failed validation are reported as 502, transport errors that
+        survived the retries as 503.
+        """
+        status = (
+            HTTPStatus.BAD_GATEWAY
+            if isinstance(e, ValidationError)
+            else HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        err = cls(Response(status, text=str(e), request=req))
+        err.message = str(e)
+        err.exception = e
+        return err
 
     def unwrap(self) -> 'SpaceTradersAPIError':
         return self
 
+    @property
+    def status_code(self) -> HTTPStatus:
+        return HTTPStatus(self.__res.status_code)
+
+    @property
+    def headers(self) -> Headers:
+        return self.__res.headers
+
+    @property
+    def is_ratelimited(self) -> bool:
+        return self.status_code is HTTPStatus.TOO_MANY_REQUESTS
+
     def __init_spacetraders_error(self, err: SpaceTradersAPIErrorShape) -> None:
         self.code = err.code
         self.message = err.message
@@ -45,3 +87,9 @@ class SpaceTradersAPIError:
         self.message = err.message
         self.data = err.error  # Actually the 'error' field
         self.request_id = None
+
+    def __init_status_error(self, res: Response) -> None:
+        self.code = HTTPStatus(res.status_code)
+        self.message = res.reason_phrase
+        self.data = res.text
+        self.request_id = None
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
-from typing import TypedDict
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING, TypedDict
+
+from loguru import logger
 
 from deltav.spacetraders.enums.ratelimit import RateLimitType
 
+if TYPE_CHECKING:
+    from httpx import Headers
+
 
 class RatelimitHeaders(TypedDict):
     x_ratelimit_limit_burst: int
@@ -14,6 +21,37 @@ class RatelimitHeaders(TypedDict):
     x_ratelimit_type: str
 
 
+class TokenBucket:
+    """A token bucket that allows reserving tokens it does not have yet.
+
+    Reserving a token while the bucket is empty drives the token count negative,
+    so every later reservation queues behind the ones already handed out.
+    """
+
+    def __init__(self, capacity: float, refill_rate: float) -> None:
+        self.capacity: float = capacity
+        self.refill_rate: float = refill_rate
+        self.tokens: float = capacity
+        self.__last_refill: float = monotonic()
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.__last_refill
+        self.__last_refill = now
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+
+    def wait_time(self) -> float:
+        """Seconds until the bucket holds one whole token, assuming it was just refilled."""
+        if self.tokens >= 1:
+            return 0.0
+        if self.refill_rate <= 0:
+            return float('inf')
+        return (1 - self.tokens) / self.refill_rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
 class Ratelimit:
     IP_ADDRESS_LIMIT_PER_SECOND: int = 2
     IP_ADDRESS_BURST_LIMIT: int = 30
@@ -32,17 +70,108 @@ class Ratelimit:
     ]
 
     def __init__(self) -> None:
-        self.limit_burst: int = 30
-        self.limit_per_second: int = 2
-        self.remaining: int = 2
+        """A dual token bucket mirroring the SpaceTraders ratelimit.
+
+        Requests are first paid for from the sustained (per second) bucket. Once it is
+        empty they are paid for from the burst bucket, which the server refills in full
+        every burst duration. Both buckets are corrected from the `X-Ratelimit-*` headers
+        of every response.
+        """
+        self.limit_burst: int = Ratelimit.IP_ADDRESS_BURST_LIMIT
+        self.limit_per_second: int = Ratelimit.IP_ADDRESS_LIMIT_PER_SECOND
+        self.remaining: int = Ratelimit.IP_ADDRESS_BURST_LIMIT
         self.reset: datetime = datetime.now(tz=UTC)
         self.type: RateLimitType = RateLimitType.IP_ADDRESS
 
+        self.__lock: Lock = Lock()
+        self.__sustained: TokenBucket = TokenBucket(
+            self.limit_per_second, self.limit_per_second
+        )  # fmt: skip
+        self.__burst: TokenBucket = TokenBucket(
+            self.limit_burst, self.limit_burst / Ratelimit.IP_ADDRESS_BURST_DURATION
+        )  # fmt: skip
+
+    def delay(self) -> float:
+        """The number of seconds until a request slot opens, without reserving it."""
+        with self.__lock:
+            now = monotonic()
+            self.__sustained.refill(now)
+            self.__burst.refill(now)
+            return min(self.__sustained.wait_time(), self.__burst.wait_time())
+
+    def try_reserve(self) -> bool:
+        """Reserve a request slot only if one is open right now."""
+        with self.__lock:
+            now = monotonic()
+            self.__sustained.refill(now)
+            self.__burst.refill(now)
+
+            bucket = min(self.__sustained, self.__burst, key=TokenBucket.wait_time)
+            if bucket.wait_time() > 0:
+                return False
+            bucket.take()
+            return True
+
     def update(self, x_headers: RatelimitHeaders) -> None:
         self.limit_burst = x_headers['x_ratelimit_limit_burst']
         self.limit_per_second = x_headers['x_ratelimit_limit_per_second']
         self.remaining = x_headers['x_ratelimit_remaining']
-        self.reset = datetime.fromisoformat(x_headers['x_ratelimit_reset'])
+        try:
+            self.reset = datetime.fromisoformat(x_headers['x_ratelimit_reset'])
+        except ValueError:
+            logger.warning(f'Ignoring invalid ratelimit reset {x_headers["x_ratelimit_reset"]!r}')
 
         if x_headers['x_ratelimit_type'] != self.type.value:
             self.type = RateLimitType(x_headers['x_ratelimit_type'])
+
+        with self.__lock:
+            now = monotonic()
+            self.__sustained.refill(now)
+            self.__burst.refill(now)
+
+            self.__sustained.capacity = self.limit_per_second
+            self.__sustained.refill_rate = self.limit_per_second
+            self.__burst.capacity = self.limit_burst
+
+            # The server is the source of truth for the burst pool, but it has not yet
+            # counted requests still in flight, so only ever lower the local estimate.
+            self.__burst.tokens = min(self.__burst.tokens, self.remaining)
+
+            # Refill the burst pool at whatever rate fills it by the time the server resets it.
+            until_reset = (self.reset - datetime.now(tz=UTC)).total_seconds()
+            if until_reset > 0:
+                missing = self.__burst.capacity - self.remaining
+                self.__burst.refill_rate = max(missing, 1) / until_reset
+                if self.remaining == 0:
+                    self.__sustained.tokens = min(self.__sustained.tokens, 0)
+            else:
+                self.__burst.refill_rate = self.limit_burst / self.burst_duration
+
+    def update_from_headers(self, headers: Headers) -> None:
+        """Update the ratelimit state if the response carried `X-Ratelimit-*` headers."""
+        if (x_headers := Ratelimit.parse_headers(headers)) is not None:
+            self.update(x_headers)
+
+    @property
+    def burst_duration(self) -> int:
+        match self.type:
+            case RateLimitType.ACCOUNT:
+                return Ratelimit.ACCOUNT_BURST_DURATION
+            case _:
+                return Ratelimit.IP_ADDRESS_BURST_DURATION
+
+    @staticmethod
+    def parse_headers(headers: Headers) -> RatelimitHeaders | None:
+        if any(header not in headers for header in Ratelimit.X_HEADERS):
+            return None
+
+        try:
+            return RatelimitHeaders(
+                x_ratelimit_limit_burst=int(headers['X-Ratelimit-Limit-Burst']),
+                x_ratelimit_limit_per_second=int(headers['X-Ratelimit-Limit-Per-Second']),
+                x_ratelimit_remaining=int(headers['X-Ratelimit-Remaining']),
+                x_ratelimit_reset=headers['X-Ratelimit-Reset'],
+                x_ratelimit_type=headers['X-Ratelimit-Type'],
+            )
+        except ValueError:
+            return None
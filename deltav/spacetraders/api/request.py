@@ -3,15 +3,22 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
+from enum import Enum
 from http import HTTPStatus
 from math import ceil
 from typing import Any, Generic, TypeVar, override
 
 from loguru import logger
 
-from deltav.spacetraders.api import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, SPACETRADERS_API_URL
+from deltav.spacetraders.api import (
+    DEFAULT_PAGE_LIMIT,
+    MAX_CONCURRENT_PAGES,
+    MAX_PAGE_LIMIT,
+    SPACETRADERS_API_URL,
+)
 from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
 from deltav.spacetraders.enums.error import SpaceTradersAPIErrorCodes
+from deltav.spacetraders.enums.request import RequestPriority
 from deltav.spacetraders.errors.request import InvalidRequestError
 from deltav.spacetraders.models import (
     NoDataReqShape,
@@ -41,6 +48,7 @@ class SpaceTradersAPIRequest(Generic[T]):
         self._start_page: int = 0
         self._end_page: int = 0
         self._page_limit: int = DEFAULT_PAGE_LIMIT
+        self._concurrent_pages: int = 1
         # Paging state
         self._total_items: int = 0
         self._total_pages: int = 1
@@ -55,6 +63,10 @@ class SpaceTradersAPIRequest(Generic[T]):
         self._timeout_connect: int = 5
         self._timeout_response: int = 60
 
+        # Scheduling properties
+        self._priority: RequestPriority = RequestPriority.FLEET_ACTION
+        self._bypass_cache: bool = False
+
         # The token to use for the request, could be account or agent
         self._token: AccountToken | AgentToken | None = None
 
@@ -62,6 +74,10 @@ class SpaceTradersAPIRequest(Generic[T]):
     def endpoint(self) -> SpaceTradersAPIEndpoint:
         return self._endpoint
 
+    @property
+    def token(self) -> AccountToken | AgentToken | None:
+        return self._token
+
     @property
     def json_data(self) -> Mapping[str, Any]:
         if self.endpoint.request_shape is NoDataReqShape:
@@ -111,6 +127,10 @@ class SpaceTradersAPIRequest(Generic[T]):
     def page_limit(self) -> int:
         return self._page_limit
 
+    @property
+    def concurrent_pages(self) -> int:
+        return self._concurrent_pages
+
     @property
     def total_pages(self) -> int:
         return self._total_pages
@@ -129,6 +149,26 @@ class SpaceTradersAPIRequest(Generic[T]):
         _next = self._current_page + 1
         return _next if _next < self._total_pages else None
 
+    @property
+    def should_retry(self) -> bool:
+        return self._should_retry
+
+    @property
+    def retries(self) -> int:
+        return self._retries if self._retries is not None else 0
+
+    @property
+    def cancel_on_ratelimit(self) -> bool:
+        return self._cancel_on_ratelimit
+
+    @property
+    def cancel_on_http_errors(self) -> list[HTTPStatus]:
+        return self._cancel_on_http_errors
+
+    @property
+    def cancel_on_spacetrader_errors(self) -> list[SpaceTradersAPIErrorCodes]:
+        return self._cancel_on_spacetrader_errors
+
     @property
     def timeout_connect(self) -> int:
         return self._timeout_connect
@@ -137,6 +177,14 @@ class SpaceTradersAPIRequest(Generic[T]):
     def timeout_response(self) -> int:
         return self._timeout_response
 
+    @property
+    def priority(self) -> RequestPriority:
+        return self._priority
+
+    @property
+    def bypass_cache(self) -> bool:
+        return self._bypass_cache
+
     def parameterized_path(self) -> str:
         mapping = dict(zip(self.endpoint.path.get_identifiers(), self._path_params, strict=False))
         path = self._endpoint.path.substitute(mapping)
@@ -180,6 +228,9 @@ class SpaceTradersAPIRequest(Generic[T]):
             f'Data: {indent(str(self._data), 2, start_even=True)}',
             f'Token: {self._endpoint.token_type}',
             f'Pages: {pages}',
+            f'Concurrent Pages: {self._concurrent_pages}',
+            f'Priority: {self._priority.name}',
+            f'Bypass Cache: {self._bypass_cache}',
             f'Retry: {self._should_retry}\n',
         ]).expandtabs(4)  # fmt: skip
 
@@ -287,8 +338,35 @@ class SpaceTradersAPIRequestBuilder(Generic[T]):
         self.req._is_paged = True
         return self
 
+    def concurrent_pages(self, limit: int) -> 'SpaceTradersAPIRequestBuilder[T]':
+        """Allow up to `limit` pages to be in flight at once, still bound by the ratelimit."""
+        if limit < 1 or limit > MAX_CONCURRENT_PAGES:
+            msg = f'{limit=} must be between 1 and {MAX_CONCURRENT_PAGES}'
+            raise InvalidRequestError(msg)
+
+        self.req._concurrent_pages = limit
+        return self
+
     def query_params(self, **kwargs: Any) -> 'SpaceTradersAPIRequestBuilder[T]':  # pyright: ignore[reportAny]
-        self.req._query_params = {str(k): str(v) for k, v in kwargs}
+        """Add query parameters. None values are left out, enums are sent by value and
+        lists as comma separated values.
+        """
+        for k, v in kwargs.items():  # pyright: ignore[reportAny]
+            if v is None:
+                continue
+            values = v if isinstance(v, list) else [v]
+            self.req._query_params[str(k)] = ','.join(
+                str(value.value if isinstance(value, Enum) else value) for value in values
+            )
+        return self
+
+    def priority(self, priority: RequestPriority) -> 'SpaceTradersAPIRequestBuilder[T]':
+        self.req._priority = priority
+        return self
+
+    def bypass_cache(self) -> 'SpaceTradersAPIRequestBuilder[T]':
+        """Always send the request, the fresh response still replaces any cached one."""
+        self.req._bypass_cache = True
         return self
 
     def retries(self, times: int) -> 'SpaceTradersAPIRequestBuilder[T]':
@@ -333,8 +411,12 @@ class SpaceTradersAPIRequestBuilder(Generic[T]):
         self.req._cancel_on_spacetrader_errors = list(codes)
         return self
 
-    def timeout(self, seconds: int) -> 'SpaceTradersAPIRequestBuilder[T]':
+    def timeout(
+        self, seconds: int, connect: int | None = None
+    ) -> 'SpaceTradersAPIRequestBuilder[T]':
         self.req._timeout_response = seconds
+        if connect is not None:
+            self.req._timeout_connect = connect
         return self
 
     def build(self) -> SpaceTradersAPIRequest[T]:
@@ -1,27 +1,49 @@
 from __future__ import annotations
 
+from functools import cache
 from http import HTTPStatus
-from typing import Any, Generic, TypeVar, cast
+from typing import TYPE_CHECKING, Any, Generic, NotRequired, TypedDict, TypeVar, cast
 
-from httpx import Headers, Response
+from pydantic import TypeAdapter
 
-from deltav.spacetraders.api.ratelimit import Ratelimit
-from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
-from deltav.spacetraders.models import SpaceTradersAPIResShape
+from deltav.spacetraders.models import SpaceTradersAPIResShape, paged_field
 from deltav.spacetraders.models.meta import MetaShape
 
+if TYPE_CHECKING:
+    from httpx import Response
+
+    from deltav.spacetraders.api.error import SpaceTradersAPIError
+    from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+
 T = TypeVar('T', bound=SpaceTradersAPIResShape)
 
 
+@cache
+def body_validator(
+    shape: type[SpaceTradersAPIResShape],
+) -> tuple[TypeAdapter[dict[str, Any]], str | None]:
+    """The validator of a response body `{'data': ..., 'meta': ...}` with data of `shape`.
+
+    The data of a paged list shape is validated as the list of its items, and the name of
+    the list field is returned with the validator (see `paged_field()`). Validators are
+    built once per shape, the shapes of an endpoint are fixed by its status codes.
+    """
+    name = paged_field(shape)
+    data = shape if name is None else shape.model_fields[name].annotation
+    body = TypedDict(  # pyright: ignore[reportGeneralTypeIssues]
+        f'{shape.__name__}Body', {'data': data, 'meta': NotRequired[MetaShape]}
+    )
+    return TypeAdapter(body), name
+
+
 class SpaceTradersAPIResponse(Generic[T]):
     def __init__(self, endpoint: SpaceTradersAPIEndpoint, res: Response):
         self.__endpoint: SpaceTradersAPIEndpoint = endpoint
-        self.__headers: Headers = res.headers.copy()
         self.__shape: type[SpaceTradersAPIResShape]
-        self.__meta: MetaShape | None
+        self.__meta: MetaShape | None = None
         self.data: T
-
-        self.__filter_headers()
+        # Pages of a paged request that failed and are missing from `data`
+        self.page_errors: dict[int, SpaceTradersAPIError] = {}
 
         shape = endpoint.response_shapes.get(HTTPStatus(res.status_code))
         if shape is None:
@@ -29,27 +51,35 @@ class SpaceTradersAPIResponse(Generic[T]):
             raise ValueError(msg)
         self.__shape = shape
 
-        json_data: dict[str, Any] = {} if res.status_code == 204 else res.json()
-        if 'meta' in json_data:
-            self.__meta = MetaShape.model_validate(json_data['meta'])
+        if res.status_code == HTTPStatus.NO_CONTENT:
+            model = shape.model_validate({})
         else:
-            self.__meta = None
-
-        if 'data' in json_data and isinstance(json_data['data'], dict):
-            model = shape.model_validate(json_data['data'], by_alias=True)
-        else:
-            model = shape.model_validate(json_data, by_alias=True)
+            model = self.__validate(shape, res)
 
         self.data = cast(T, model)
 
     def unwrap(self) -> T:
         return self.data
 
+    @property
+    def is_partial(self) -> bool:
+        return bool(self.page_errors)
+
     @property
     def meta(self) -> MetaShape | None:
         return self.__meta
 
-    def __filter_headers(self) -> None:
-        for header in self.__headers.keys():
-            if header not in Ratelimit.X_HEADERS:
-                _ = self.__headers.pop(header)
+    def __validate(
+        self, shape: type[SpaceTradersAPIResShape], res: Response
+    ) -> SpaceTradersAPIResShape:
+        # Validate the body straight from its bytes, without building the JSON in Python.
+        # Raises the ValidationError of the body, it is parsed once whether it fails or not
+        if not shape.wrapped:
+            return shape.model_validate_json(res.content, by_alias=True)
+
+        validator, name = body_validator(shape)
+        body = validator.validate_json(res.content)
+        self.__meta = body.get('meta')
+        if name is None:
+            return body['data']
+        return shape.model_validate({name: body['data']}, by_name=True)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime
+from http import HTTPMethod, HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from loguru import logger
+
+from deltav.spacetraders.api.error import SpaceTradersAPIError
+from deltav.spacetraders.api.ratelimit import Ratelimit
+from deltav.spacetraders.enums.error import SpaceTradersAPIErrorCodes
+
+if TYPE_CHECKING:
+    from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+
+BACKOFF_BASE: float = 1.0
+BACKOFF_CAP: float = 60.0
+
+# The SpaceTraders docs recommend waiting a few minutes before retrying after a 502
+BAD_GATEWAY_BACKOFF_BASE: float = 120.0
+BAD_GATEWAY_BACKOFF_CAP: float = 600.0
+
+# Requests that can be sent again even if the server may already have acted on them
+IDEMPOTENT_METHODS: frozenset[HTTPMethod] = frozenset(
+    {HTTPMethod.GET, HTTPMethod.HEAD, HTTPMethod.OPTIONS, HTTPMethod.PUT, HTTPMethod.DELETE}
+)
+# Transport errors raised before the request reached the server
+CONNECT_ERRORS: tuple[type[httpx.TransportError], ...] = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def backoff(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Exponential backoff with jitter, between half and all of `base * 2^attempt`."""
+    delay = min(cap, base * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)  # noqa: S311
+
+
+def retry_delay(
+    req: SpaceTradersAPIRequest[Any],
+    attempt: int,
+    failure: SpaceTradersAPIError | httpx.TransportError,
+) -> float | None:
+    """Decide whether a failed request should be sent again.
+
+    Args:
+        req: The failed request.
+        attempt: The number of times the request has already been retried.
+        failure: The error response, or the exception raised while sending the request.
+
+    Returns:
+        The number of seconds to wait before retrying, or None to give up.
+    """
+    if not req.should_retry or attempt >= req.retries:
+        return None
+
+    # A mutating request may have been applied even though no response arrived, so it
+    # is only sent again if it provably never reached the server
+    idempotent = req.endpoint.method in IDEMPOTENT_METHODS
+
+    if isinstance(failure, httpx.TransportError):
+        if idempotent or isinstance(failure, CONNECT_ERRORS):
+            return backoff(attempt)
+        return None
+
+    if failure.is_ratelimited:
+        return None if req.cancel_on_ratelimit else ratelimit_reset_delay(failure, attempt)
+
+    if failure.status_code in req.cancel_on_http_errors:
+        return None
+
+    if isinstance(failure.code, SpaceTradersAPIErrorCodes):
+        if failure.code in req.cancel_on_spacetrader_errors:
+            return None
+        if failure.code is SpaceTradersAPIErrorCodes.COOLDOWN_CONFLICT_ERROR:
+            return cooldown_delay(failure, attempt)
+        # Any other game error is a rejection that will happen the same way again
+        return None
+
+    if not idempotent:
+        return None
+
+    if failure.status_code is HTTPStatus.BAD_GATEWAY:
+        return backoff(attempt, BAD_GATEWAY_BACKOFF_BASE, BAD_GATEWAY_BACKOFF_CAP)
+
+    if failure.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        return backoff(attempt)
+
+    # Any other client error will fail the same way again
+    return None
+
+
+def ratelimit_reset_delay(err: SpaceTradersAPIError, attempt: int) -> float:
+    """Seconds until the ratelimit resets according to the 429 response."""
+    x_headers = Ratelimit.parse_headers(err.headers)
+    if x_headers is None:
+        return backoff(attempt)
+
+    reset = datetime.fromisoformat(x_headers['x_ratelimit_reset'])
+    return max((reset - datetime.now(tz=UTC)).total_seconds(), 0) + backoff(0, cap=0.5)
+
+
+def cooldown_delay(err: SpaceTradersAPIError, attempt: int) -> float:
+    """Seconds until the ship's cooldown expires according to the 409 response."""
+    try:
+        return float(err.data['cooldown']['remainingSeconds'])
+    except (KeyError, TypeError, ValueError):
+        return backoff(attempt)
+
+
+def log_retry(url: httpx.URL, delay: float, attempt: int, retries: int) -> None:
+    logger.warning(f'Retrying {url} in {delay:.2f}s (retry {attempt}/{retries})')
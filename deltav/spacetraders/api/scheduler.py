@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import TYPE_CHECKING, override
+
+from deltav.spacetraders.enums.request import RequestPriority
+
+if TYPE_CHECKING:
+    from deltav.spacetraders.api.ratelimit import Ratelimit
+
+
+class _Ticket(ABC):
+    """A request waiting for admission, woken whenever it may have become the next request."""
+
+    def __init__(self, priority: RequestPriority) -> None:
+        self.priority: RequestPriority = priority
+
+    @abstractmethod
+    def notify(self) -> None:
+        """Wake the waiting request, from any thread."""
+
+
+class _SyncTicket(_Ticket):
+    def __init__(self, priority: RequestPriority) -> None:
+        super().__init__(priority)
+        self.__event: threading.Event = threading.Event()
+
+    @override
+    def notify(self) -> None:
+        self.__event.set()
+
+    def wait(self, timeout: float | None) -> None:
+        _ = self.__event.wait(timeout)
+        self.__event.clear()
+
+
+class _AsyncTicket(_Ticket):
+    def __init__(self, priority: RequestPriority) -> None:
+        super().__init__(priority)
+        self.__loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self.__event: asyncio.Event = asyncio.Event()
+
+    @override
+    def notify(self) -> None:
+        _ = self.__loop.call_soon_threadsafe(self.__event.set)
+
+    async def wait(self, timeout: float | None) -> None:
+        try:
+            _ = await asyncio.wait_for(self.__event.wait(), timeout)
+        except TimeoutError:
+            pass
+        self.__event.clear()
+
+
+class RequestScheduler:
+    """Admission control for API requests in front of a shared ratelimit.
+
+    Every request waits in the queue of its `RequestPriority`. Only the request at the
+    head of the highest priority non-empty queue may take the next ratelimit slot, so a
+    ship action that arrives while a background crawl is waiting for the ratelimit is
+    sent first. Requests of the same priority are sent in arrival order.
+    """
+
+    def __init__(self, ratelimit: Ratelimit) -> None:
+        self.ratelimit: Ratelimit = ratelimit
+        self.__lock: threading.Lock = threading.Lock()
+        self.__queues: dict[RequestPriority, deque[_Ticket]] = {
+            priority: deque() for priority in sorted(RequestPriority, key=lambda p: p.value)
+        }
+
+    def queued(self, priority: RequestPriority | None = None) -> int:
+        """The number of requests waiting for admission, optionally of a single priority."""
+        with self.__lock:
+            if priority is not None:
+                return len(self.__queues[priority])
+            return sum(len(queue) for queue in self.__queues.values())
+
+    def acquire(self, priority: RequestPriority) -> None:
+        """Block until the request may be sent."""
+        ticket = _SyncTicket(priority)
+        self.__enqueue(ticket)
+        try:
+            admitted, timeout = self.__try_admit(ticket)
+            while not admitted:
+                ticket.wait(timeout)
+                admitted, timeout = self.__try_admit(ticket)
+        finally:
+            self.__dequeue(ticket)
+
+    async def acquire_async(self, priority: RequestPriority) -> None:
+        """Wait, without blocking the event loop, until the request may be sent."""
+        ticket = _AsyncTicket(priority)
+        self.__enqueue(ticket)
+        try:
+            admitted, timeout = self.__try_admit(ticket)
+            while not admitted:
+                await ticket.wait(timeout)
+                admitted, timeout = self.__try_admit(ticket)
+        finally:
+            self.__dequeue(ticket)
+
+    def __head(self) -> _Ticket | None:
+        # Queues are kept in priority order
+        for queue in self.__queues.values():
+            if queue:
+                return queue[0]
+        return None
+
+    def __enqueue(self, ticket: _Ticket) -> None:
+        with self.__lock:
+            self.__queues[ticket.priority].append(ticket)
+
+    def __dequeue(self, ticket: _Ticket) -> None:
+        with self.__lock:
+            was_head = self.__head() is ticket
+            self.__queues[ticket.priority].remove(ticket)
+            head = self.__head()
+
+        if was_head and head is not None:
+            head.notify()
+
+    def __try_admit(self, ticket: _Ticket) -> tuple[bool, float | None]:
+        """Take a ratelimit slot for `ticket` if it is the next request and a slot is open.
+
+        Returns:
+            Whether the ticket was admitted, and if not, how long to wait before trying
+            again. A timeout of None means waiting until notified.
+        """
+        with self.__lock:
+            if self.__head() is not ticket:
+                return False, None
+
+            if self.ratelimit.try_reserve():
+                return True, None
+            return False, self.ratelimit.delay()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Any, Generic, TypeVar, cast
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Coroutine
+
+R = TypeVar('R')
+
+
+class _Flight(Generic[R]):
+    def __init__(self) -> None:
+        self.done: threading.Event = threading.Event()
+        self.result: R | None = None
+        self.error: BaseException | None = None
+
+    def wait(self) -> R:
+        _ = self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return cast(R, self.result)
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls with the same key across threads.
+
+    The first caller for a key makes the call. Every caller that arrives while that
+    call is still running waits for it and gets the same result, or the same exception.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+        self.__flights: dict[str, _Flight[Any]] = {}
+
+    def do(self, key: str, fn: Callable[[], R]) -> R:
+        with self.__lock:
+            flight = self.__flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self.__flights[key] = _Flight[R]()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__flights[key]
+            flight.done.set()
+
+        return flight.result
+
+
+class AsyncSingleFlight:
+    """Deduplicates concurrent calls with the same key on one event loop.
+
+    The call runs in its own task, so cancelling one of the callers does not cancel
+    the call for the others.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced: int = 0
+        self.__flights: dict[str, asyncio.Task[Any]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Coroutine[Any, Any, R]]) -> R:
+        if (task := self.__flights.get(key)) is not None:
+            self.coalesced += 1
+        else:
+            task = self.__flights[key] = asyncio.create_task(fn())
+            task.add_done_callback(lambda _: self.__flights.pop(key, None))
+
+        return await asyncio.shield(task)
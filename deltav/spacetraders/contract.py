@@ -11,6 +11,7 @@ from deltav.spacetraders.enums.market import TradeSymbol
 from deltav.spacetraders.faction import Faction
 from deltav.spacetraders.models.contract import (
     ContractAcceptShape,
+    ContractDeliverGoodShape,
     ContractDeliverReqShape,
     ContractDeliverResShape,
     ContractShape,
@@ -72,10 +73,10 @@ class Contract:
         return self.terms.payment.on_fulfilled
 
     @property
-    def deliverables(self) -> list[ContractDeliverResShape]:
+    def deliverables(self) -> list[ContractDeliverGoodShape]:
         return self.terms.deliver
 
-    def get_deliverable_by_symbol(self, symbol: TradeSymbol) -> ContractDeliverResShape | None:
+    def get_deliverable_by_symbol(self, symbol: TradeSymbol) -> ContractDeliverGoodShape | None:
         for deliverable in self.deliverables:
             if deliverable.trade_symbol == symbol:
                 return deliverable
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import timedelta
 from enum import Enum, unique
 from http import HTTPMethod, HTTPStatus
 from string import Template
@@ -11,6 +12,7 @@ from deltav.spacetraders.models import (
     NoDataResShape,
     SpaceTradersAPIReqShape,
     SpaceTradersAPIResShape,
+    resolve_shapes,
 )
 from deltav.spacetraders.models.account import MyAccountShape
 from deltav.spacetraders.models.agent import (
@@ -85,10 +87,9 @@ from deltav.spacetraders.models.systems import (
     ShipyardShape,
     SystemShape,
     SystemsShape,
-    SystemWaypointShape,
     SystemWaypointsShape,
 )
-from deltav.spacetraders.models.waypoint import WaypointSymbolReqShape
+from deltav.spacetraders.models.waypoint import WaypointShape, WaypointSymbolReqShape
 from deltav.spacetraders.token import AccountToken, AgentToken
 from deltav.util import generic__repr__
 
@@ -106,6 +107,7 @@ class EndpointDataMixin:
     request_shape: type[SpaceTradersAPIReqShape]
     response_shapes: Mapping[HTTPStatus, type[SpaceTradersAPIResShape]]
     paginated: bool
+    cache_ttl: timedelta | None = None
 
     @property
     def response_codes(self) -> list[HTTPStatus]:
@@ -139,6 +141,7 @@ class EndpointDataMixin:
             f'Required Token: {self.token_type}',
             f'Request Shape: {request_shape}',
             f'Response Shape: {response_shape}',
+            f'Cache TTL: {self.cache_ttl}',
         ])  # fmt: skip
 
 
@@ -154,6 +157,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     request_shape: type[SpaceTradersAPIReqShape]
     response_shapes: Mapping[HTTPStatus, type[SpaceTradersAPIResShape]]
     paginated: bool
+    cache_ttl: timedelta | None = None  # How long successful responses may be cached
 
     (property) response_codes: list[HTTPStatus]
 
@@ -396,6 +400,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         NoDataReqShape,
         {HTTPStatus.OK: FactionsShape},
         True,
+        timedelta(days=1),
     )
     """Return a paginated list of all the factions in the game.
 
@@ -406,6 +411,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     NoDataReqShape,
     {HTTPStatus.OK: FactionsShape},
     True,
+    timedelta(days=1),
     ```
     """
     GET_FACTION = (
@@ -415,6 +421,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         NoDataReqShape,
         {HTTPStatus.OK: FactionShape},
         False,
+        timedelta(days=1),
     )
     """View the details of a faction.
 
@@ -425,6 +432,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     NoDataReqShape,
     {HTTPStatus.OK: FactionShape},
     False,
+    timedelta(days=1),
     ```
     """
     GET_FACTION_REPUTATIONS = (
@@ -1147,6 +1155,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         NoDataReqShape,
         {HTTPStatus.OK: SystemsShape},
         True,
+        timedelta(days=1),
     )
     """Return a paginated list of all systems.
 
@@ -1157,6 +1166,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     NoDataReqShape,
     {HTTPStatus.OK: SystemsShape},
     True,
+    timedelta(days=1),
     ```
     """
     GET_SYSTEM = (
@@ -1166,6 +1176,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         NoDataReqShape,
         {HTTPStatus.OK: SystemShape},
         False,
+        timedelta(days=1),
     )
     """Get the details of a system. Requires the system to have been visited or
     charted.
@@ -1177,6 +1188,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     NoDataReqShape,
     {HTTPStatus.OK: SystemShape},
     False,
+    timedelta(days=1),
     ```
     """
     GET_ALL_SYSTEM_WAYPOINTS = (  # TODO: More query parameters than page and limit
@@ -1186,6 +1198,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         NoDataReqShape,
         {HTTPStatus.OK: SystemWaypointsShape},
         True,
+        timedelta(hours=1),
     )
     """Return a paginated list of all of the waypoints for a given system.
 
@@ -1196,6 +1209,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     NoDataReqShape,
     {HTTPStatus.OK: SystemWaypointsShape},
     True,
+    timedelta(hours=1),
     ```
     """
     GET_WAYPOINT = (
@@ -1203,8 +1217,9 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         HTTPMethod.GET,
         None,
         NoDataReqShape,
-        {HTTPStatus.OK: SystemWaypointShape},
+        {HTTPStatus.OK: WaypointShape},
         False,
+        timedelta(hours=1),
     )
     """View the details of a waypoint.
 
@@ -1213,8 +1228,9 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     HTTPMethod.GET,
     None,
     NoDataReqShape,
-    {HTTPStatus.OK: SystemWaypointShape},
+    {HTTPStatus.OK: WaypointShape},
     False,
+    timedelta(hours=1),
     ```
     """
     GET_CONSTRUCTION_SITE = (
@@ -1281,6 +1297,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         NoDataReqShape,
         {HTTPStatus.OK: JumpgateShape},
         False,
+        timedelta(days=1),
     )
     """Get jump gate details for a waypoint.
 
@@ -1291,6 +1308,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     NoDataReqShape,
     {HTTPStatus.OK: JumpgateShape},
     False,
+    timedelta(days=1),
     ```
     """
     GET_SHIPYARD = (
@@ -1360,6 +1378,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         NoDataReqShape,
         {HTTPStatus.OK: ServerStatusShape},
         False,
+        timedelta(minutes=5),
     )
     """Return the status of the game server. This also includes a few global
     elements, such as announcements, server reset dates and leaderboards.
@@ -1371,6 +1390,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     NoDataReqShape,
     {HTTPStatus.OK: ServerStatusShape},
     False,
+    timedelta(minutes=5),
     ```
     """
     GET_ERROR_CODES = (
@@ -1380,6 +1400,7 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
         NoDataReqShape,
         {HTTPStatus.OK: ErrorCodesShape},
         True,
+        timedelta(days=1),
     )
     """Return a list of all possible error codes thrown by the game server.
 
@@ -1390,8 +1411,13 @@ class SpaceTradersAPIEndpoint(EndpointDataMixin, Enum):
     NoDataReqShape,
     {HTTPStatus.OK: ErrorCodesShape},
     True,
+    timedelta(days=1),
     ```
     """
 
     def get_path_params(self) -> list[str]:
         return self.path.get_identifiers()
+
+
+# Every shape module has been imported by now
+resolve_shapes()
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from enum import Enum
+
+
+class RequestPriority(Enum):
+    """Scheduling class of an API request, lower values are sent first.
+
+    INTERACTIVE
+    FLEET_ACTION
+    BACKGROUND
+    """
+
+    INTERACTIVE = 0
+    FLEET_ACTION = 1
+    BACKGROUND = 2
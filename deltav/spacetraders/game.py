@@ -1,42 +1,62 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from loguru import logger
 
-from deltav.spacetraders.api import MAX_PAGE_LIMIT
+from deltav.planning.galaxy import galaxy
+from deltav.spacetraders.api import MAX_CONCURRENT_PAGES, MAX_PAGE_LIMIT
 from deltav.spacetraders.api.client import SpaceTradersAPIClient
 from deltav.spacetraders.api.error import SpaceTradersAPIError
 from deltav.spacetraders.api.request import SpaceTradersAPIRequest
 from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.enums.request import RequestPriority
 from deltav.spacetraders.models.agent import PublicAgentShape, PublicAgentsShape
 from deltav.spacetraders.models.server import ServerStatusShape
 from deltav.spacetraders.ship import Ship
-from deltav.spacetraders.system import System
 from deltav.spacetraders.waypoint import Waypoint
 
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+    from deltav.planning.galaxy import Galaxy, GalaxySystem
+
 
 class SpaceTradersGame:
     """The current state of the official SpaceTraders public game servers.
 
     Attributes:
         agents: All known public agents.
+        constellations: All known systems, by constellation.
+        galaxy: All known systems and waypoints, indexed by coordinate.
+        sectors: All known systems, by sector.
         ships: All known ships.
-        systems: All known systems.
+        systems: All known systems, by symbol.
         waypoints: All knonw waypoints.
     """
 
     def __init__(self) -> None:
         self.agents: list[PublicAgentShape]
-        self.constellations: dict[str, list[System]]
-        self.sectors: dict[str, list[System]]
+        self.galaxy: Galaxy = galaxy
         self.ships: list[Ship]
-        self.systems: list[System]
         self.waypoints: list[Waypoint]
 
         self.next_restart: datetime
         self.restart_freq: str
 
+    @property
+    def constellations(self) -> dict[str, list[GalaxySystem]]:
+        return self.galaxy.constellations
+
+    @property
+    def sectors(self) -> dict[str, list[GalaxySystem]]:
+        return self.galaxy.sectors
+
+    @property
+    def systems(self) -> dict[str, GalaxySystem]:
+        return self.galaxy.systems
+
     @property
     def server_status(self) -> ServerStatusShape | SpaceTradersAPIError:
         return SpaceTradersGame._fetch_server_status()
@@ -45,6 +65,11 @@ class SpaceTradersGame:
         if status is None:
             _status = SpaceTradersGame._fetch_server_status()
 
+    def load_galaxy(self, engine: Engine) -> None:
+        """Load the systems and waypoints in the store into `galaxy`."""
+        self.galaxy.load(engine)
+        logger.info(f'Loaded {len(self.galaxy.systems)} systems into the galaxy')
+
     def update_agents(self) -> None:
         match res := self._fetch_public_agents():
             case PublicAgentsShape():
@@ -61,6 +86,8 @@ class SpaceTradersGame:
             .token()
             .all_pages()
             .page_limit(MAX_PAGE_LIMIT)
+            .concurrent_pages(MAX_CONCURRENT_PAGES)
+            .priority(RequestPriority.BACKGROUND)
             .build()
         ).unwrap()
 
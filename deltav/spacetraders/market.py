@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from deltav.spacetraders.enums.market import TransactionType
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from deltav.spacetraders.enums.market import (
+        ActivityLevel,
+        MarketTradeGoodType,
+        SupplyLevel,
+        TradeSymbol,
+    )
+    from deltav.spacetraders.models.market import MarketShape, MarketTransactionShape
+    from deltav.store.db.market import MarketPrice
+
+
+@dataclass(frozen=True, slots=True)
+class MarketListing:
+    """The last known prices of a trade good at a market.
+
+    ```
+    MarketListing
+        waypoint_symbol: str
+        trade_symbol: str
+        type: MarketTradeGoodType
+        supply: SupplyLevel
+        activity: ActivityLevel | None
+        trade_volume: int
+        purchase_price: int
+        sell_price: int
+        observed_at: datetime
+    ```
+    """
+
+    waypoint_symbol: str
+    trade_symbol: str
+    type: MarketTradeGoodType
+    supply: SupplyLevel
+    activity: ActivityLevel | None
+    trade_volume: int
+    purchase_price: int
+    sell_price: int
+    observed_at: datetime
+
+    @property
+    def system_symbol(self) -> str:
+        return self.waypoint_symbol.rsplit('-', 1)[0]
+
+    @property
+    def age(self) -> timedelta:
+        return datetime.now(tz=UTC) - self.observed_at
+
+
+class MarketSide(Enum):
+    """
+
+    BUY
+    SELL
+    """
+
+    BUY = 'BUY'  # Buy from the market at its purchase price, cheapest first
+    SELL = 'SELL'  # Sell to the market at its sell price, highest first
+
+
+# Books hold (price, waypoint) pairs packed into one int, which sorts by price first
+# and compares much faster than tuples
+_WAYPOINT_BITS = 24
+_WAYPOINT_MASK = (1 << _WAYPOINT_BITS) - 1
+
+
+class _Book:
+    """The markets of one trade good, ordered by price for both sides."""
+
+    def __init__(self) -> None:
+        # Ascending purchase price
+        self.buy: list[int] = []
+        # Descending sell price
+        self.sell: list[int] = []
+
+    def add(self, listing: MarketListing, waypoint_id: int) -> None:
+        insort(self.buy, (listing.purchase_price << _WAYPOINT_BITS) | waypoint_id)
+        insort(self.sell, (-listing.sell_price << _WAYPOINT_BITS) | waypoint_id)
+
+    def remove(self, listing: MarketListing, waypoint_id: int) -> None:
+        _remove(self.buy, (listing.purchase_price << _WAYPOINT_BITS) | waypoint_id)
+        _remove(self.sell, (-listing.sell_price << _WAYPOINT_BITS) | waypoint_id)
+
+    def side(self, side: MarketSide) -> list[int]:
+        return self.buy if side is MarketSide.BUY else self.sell
+
+    def __bool__(self) -> bool:
+        return bool(self.buy)
+
+
+class MarketIndex:
+    """The last known prices of every trade good at every market, ordered by price.
+
+    Answers "where is the cheapest FUEL in this system" without fetching markets. Every
+    trade good has a price-ordered book of its markets, across the universe and per
+    system, which is updated incrementally as market data and transactions arrive.
+    Every listing keeps the time it was observed, so callers can skip stale prices.
+    """
+
+    def __init__(self) -> None:
+        self.__lock: threading.Lock = threading.Lock()
+        # trade symbol -> waypoint symbol -> listing
+        self.__listings: dict[str, dict[str, MarketListing]] = {}
+        self.__books: dict[str, _Book] = {}
+        self.__system_books: dict[tuple[str, str], _Book] = {}
+        # Waypoints are interned for the books
+        self.__waypoint_ids: dict[str, int] = {}
+        self.__waypoints: list[str] = []
+
+    def update(self, market: MarketShape, observed_at: datetime | None = None) -> None:
+        """Replace the listings of a market with the trade goods in `market`.
+
+        Markets only list trade goods while a ship is present, the listings of markets
+        without any are left as they are.
+        """
+        if not market.trade_goods:
+            return
+
+        observed_at = observed_at or datetime.now(tz=UTC)
+        listed = {good.symbol for good in market.trade_goods}
+        with self.__lock:
+            for trade_symbol, listings in self.__listings.items():
+                if trade_symbol not in listed and market.symbol in listings:
+                    self.__remove(listings[market.symbol])
+
+            for good in market.trade_goods:
+                self.__put(
+                    MarketListing(
+                        waypoint_symbol=market.symbol,
+                        trade_symbol=good.symbol,
+                        type=good.type,
+                        supply=good.supply,
+                        activity=good.activity,
+                        trade_volume=good.trade_volume,
+                        purchase_price=good.purchase_price,
+                        sell_price=good.sell_price,
+                        observed_at=observed_at,
+                    )
+                )
+
+    def record_transaction(self, transaction: MarketTransactionShape) -> None:
+        """Update the price of a listing from a purchase or sale at its market.
+
+        Transactions at markets without a listing for the good are ignored, since they
+        only tell one of its prices.
+        """
+        trade_symbol = transaction.trade_symbol.value
+        with self.__lock:
+            listing = self.__listings.get(trade_symbol, {}).get(transaction.waypoint_symbol)
+            if listing is None or listing.observed_at > transaction.timestamp:
+                return
+
+            if transaction.type is TransactionType.PURCHASE:
+                updated = replace(listing, purchase_price=transaction.price_per_unit)
+            else:
+                updated = replace(listing, sell_price=transaction.price_per_unit)
+            self.__put(replace(updated, observed_at=transaction.timestamp))
+
+    def load(self, prices: Iterable[MarketPrice]) -> None:
+        """Add stored prices, e.g. `store.db.market.latest_prices()`, unless newer are known."""
+        with self.__lock:
+            for price in prices:
+                known = self.__listings.get(price.trade_symbol, {}).get(price.waypoint_symbol)
+                if known is not None and known.observed_at >= price.last_observed_at:
+                    continue
+
+                self.__put(
+                    MarketListing(
+                        waypoint_symbol=price.waypoint_symbol,
+                        trade_symbol=price.trade_symbol,
+                        type=price.type,
+                        supply=price.supply,
+                        activity=price.activity,
+                        trade_volume=price.trade_volume,
+                        purchase_price=price.purchase_price,
+                        sell_price=price.sell_price,
+                        observed_at=price.last_observed_at,
+                    )
+                )
+
+    def remove(self, waypoint_symbol: str) -> None:
+        """Drop every listing of a market."""
+        with self.__lock:
+            for listings in self.__listings.values():
+                if (listing := listings.get(waypoint_symbol)) is not None:
+                    self.__remove(listing)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__listings.clear()
+            self.__books.clear()
+            self.__system_books.clear()
+            self.__waypoint_ids.clear()
+            self.__waypoints.clear()
+
+    def listing(
+        self, waypoint_symbol: str, trade_symbol: TradeSymbol | str
+    ) -> MarketListing | None:
+        with self.__lock:
+            return self.__listings.get(_symbol(trade_symbol), {}).get(waypoint_symbol)
+
+    def listings(self, system_symbol: str | None = None) -> list[MarketListing]:
+        """Every listing, or every listing of the markets in `system_symbol`."""
+        with self.__lock:
+            return [
+                listing
+                for listings in self.__listings.values()
+                for listing in listings.values()
+                if system_symbol is None or listing.system_symbol == system_symbol
+            ]
+
+    def best(
+        self,
+        side: MarketSide,
+        trade_symbol: TradeSymbol | str,
+        system_symbol: str | None = None,
+        max_age: timedelta | None = None,
+    ) -> MarketListing | None:
+        """The cheapest market to buy from, or the highest paying market to sell to.
+
+        Only markets in `system_symbol` and listings observed within `max_age` are
+        considered, if given.
+        """
+        return next(iter(self.top(side, trade_symbol, 1, system_symbol, max_age)), None)
+
+    def top(
+        self,
+        side: MarketSide,
+        trade_symbol: TradeSymbol | str,
+        k: int,
+        system_symbol: str | None = None,
+        max_age: timedelta | None = None,
+    ) -> list[MarketListing]:
+        """The `k` best markets to buy from or sell to, best first. See `best()`."""
+        trade_symbol = _symbol(trade_symbol)
+        with self.__lock:
+            book = (
+                self.__books.get(trade_symbol)
+                if system_symbol is None
+                else self.__system_books.get((trade_symbol, system_symbol))
+            )
+            if book is None:
+                return []
+
+            listings = self.__listings[trade_symbol]
+            result: list[MarketListing] = []
+            for listing in self.__fresh(book.side(side), listings, max_age):
+                result.append(listing)
+                if len(result) == k:
+                    break
+            return result
+
+    def __len__(self) -> int:
+        return sum(len(listings) for listings in self.__listings.values())
+
+    def __fresh(
+        self, book: list[int], listings: dict[str, MarketListing], max_age: timedelta | None
+    ) -> Iterator[MarketListing]:
+        cutoff = None if max_age is None else datetime.now(tz=UTC) - max_age
+        for entry in book:
+            listing = listings[self.__waypoints[entry & _WAYPOINT_MASK]]
+            if cutoff is None or listing.observed_at >= cutoff:
+                yield listing
+
+    def __waypoint_id(self, waypoint_symbol: str) -> int:
+        if (waypoint_id := self.__waypoint_ids.get(waypoint_symbol)) is None:
+            waypoint_id = self.__waypoint_ids[waypoint_symbol] = len(self.__waypoints)
+            self.__waypoints.append(waypoint_symbol)
+        return waypoint_id
+
+    def __put(self, listing: MarketListing) -> None:
+        listings = self.__listings.setdefault(listing.trade_symbol, {})
+        if (previous := listings.get(listing.waypoint_symbol)) is not None:
+            self.__remove(previous)
+
+        listings[listing.waypoint_symbol] = listing
+        waypoint_id = self.__waypoint_id(listing.waypoint_symbol)
+        if (book := self.__books.get(listing.trade_symbol)) is None:
+            book = self.__books[listing.trade_symbol] = _Book()
+        book.add(listing, waypoint_id)
+
+        key = (listing.trade_symbol, listing.system_symbol)
+        if (book := self.__system_books.get(key)) is None:
+            book = self.__system_books[key] = _Book()
+        book.add(listing, waypoint_id)
+
+    def __remove(self, listing: MarketListing) -> None:
+        del self.__listings[listing.trade_symbol][listing.waypoint_symbol]
+        waypoint_id = self.__waypoint_ids[listing.waypoint_symbol]
+        self.__books[listing.trade_symbol].remove(listing, waypoint_id)
+        key = (listing.trade_symbol, listing.system_symbol)
+        self.__system_books[key].remove(listing, waypoint_id)
+        if not self.__system_books[key]:
+            del self.__system_books[key]
+
+
+def _remove(book: list[int], entry: int) -> None:
+    i = bisect_left(book, entry)
+    if i < len(book) and book[i] == entry:
+        del book[i]
+
+
+def _symbol(trade_symbol: TradeSymbol | str) -> str:
+    return trade_symbol if isinstance(trade_symbol, str) else trade_symbol.value
+
+
+market_index: MarketIndex = MarketIndex()
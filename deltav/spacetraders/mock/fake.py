@@ -0,0 +1,73 @@
+"""Placeholder JSON for any response shape, generated from its JSON schema.
+
+The mock server answers endpoints it does not simulate with these, and builds the
+state it does simulate on top of them, so every response validates as its shape.
+"""
+
+from __future__ import annotations
+
+from copy import deepcopy
+from datetime import UTC, datetime
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from deltav.spacetraders.models import SpaceTradersAPIResShape
+
+# Placeholders by JSON schema type
+_PLACEHOLDERS: dict[str, Any] = {
+    'string': '',
+    'integer': 0,
+    'number': 0.0,
+    'boolean': False,
+    'null': None,
+}
+
+
+def fake(shape: type[SpaceTradersAPIResShape], **overrides: Any) -> dict[str, Any]:
+    """A JSON object (with camelCase keys) that validates as `shape`.
+
+    Lists are empty, enums take their first member and datetimes are the current time.
+    `overrides` replace top level fields, by their JSON key.
+    """
+    return deepcopy(_template(shape)) | overrides
+
+
+@cache
+def _template(shape: type[SpaceTradersAPIResShape]) -> dict[str, Any]:
+    schema = shape.model_json_schema(by_alias=True)
+    return _value(schema, schema.get('$defs', {}))
+
+
+def _value(schema: dict[str, Any], defs: dict[str, Any]) -> Any:
+    if 'default' in schema:
+        return schema['default']
+    if 'const' in schema:
+        return schema['const']
+    if 'enum' in schema:
+        return schema['enum'][0]
+    if '$ref' in schema:
+        return _value(defs[schema['$ref'].rsplit('/', 1)[-1]], defs)
+    for union in ('anyOf', 'oneOf'):
+        if union in schema:
+            options = schema[union]
+            # Prefer a concrete value over null
+            option = next((o for o in options if o.get('type') != 'null'), options[0])
+            return _value(option, defs)
+    if 'allOf' in schema:
+        return _value(schema['allOf'][0], defs)
+
+    match schema.get('type'):
+        case 'object':
+            properties = schema.get('properties', {})
+            return {key: _value(value, defs) for key, value in properties.items()}
+        case 'array':
+            return []
+        case 'string' if schema.get('format') == 'date-time':
+            return datetime.now(tz=UTC).isoformat()
+        case 'string' if schema.get('format') == 'date':
+            return datetime.now(tz=UTC).date().isoformat()
+        case str() as kind:
+            return _PLACEHOLDERS.get(kind)
+        case _:
+            return None
@@ -0,0 +1,850 @@
+"""An in-process SpaceTraders API for load testing and benchmarks, on httpx's MockTransport.
+
+Requests are routed by the path templates of `SpaceTradersAPIEndpoint`. Endpoints that
+act on the simulated universe (ships, markets, contracts, systems) change and return
+its state, every other endpoint returns placeholder JSON generated from its response
+shape, so any request the client can build gets a response that validates.
+
+The server keeps its own ratelimit per token and sends `X-Ratelimit-*` headers like the
+real API, and can inject 429 and 502 responses and latency:
+
+```python
+server = MockSpaceTradersServer(MockUniverse.generate(), MockFaults(latency=0.05))
+with server.install():
+    SpaceTradersAPIClient.call(req)
+```
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from http import HTTPStatus
+from math import ceil
+from random import Random
+from typing import TYPE_CHECKING, Any
+
+import httpx
+import jwt
+
+from deltav.planning.navigation import FUEL_PER_UNIT, flight_time, fuel_cost
+from deltav.spacetraders.api import VERSION
+from deltav.spacetraders.api.client import AsyncSpaceTradersAPIClient, SpaceTradersAPIClient
+from deltav.spacetraders.api.ratelimit import TokenBucket
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.enums.error import SpaceTradersAPIErrorCodes
+from deltav.spacetraders.enums.market import TradeSymbol, TransactionType
+from deltav.spacetraders.enums.ratelimit import RateLimitType
+from deltav.spacetraders.enums.ship import ShipNavFlightMode, ShipNavStatus
+from deltav.spacetraders.enums.waypoint import WaypointType
+from deltav.spacetraders.mock.fake import fake
+from deltav.spacetraders.mock.universe import ORES, MockUniverse
+from deltav.spacetraders.models.ship import (
+    ShipExtractionShape,
+    ShipNavigationShape,
+    ShipNavUpdateShape,
+    ShipRefuelResShape,
+)
+from deltav.spacetraders.token import AgentToken
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+JSON = dict[str, Any]
+# The data of a response, a list for paginated endpoints, and its status
+Result = tuple[HTTPStatus, JSON | list[JSON] | None]
+
+EXTRACTION_COOLDOWN: int = 70
+JUMP_COOLDOWN: int = 60
+# Transactions kept per market
+MARKET_TRANSACTIONS: int = 20
+# How far a trade of a full trade volume moves the price of a good
+PRICE_IMPACT: float = 0.02
+
+BAD_GATEWAY_BODY: bytes = b'<html><body><h1>502 Bad Gateway</h1></body></html>'
+
+
+@dataclass(frozen=True, slots=True)
+class MockFaults:
+    """Faults the mock server injects into its responses.
+
+    ```
+    MockFaults
+        ratelimit_rate: float = 0
+        bad_gateway_rate: float = 0
+        latency: float = 0
+        jitter: float = 0
+    ```
+    """
+
+    ratelimit_rate: float = 0  # Share of requests answered 429 even within the ratelimit
+    bad_gateway_rate: float = 0  # Share of requests answered 502
+    latency: float = 0  # Seconds before every response
+    jitter: float = 0  # Up to this many more seconds, uniformly random
+
+
+class MockError(Exception):
+    """An error response of a handler, a plain HTTP error without a SpaceTraders code."""
+
+    def __init__(
+        self,
+        status: HTTPStatus,
+        code: SpaceTradersAPIErrorCodes | None,
+        message: str,
+        data: JSON | None = None,
+    ) -> None:
+        self.status: HTTPStatus = status
+        self.code: SpaceTradersAPIErrorCodes | None = code
+        self.message: str = message
+        self.data: JSON = data or {}
+        super().__init__(self.message)
+
+
+class _RateBudget:
+    """The server side of the ratelimit of one token: a sustained rate, then a burst pool
+    that is refilled in full every burst duration.
+    """
+
+    def __init__(self, limit_per_second: int, limit_burst: int, burst_duration: int) -> None:
+        self.limit_burst: int = limit_burst
+        self.burst_duration: timedelta = timedelta(seconds=burst_duration)
+        self.remaining: int = limit_burst
+        self.reset: datetime = datetime.now(tz=UTC) + self.burst_duration
+        self.__sustained: TokenBucket = TokenBucket(limit_per_second, limit_per_second)
+
+    def take(self) -> bool:
+        now = datetime.now(tz=UTC)
+        if now >= self.reset:
+            self.remaining = self.limit_burst
+            self.reset = now + self.burst_duration
+
+        self.__sustained.refill(time.monotonic())
+        if self.__sustained.wait_time() == 0:
+            self.__sustained.take()
+            return True
+        if self.remaining > 0:
+            self.remaining -= 1
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the sustained rate accepts a request again."""
+        return self.__sustained.wait_time() or 1 / self.__sustained.refill_rate
+
+
+class MockSpaceTradersServer:
+    """A simulated SpaceTraders API serving one `MockUniverse`.
+
+    Ships move, trade, extract and deliver as they would on the real server, with flight
+    times and cooldowns scaled by `time_scale`. Requests are handled one at a time, so the
+    server may be shared by any number of threads and tasks.
+
+    Attributes:
+        universe: The simulated state.
+        faults: The faults injected into responses.
+        requests: The number of requests per endpoint name.
+        responses: The number of responses per status code.
+    """
+
+    def __init__(
+        self,
+        universe: MockUniverse | None = None,
+        faults: MockFaults | None = None,
+        limit_per_second: int = 2,
+        limit_burst: int = 30,
+        burst_duration: int = 60,
+        time_scale: float = 1.0,
+        seed: int = 0,
+    ) -> None:
+        self.universe: MockUniverse = universe if universe is not None else MockUniverse()
+        self.faults: MockFaults = faults if faults is not None else MockFaults()
+        self.limit_per_second: int = limit_per_second
+        self.limit_burst: int = limit_burst
+        self.burst_duration: int = burst_duration
+        self.time_scale: float = time_scale
+        self.requests: Counter[str] = Counter()
+        self.responses: Counter[int] = Counter()
+
+        self.__lock: threading.Lock = threading.Lock()
+        self.__random: Random = Random(seed)
+        self.__budgets: dict[str, _RateBudget] = {}
+        self.__handlers: dict[str, Callable[[dict[str, str], JSON], Result]]
+        self.__handlers = {
+            SpaceTradersAPIEndpoint.GET_AGENT.name: self.__get_agent,
+            SpaceTradersAPIEndpoint.GET_ALL_SYSTEMS.name: self.__get_systems,
+            SpaceTradersAPIEndpoint.GET_SYSTEM.name: self.__get_system,
+            SpaceTradersAPIEndpoint.GET_ALL_SYSTEM_WAYPOINTS.name: self.__get_waypoints,
+            SpaceTradersAPIEndpoint.GET_WAYPOINT.name: self.__get_waypoint,
+            SpaceTradersAPIEndpoint.GET_MARKET.name: self.__get_market,
+            SpaceTradersAPIEndpoint.GET_JUMPGATE.name: self.__get_jump_gate,
+            SpaceTradersAPIEndpoint.GET_SHIPS.name: self.__get_ships,
+            SpaceTradersAPIEndpoint.GET_SHIP.name: self.__get_ship,
+            SpaceTradersAPIEndpoint.GET_SHIP_CARGO.name: self.__get_cargo,
+            SpaceTradersAPIEndpoint.GET_NAV_STATUS.name: self.__get_nav,
+            SpaceTradersAPIEndpoint.UPDATE_NAV_STATUS.name: self.__update_nav,
+            SpaceTradersAPIEndpoint.GET_SHIP_COOLDOWN.name: self.__get_cooldown,
+            SpaceTradersAPIEndpoint.ORBIT_SHIP.name: self.__orbit,
+            SpaceTradersAPIEndpoint.DOCK_SHIP.name: self.__dock,
+            SpaceTradersAPIEndpoint.NAVIGATE_SHIP.name: self.__navigate,
+            SpaceTradersAPIEndpoint.JUMP_SHIP.name: self.__jump,
+            SpaceTradersAPIEndpoint.REFUEL_SHIP.name: self.__refuel,
+            SpaceTradersAPIEndpoint.PURCHASE_CARGO.name: self.__purchase,
+            SpaceTradersAPIEndpoint.SELL_CARGO.name: self.__sell,
+            SpaceTradersAPIEndpoint.EXTRACT_RESOURCES.name: self.__extract,
+            SpaceTradersAPIEndpoint.JETTISON_CARGO.name: self.__jettison,
+            SpaceTradersAPIEndpoint.GET_CONTRACTS.name: self.__get_contracts,
+            SpaceTradersAPIEndpoint.GET_CONTRACT.name: self.__get_contract,
+            SpaceTradersAPIEndpoint.DELIVER_CONTRACT.name: self.__deliver,
+            SpaceTradersAPIEndpoint.FULFILL_CONTRACT.name: self.__fulfill,
+        }
+
+    def token(self) -> AgentToken:
+        """An unsigned token of the agent of the universe, which the server accepts."""
+        agent = self.universe.agent
+        claims = {
+            'identifier': agent['symbol'],
+            'version': VERSION,
+            'reset_date': _now().date().isoformat(),
+            'iat': int(time.time()),
+            'sub': 'agent-token',
+        }
+        return AgentToken(jwt.encode(claims, None, algorithm='none'))
+
+    def transport(self) -> httpx.MockTransport:
+        """A transport for `httpx.Client`, sleeping for the injected latency."""
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            if (latency := self.__latency()) > 0:
+                time.sleep(latency)
+            return self.handle(request)
+
+        return httpx.MockTransport(handle)
+
+    def async_transport(self) -> httpx.MockTransport:
+        """A transport for `httpx.AsyncClient`, awaiting the injected latency."""
+
+        async def handle(request: httpx.Request) -> httpx.Response:
+            if (latency := self.__latency()) > 0:
+                await asyncio.sleep(latency)
+            return self.handle(request)
+
+        return httpx.MockTransport(handle)
+
+    @contextmanager
+    def install(self) -> Iterator[MockSpaceTradersServer]:
+        """Send the requests of `SpaceTradersAPIClient` and `AsyncSpaceTradersAPIClient` to
+        this server until the context exits.
+
+        Requests routed to the budget of a configured account (see `BudgetDispatcher`)
+        still use the connection pool of that account. The clients of the server are
+        closed on exit, so the context is entered outside of a running event loop.
+        """
+        sync_client = SpaceTradersAPIClient.http_client
+        async_client = AsyncSpaceTradersAPIClient.http_client
+        mock_client = httpx.Client(transport=self.transport())
+        async_mock_client = httpx.AsyncClient(transport=self.async_transport())
+        SpaceTradersAPIClient.http_client = mock_client
+        AsyncSpaceTradersAPIClient.http_client = async_mock_client
+        try:
+            yield self
+        finally:
+            SpaceTradersAPIClient.http_client = sync_client
+            AsyncSpaceTradersAPIClient.http_client = async_client
+            mock_client.close()
+            asyncio.run(async_mock_client.aclose())
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer one request, without latency."""
+        with self.__lock:
+            res = self.__handle(request)
+            self.responses[res.status_code] += 1
+        return res
+
+    def __handle(self, request: httpx.Request) -> httpx.Response:
+        if self.__random.random() < self.faults.bad_gateway_rate:
+            return httpx.Response(HTTPStatus.BAD_GATEWAY, content=BAD_GATEWAY_BODY)
+
+        budget = self.__budget(request.headers.get('Authorization', ''))
+        headers = {'Content-Type': 'application/json'}
+        if not budget.take() or self.__random.random() < self.faults.ratelimit_rate:
+            return self.__ratelimited(budget, headers)
+        headers |= self.__ratelimit_headers(budget)
+
+        path = request.url.path.removeprefix(f'/{VERSION}') or '/'
+        route = _route(request.method, path)
+        if route is None:
+            error = MockError(HTTPStatus.NOT_FOUND, None, f'Cannot {request.method} {path}')
+            return self.__error(headers, error)
+
+        endpoint, params = route
+        self.requests[endpoint.name] += 1
+        if endpoint.token_type is not None and 'Authorization' not in request.headers:
+            return self.__error(
+                headers,
+                MockError(
+                    HTTPStatus.UNAUTHORIZED,
+                    SpaceTradersAPIErrorCodes.MISSING_TOKEN_REQUEST_ERROR,
+                    'Missing bearer token in the Authorization header.',
+                ),
+            )
+
+        data: JSON = json.loads(request.content) if request.content else {}
+        try:
+            if (handler := self.__handlers.get(endpoint.name)) is not None:
+                status, result = handler(params, data)
+            else:
+                status, shape = next(iter(endpoint.response_shapes.items()))
+                result = None if status is HTTPStatus.NO_CONTENT else fake(shape)
+        except MockError as e:
+            return self.__error(headers, e)
+
+        if result is None:
+            return httpx.Response(status, headers=headers)
+        shape = endpoint.response_shapes.get(status)
+        if shape is not None and not shape.wrapped:
+            # e.g. the server status, which is the whole body rather than its 'data'
+            body = result
+        elif isinstance(result, list) or endpoint.paginated:
+            items = result if isinstance(result, list) else result.get('data', [])
+            body = _page(items, request.url.params)
+        else:
+            body = {'data': result}
+        return httpx.Response(status, headers=headers, content=json.dumps(body).encode())
+
+    def __latency(self) -> float:
+        faults = self.faults
+        return faults.latency + (self.__random.uniform(0, faults.jitter) if faults.jitter else 0)
+
+    def __budget(self, authorization: str) -> _RateBudget:
+        if (budget := self.__budgets.get(authorization)) is None:
+            budget = self.__budgets[authorization] = _RateBudget(
+                self.limit_per_second, self.limit_burst, self.burst_duration
+            )
+        return budget
+
+    def __ratelimit_headers(self, budget: _RateBudget) -> dict[str, str]:
+        return {
+            'X-Ratelimit-Type': RateLimitType.ACCOUNT.value,
+            'X-Ratelimit-Limit-Per-Second': str(self.limit_per_second),
+            'X-Ratelimit-Limit-Burst': str(self.limit_burst),
+            'X-Ratelimit-Remaining': str(budget.remaining),
+            'X-Ratelimit-Reset': budget.reset.isoformat(),
+        }
+
+    def __ratelimited(self, budget: _RateBudget, headers: dict[str, str]) -> httpx.Response:
+        # Like the real API, a 429 resets once the next request would be accepted
+        retry_after = budget.retry_after()
+        reset = (_now() + timedelta(seconds=retry_after)).isoformat()
+        headers = headers | self.__ratelimit_headers(budget) | {'X-Ratelimit-Reset': reset}
+        body = {
+            'error': {
+                'code': HTTPStatus.TOO_MANY_REQUESTS.value,
+                'message': 'You have reached your API limit.',
+                'data': {
+                    'type': RateLimitType.ACCOUNT.value,
+                    'retryAfter': retry_after,
+                    'limitBurst': self.limit_burst,
+                    'limitPerSecond': self.limit_per_second,
+                    'remaining': budget.remaining,
+                    'reset': reset,
+                },
+            }
+        }
+        return httpx.Response(HTTPStatus.TOO_MANY_REQUESTS, headers=headers, json=body)
+
+    def __error(self, headers: dict[str, str], error: MockError) -> httpx.Response:
+        if error.code is None:
+            body = {
+                'code': error.status.value,
+                'error': error.status.phrase,
+                'message': error.message,
+            }
+            return httpx.Response(error.status, headers=headers, json=body)
+
+        body = {
+            'error': {
+                'code': error.code.value,
+                'message': error.message,
+                'data': error.data,
+                'requestId': f'mock-{self.__random.getrandbits(32):08x}',
+            }
+        }
+        return httpx.Response(error.status, headers=headers, json=body)
+
+    # Lookups
+
+    def __ship(self, params: dict[str, str]) -> JSON:
+        if (ship := self.universe.ships.get(params['ship_symbol'])) is None:
+            msg = f'Ship {params["ship_symbol"]} not found.'
+            raise MockError(HTTPStatus.NOT_FOUND, None, msg)
+
+        nav = ship['nav']
+        if nav['status'] == ShipNavStatus.IN_TRANSIT.value and _now() >= _time(
+            nav['route']['arrival']
+        ):
+            nav['status'] = ShipNavStatus.IN_ORBIT.value
+        cooldown = ship['cooldown']
+        if cooldown['remainingSeconds'] > 0:
+            remaining = (_time(cooldown['expiration']) - _now()).total_seconds()
+            cooldown['remainingSeconds'] = max(ceil(remaining), 0)
+        return ship
+
+    def __lookup(self, table: dict[str, JSON], key: str, kind: str) -> JSON:
+        if (value := table.get(key)) is None:
+            msg = f'{kind} {key} not found.'
+            raise MockError(HTTPStatus.NOT_FOUND, None, msg)
+        return value
+
+    def __market_at(self, ship: JSON) -> JSON:
+        waypoint_symbol = ship['nav']['waypointSymbol']
+        if (market := self.universe.markets.get(waypoint_symbol)) is None:
+            msg = f'No market at {waypoint_symbol}.'
+            raise MockError(HTTPStatus.NOT_FOUND, None, msg)
+        return market
+
+    @staticmethod
+    def __require_status(ship: JSON, status: ShipNavStatus) -> None:
+        current = ship['nav']['status']
+        if current == status.value:
+            return
+        if current == ShipNavStatus.IN_TRANSIT.value:
+            code = SpaceTradersAPIErrorCodes.SHIP_IN_TRANSIT_ERROR
+        elif status is ShipNavStatus.DOCKED:
+            code = SpaceTradersAPIErrorCodes.SHIP_NOT_DOCKED_ERROR
+        else:
+            code = SpaceTradersAPIErrorCodes.SHIP_NOT_IN_ORBIT_ERROR
+        msg = f'Ship {ship["symbol"]} must be {status.value}, it is {current}.'
+        raise MockError(HTTPStatus.BAD_REQUEST, code, msg)
+
+    def __require_cooldown(self, ship: JSON) -> None:
+        if ship['cooldown']['remainingSeconds'] > 0:
+            msg = f'Ship {ship["symbol"]} is on cooldown.'
+            raise MockError(
+                HTTPStatus.CONFLICT,
+                SpaceTradersAPIErrorCodes.COOLDOWN_CONFLICT_ERROR,
+                msg,
+                {'cooldown': ship['cooldown']},
+            )
+
+    def __start_cooldown(self, ship: JSON, seconds: int) -> None:
+        seconds = ceil(seconds * self.time_scale)
+        ship['cooldown'] = {
+            'shipSymbol': ship['symbol'],
+            'totalSeconds': seconds,
+            'remainingSeconds': seconds,
+            'expiration': (_now() + timedelta(seconds=seconds)).isoformat(),
+        }
+
+    # Universe
+
+    def __get_agent(self, _params: dict[str, str], _data: JSON) -> Result:
+        return HTTPStatus.OK, self.universe.agent
+
+    def __get_systems(self, _params: dict[str, str], _data: JSON) -> Result:
+        return HTTPStatus.OK, list(self.universe.systems.values())
+
+    def __get_system(self, params: dict[str, str], _data: JSON) -> Result:
+        symbol = params['system_symbol']
+        return HTTPStatus.OK, self.__lookup(self.universe.systems, symbol, 'System')
+
+    def __get_waypoints(self, params: dict[str, str], _data: JSON) -> Result:
+        system = self.__lookup(self.universe.systems, params['system_symbol'], 'System')
+        waypoints = self.universe.waypoints
+        return HTTPStatus.OK, [waypoints[listed['symbol']] for listed in system['waypoints']]
+
+    def __get_waypoint(self, params: dict[str, str], _data: JSON) -> Result:
+        symbol = params['waypoint_symbol']
+        return HTTPStatus.OK, self.__lookup(self.universe.waypoints, symbol, 'Waypoint')
+
+    def __get_market(self, params: dict[str, str], _data: JSON) -> Result:
+        symbol = params['waypoint_symbol']
+        market = self.__lookup(self.universe.markets, symbol, 'Market')
+        # Prices are only visible with a ship at the market
+        ships = self.universe.ships.values()
+        if not any(ship['nav']['waypointSymbol'] == symbol for ship in ships):
+            return HTTPStatus.OK, market | {'tradeGoods': [], 'transactions': []}
+        return HTTPStatus.OK, market
+
+    def __get_jump_gate(self, params: dict[str, str], _data: JSON) -> Result:
+        symbol = params['waypoint_symbol']
+        return HTTPStatus.OK, self.__lookup(self.universe.jump_gates, symbol, 'Jump gate')
+
+    # Ships
+
+    def __get_ships(self, _params: dict[str, str], _data: JSON) -> Result:
+        return HTTPStatus.OK, [self.__ship({'ship_symbol': s}) for s in self.universe.ships]
+
+    def __get_ship(self, params: dict[str, str], _data: JSON) -> Result:
+        return HTTPStatus.OK, self.__ship(params)
+
+    def __get_cargo(self, params: dict[str, str], _data: JSON) -> Result:
+        return HTTPStatus.OK, self.__ship(params)['cargo']
+
+    def __get_nav(self, params: dict[str, str], _data: JSON) -> Result:
+        return HTTPStatus.OK, self.__ship(params)['nav']
+
+    def __update_nav(self, params: dict[str, str], data: JSON) -> Result:
+        ship = self.__ship(params)
+        ship['nav']['flightMode'] = ShipNavFlightMode(data['flightMode']).value
+        return HTTPStatus.OK, fake(
+            ShipNavUpdateShape, nav=ship['nav'], fuel=ship['fuel'], events=[]
+        )
+
+    def __get_cooldown(self, params: dict[str, str], _data: JSON) -> Result:
+        cooldown = self.__ship(params)['cooldown']
+        if cooldown['remainingSeconds'] == 0:
+            return HTTPStatus.NO_CONTENT, None
+        return HTTPStatus.OK, cooldown
+
+    def __orbit(self, params: dict[str, str], _data: JSON) -> Result:
+        ship = self.__ship(params)
+        if ship['nav']['status'] != ShipNavStatus.IN_ORBIT.value:
+            self.__require_status(ship, ShipNavStatus.DOCKED)
+            ship['nav']['status'] = ShipNavStatus.IN_ORBIT.value
+        return HTTPStatus.OK, ship['nav']
+
+    def __dock(self, params: dict[str, str], _data: JSON) -> Result:
+        ship = self.__ship(params)
+        if ship['nav']['status'] != ShipNavStatus.DOCKED.value:
+            self.__require_status(ship, ShipNavStatus.IN_ORBIT)
+            ship['nav']['status'] = ShipNavStatus.DOCKED.value
+        return HTTPStatus.OK, ship['nav']
+
+    def __navigate(self, params: dict[str, str], data: JSON) -> Result:
+        ship = self.__ship(params)
+        self.__require_status(ship, ShipNavStatus.IN_ORBIT)
+        nav, fuel = ship['nav'], ship['fuel']
+        origin_symbol, destination_symbol = nav['waypointSymbol'], data['waypointSymbol']
+        destination = self.__lookup(self.universe.waypoints, destination_symbol, 'Waypoint')
+        if destination_symbol == origin_symbol:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.NAVIGATE_SAME_DESTINATION_ERROR,
+                f'Ship {ship["symbol"]} is already at {destination_symbol}.',
+            )
+
+        mode = ShipNavFlightMode(nav['flightMode'])
+        dist = self.universe.distance(origin_symbol, destination_symbol)
+        required = fuel_cost(dist, mode)
+        if fuel['capacity'] > 0 and required > fuel['current']:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.NAVIGATE_INSUFFICIENT_FUEL_ERROR,
+                f'Navigate requires {required} fuel, ship has {fuel["current"]}.',
+            )
+
+        now = _now()
+        seconds = flight_time(dist, ship['engine']['speed'], mode) * self.time_scale
+        if fuel['capacity'] > 0:
+            fuel['current'] -= required
+            fuel['consumed'] = {'amount': required, 'timestamp': now.isoformat()}
+        origin = self.universe.waypoints[origin_symbol]
+        nav['route'] = {
+            'origin': _location(origin),
+            'destination': _location(destination),
+            'departureTime': now.isoformat(),
+            'arrival': (now + timedelta(seconds=seconds)).isoformat(),
+        }
+        nav['waypointSymbol'] = destination_symbol
+        nav['status'] = ShipNavStatus.IN_TRANSIT.value
+        return HTTPStatus.OK, fake(ShipNavigationShape, nav=nav, fuel=fuel)
+
+    def __jump(self, params: dict[str, str], data: JSON) -> Result:
+        ship = self.__ship(params)
+        self.__require_status(ship, ShipNavStatus.IN_ORBIT)
+        self.__require_cooldown(ship)
+        nav = ship['nav']
+        gate = self.universe.jump_gates.get(nav['waypointSymbol'])
+        destination_symbol = data['waypointSymbol']
+        if gate is None:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.SHIP_JUMP_INVALID_ORIGIN_ERROR,
+                f'Ship {ship["symbol"]} is not at a jump gate.',
+            )
+        if destination_symbol not in gate['connections']:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.SHIP_JUMP_INVALID_WAYPOINT_ERROR,
+                f'{destination_symbol} is not connected to {gate["symbol"]}.',
+            )
+
+        destination = self.universe.waypoints[destination_symbol]
+        nav['route'] = {
+            'origin': _location(self.universe.waypoints[nav['waypointSymbol']]),
+            'destination': _location(destination),
+            'departureTime': _now().isoformat(),
+            'arrival': _now().isoformat(),
+        }
+        nav['systemSymbol'] = destination['systemSymbol']
+        nav['waypointSymbol'] = destination_symbol
+        self.__start_cooldown(ship, JUMP_COOLDOWN)
+        return HTTPStatus.OK, self.__transaction(ship, TradeSymbol.ANTIMATTER, 0, 0, True)
+
+    def __refuel(self, params: dict[str, str], data: JSON) -> Result:
+        ship = self.__ship(params)
+        self.__require_status(ship, ShipNavStatus.DOCKED)
+        market = self.__market_at(ship)
+        fuel = ship['fuel']
+        good = self.__good(market, TradeSymbol.FUEL)
+        units = min(data.get('units') or fuel['capacity'], fuel['capacity'] - fuel['current'])
+        price = ceil(units / FUEL_PER_UNIT) * good['purchasePrice']
+        self.__charge(price)
+        fuel['current'] += units
+        transaction = self.__transaction(ship, TradeSymbol.FUEL, units, price, True)
+        market['transactions'] = [*market['transactions'], transaction][-MARKET_TRANSACTIONS:]
+        return HTTPStatus.OK, fake(
+            ShipRefuelResShape,
+            agent=self.universe.agent,
+            fuel=fuel,
+            cargo=ship['cargo'],
+            transaction=transaction,
+        )
+
+    def __purchase(self, params: dict[str, str], data: JSON) -> Result:
+        return HTTPStatus.CREATED, self.__trade(params, data, purchase=True)
+
+    def __sell(self, params: dict[str, str], data: JSON) -> Result:
+        return HTTPStatus.CREATED, self.__trade(params, data, purchase=False)
+
+    def __trade(self, params: dict[str, str], data: JSON, purchase: bool) -> JSON:
+        ship = self.__ship(params)
+        self.__require_status(ship, ShipNavStatus.DOCKED)
+        market = self.__market_at(ship)
+        trade_symbol, units = TradeSymbol(data['symbol']), int(data['units'])
+        good = self.__good(market, trade_symbol)
+        if units > good['tradeVolume']:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.MARKET_TRADE_UNIT_LIMIT_ERROR,
+                f'Market trades at most {good["tradeVolume"]} units of {trade_symbol.value}.',
+            )
+
+        cargo = ship['cargo']
+        if purchase:
+            price = good['purchasePrice'] * units
+            if cargo['units'] + units > cargo['capacity']:
+                raise MockError(
+                    HTTPStatus.BAD_REQUEST,
+                    SpaceTradersAPIErrorCodes.SHIP_CARGO_EXCEEDS_LIMIT_ERROR,
+                    f'Ship {ship["symbol"]} cannot hold {units} more units.',
+                )
+            self.__charge(price)
+            _adjust_cargo(cargo, trade_symbol, units)
+        else:
+            price = good['sellPrice'] * units
+            self.__unload(ship, trade_symbol, units)
+            self.universe.agent['credits'] += price
+
+        # Buying drives prices up, selling drives them down
+        impact = 1 + PRICE_IMPACT * units / good['tradeVolume'] * (1 if purchase else -1)
+        good['purchasePrice'] = max(1, round(good['purchasePrice'] * impact))
+        good['sellPrice'] = max(1, round(good['sellPrice'] * impact))
+
+        transaction = self.__transaction(ship, trade_symbol, units, price, purchase)
+        market['transactions'] = [*market['transactions'], transaction][-MARKET_TRANSACTIONS:]
+        return transaction
+
+    def __extract(self, params: dict[str, str], _data: JSON) -> Result:
+        ship = self.__ship(params)
+        self.__require_status(ship, ShipNavStatus.IN_ORBIT)
+        self.__require_cooldown(ship)
+        waypoint = self.universe.waypoints[ship['nav']['waypointSymbol']]
+        if waypoint['type'] != WaypointType.ASTEROID.value:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.SHIP_EXTRACT_INVALID_WAYPOINT_ERROR,
+                f'Cannot extract at {waypoint["symbol"]}, it is not an asteroid.',
+            )
+
+        cargo = ship['cargo']
+        units = min(self.__random.randint(1, 8), cargo['capacity'] - cargo['units'])
+        if units <= 0:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.SHIP_CARGO_FULL_ERROR,
+                f'Ship {ship["symbol"]} has no cargo space left.',
+            )
+
+        trade_symbol = self.__random.choice(ORES)
+        _adjust_cargo(cargo, trade_symbol, units)
+        self.__start_cooldown(ship, EXTRACTION_COOLDOWN)
+        extraction = {
+            'shipSymbol': ship['symbol'],
+            'yield': {'symbol': trade_symbol.value, 'units': units},
+        }
+        return HTTPStatus.CREATED, fake(
+            ShipExtractionShape, extraction=extraction, cooldown=ship['cooldown'], cargo=cargo
+        )
+
+    def __jettison(self, params: dict[str, str], data: JSON) -> Result:
+        ship = self.__ship(params)
+        self.__unload(ship, TradeSymbol(data['symbol']), int(data['units']))
+        return HTTPStatus.OK, ship['cargo']
+
+    # Contracts
+
+    def __get_contracts(self, _params: dict[str, str], _data: JSON) -> Result:
+        return HTTPStatus.OK, list(self.universe.contracts.values())
+
+    def __get_contract(self, params: dict[str, str], _data: JSON) -> Result:
+        contract_id = params['contract_id']
+        return HTTPStatus.OK, self.__lookup(self.universe.contracts, contract_id, 'Contract')
+
+    def __deliver(self, params: dict[str, str], data: JSON) -> Result:
+        contract_id = params['contract_id']
+        contract = self.__lookup(self.universe.contracts, contract_id, 'Contract')
+        ship = self.__ship({'ship_symbol': data['shipSymbol']})
+        self.__require_status(ship, ShipNavStatus.DOCKED)
+        term = next(
+            (t for t in contract['terms']['deliver'] if t['tradeSymbol'] == data['tradeSymbol']),
+            None,
+        )
+        if term is None or term['destinationSymbol'] != ship['nav']['waypointSymbol']:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.SHIP_DELIVER_INVALID_LOCATION_ERROR,
+                f'Contract {contract_id} takes no {data["tradeSymbol"]} here.',
+            )
+
+        units = min(int(data['units']), term['unitsRequired'] - term['unitsFulfilled'])
+        self.__unload(ship, TradeSymbol(data['tradeSymbol']), units)
+        term['unitsFulfilled'] += units
+        return HTTPStatus.OK, {'contract': contract, 'cargo': ship['cargo']}
+
+    def __fulfill(self, params: dict[str, str], _data: JSON) -> Result:
+        contract_id = params['contract_id']
+        contract = self.__lookup(self.universe.contracts, contract_id, 'Contract')
+        if contract['fulfilled']:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.CONTRACT_FULFILLED_ERROR,
+                f'Contract {contract_id} is already fulfilled.',
+            )
+        if any(t['unitsFulfilled'] < t['unitsRequired'] for t in contract['terms']['deliver']):
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.FULFILL_CONTRACT_DELIVERY_ERROR,
+                f'Contract {contract_id} has undelivered terms.',
+            )
+
+        contract['fulfilled'] = True
+        self.universe.agent['credits'] += contract['terms']['payment']['onFulfilled']
+        return HTTPStatus.OK, contract
+
+    # Trading
+
+    @staticmethod
+    def __good(market: JSON, trade_symbol: TradeSymbol) -> JSON:
+        for good in market['tradeGoods']:
+            if good['symbol'] == trade_symbol.value:
+                return good
+        raise MockError(
+            HTTPStatus.BAD_REQUEST,
+            SpaceTradersAPIErrorCodes.MARKET_TRADE_NOT_SOLD_ERROR,
+            f'Market {market["symbol"]} does not trade {trade_symbol.value}.',
+        )
+
+    def __charge(self, price: int) -> None:
+        agent = self.universe.agent
+        if price > agent['credits']:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.MARKET_TRADE_INSUFFICIENT_CREDITS_ERROR,
+                f'Agent has {agent["credits"]} credits, {price} are required.',
+            )
+        agent['credits'] -= price
+
+    @staticmethod
+    def __unload(ship: JSON, trade_symbol: TradeSymbol, units: int) -> None:
+        cargo = ship['cargo']
+        held = sum(i['units'] for i in cargo['inventory'] if i['symbol'] == trade_symbol.value)
+        if held < units:
+            raise MockError(
+                HTTPStatus.BAD_REQUEST,
+                SpaceTradersAPIErrorCodes.SHIP_CARGO_UNIT_COUNT_ERROR,
+                f'Ship {ship["symbol"]} holds {held} units of {trade_symbol.value}.',
+            )
+        _adjust_cargo(cargo, trade_symbol, -units)
+
+    @staticmethod
+    def __transaction(
+        ship: JSON, trade_symbol: TradeSymbol, units: int, total: int, purchase: bool
+    ) -> JSON:
+        return {
+            'waypointSymbol': ship['nav']['waypointSymbol'],
+            'shipSymbol': ship['symbol'],
+            'tradeSymbol': trade_symbol.value,
+            'type': (TransactionType.PURCHASE if purchase else TransactionType.SELL).value,
+            'units': units,
+            'pricePerUnit': total // units if units else 0,
+            'totalPrice': total,
+            'timestamp': _now().isoformat(),
+        }
+
+
+def _compile_routes() -> dict[str, list[tuple[re.Pattern[str], SpaceTradersAPIEndpoint]]]:
+    """Path patterns of every endpoint by method, templates with fewer parameters first so
+    that a literal segment wins over a parameter.
+    """
+    routes: dict[str, list[tuple[re.Pattern[str], SpaceTradersAPIEndpoint]]] = {}
+    endpoints = sorted(SpaceTradersAPIEndpoint, key=lambda e: len(e.path.get_identifiers()))
+    for endpoint in endpoints:
+        pattern = re.sub(r'\$(\w+)', r'(?P<\1>[^/]+)', endpoint.path.template)
+        routes.setdefault(endpoint.method, []).append((re.compile(pattern), endpoint))
+    return routes
+
+
+_ROUTES = _compile_routes()
+
+
+def _route(method: str, path: str) -> tuple[SpaceTradersAPIEndpoint, dict[str, str]] | None:
+    for pattern, endpoint in _ROUTES.get(method, ()):
+        if (match := pattern.fullmatch(path)) is not None:
+            return endpoint, match.groupdict()
+    return None
+
+
+def _page(items: list[JSON], query: httpx.QueryParams) -> JSON:
+    page, limit = int(query.get('page', 1)), int(query.get('limit', 10))
+    start = (page - 1) * limit
+    return {
+        'data': items[start : start + limit],
+        'meta': {'total': len(items), 'page': page, 'limit': limit},
+    }
+
+
+def _adjust_cargo(cargo: JSON, trade_symbol: TradeSymbol, units: int) -> None:
+    inventory = cargo['inventory']
+    for item in inventory:
+        if item['symbol'] == trade_symbol.value:
+            item['units'] += units
+            break
+    else:
+        inventory.append({
+            'symbol': trade_symbol.value,
+            'name': trade_symbol.name,
+            'description': '',
+            'units': units,
+        })  # fmt: skip
+    cargo['inventory'] = [item for item in inventory if item['units'] > 0]
+    cargo['units'] = sum(item['units'] for item in cargo['inventory'])
+
+
+def _location(waypoint: JSON) -> JSON:
+    return {key: waypoint[key] for key in ('symbol', 'type', 'systemSymbol', 'x', 'y')}
+
+
+def _now() -> datetime:
+    return datetime.now(tz=UTC)
+
+
+def _time(value: str) -> datetime:
+    return datetime.fromisoformat(value)
@@ -0,0 +1,276 @@
+"""The state of a simulated SpaceTraders universe, as the JSON the API would return.
+
+State is kept in the camelCase JSON form of the response shapes, so the mock server
+returns it without serializing any models.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from random import Random
+from typing import Any
+
+from deltav.planning.navigation import distance
+from deltav.spacetraders import Coordinate
+from deltav.spacetraders.enums.market import (
+    ActivityLevel,
+    MarketTradeGoodType,
+    SupplyLevel,
+    TradeSymbol,
+)
+from deltav.spacetraders.enums.ship import ShipNavFlightMode, ShipNavStatus
+from deltav.spacetraders.enums.system import SystemType
+from deltav.spacetraders.enums.waypoint import WaypointTraitSymbol, WaypointType
+from deltav.spacetraders.mock.fake import fake
+from deltav.spacetraders.models.agent import AgentShape
+from deltav.spacetraders.models.contract import ContractShape
+from deltav.spacetraders.models.market import MarketShape
+from deltav.spacetraders.models.ship import ShipShape
+from deltav.spacetraders.models.systems import JumpgateShape, SystemShape
+from deltav.spacetraders.models.waypoint import WaypointShape
+
+JSON = dict[str, Any]
+
+# Goods traded at the markets of the universe, besides FUEL which every market trades
+GOODS: tuple[TradeSymbol, ...] = (
+    TradeSymbol.IRON_ORE,
+    TradeSymbol.COPPER_ORE,
+    TradeSymbol.ALUMINUM_ORE,
+    TradeSymbol.QUARTZ_SAND,
+    TradeSymbol.ICE_WATER,
+    TradeSymbol.IRON,
+    TradeSymbol.COPPER,
+    TradeSymbol.ALUMINUM,
+    TradeSymbol.FOOD,
+    TradeSymbol.FABRICS,
+    TradeSymbol.MACHINERY,
+    TradeSymbol.ELECTRONICS,
+    TradeSymbol.MEDICINE,
+    TradeSymbol.EQUIPMENT,
+    TradeSymbol.PLASTICS,
+)
+# Resources yielded by extracting at an asteroid
+ORES: tuple[TradeSymbol, ...] = GOODS[:5]
+
+STARTING_CREDITS: int = 175_000
+SHIP_CARGO_CAPACITY: int = 40
+SHIP_FUEL_CAPACITY: int = 400
+SHIP_ENGINE_SPEED: int = 30
+CONTRACT_DURATION: timedelta = timedelta(days=7)
+
+
+class MockUniverse:
+    """Systems, waypoints, markets and jump gates, and the ships and contracts of one agent.
+
+    Attributes:
+        systems: Every system, by symbol.
+        waypoints: Every waypoint, by symbol.
+        markets: The market of every waypoint with a marketplace, by waypoint symbol.
+        jump_gates: The jump gate of every system, by waypoint symbol.
+        agent: The agent, with its credits.
+        ships: The ships of the agent, by symbol.
+        contracts: The contracts of the agent, by id.
+    """
+
+    def __init__(self) -> None:
+        self.systems: dict[str, JSON] = {}
+        self.waypoints: dict[str, JSON] = {}
+        self.markets: dict[str, JSON] = {}
+        self.jump_gates: dict[str, JSON] = {}
+        self.agent: JSON = fake(AgentShape)
+        self.ships: dict[str, JSON] = {}
+        self.contracts: dict[str, JSON] = {}
+
+    @classmethod
+    def generate(
+        cls,
+        seed: int = 0,
+        systems: int = 20,
+        waypoints_per_system: int = 12,
+        ships: int = 10,
+        agent_symbol: str = 'MOCK',
+        market_share: float = 0.5,
+    ) -> MockUniverse:
+        """Generate a universe, the same for the same arguments.
+
+        Every system has a jump gate connected to the gates of its nearest systems, some
+        asteroids and a `market_share` of its other waypoints have a market. Every ship
+        of the agent starts docked at a market in the first system.
+        """
+        random = Random(seed)
+        universe = cls()
+        spread = int(300 * systems**0.5)
+        for i in range(systems):
+            coordinate = Coordinate(*random.choices(range(-spread, spread), k=2))
+            universe.__add_system(
+                random, f'X1-S{i}', coordinate, waypoints_per_system, market_share
+            )
+        universe.__connect_gates()
+
+        home = next(iter(universe.systems))
+        markets = [symbol for symbol in universe.markets if symbol.startswith(f'{home}-')]
+        universe.agent = fake(
+            AgentShape,
+            accountId=f'{agent_symbol.lower()}-account',
+            symbol=agent_symbol,
+            headquarters=markets[0],
+            credits=STARTING_CREDITS,
+            shipCount=ships,
+        )
+        for i in range(ships):
+            universe.__add_ship(f'{agent_symbol}-{i + 1:X}', universe.waypoints[markets[0]])
+        for i, market in enumerate(markets[:3]):
+            universe.__add_contract(random, f'contract-{i}', universe.markets[market], home)
+        return universe
+
+    @staticmethod
+    def system_symbol(waypoint_symbol: str) -> str:
+        return waypoint_symbol.rsplit('-', 1)[0]
+
+    def coordinate(self, waypoint_symbol: str) -> Coordinate:
+        waypoint = self.waypoints[waypoint_symbol]
+        return Coordinate(waypoint['x'], waypoint['y'])
+
+    def distance(self, a: str, b: str) -> float:
+        return distance(self.coordinate(a), self.coordinate(b))
+
+    def __add_system(
+        self,
+        random: Random,
+        symbol: str,
+        coordinate: Coordinate,
+        waypoint_count: int,
+        market_share: float,
+    ) -> None:
+        listed: list[JSON] = []
+        for j in range(waypoint_count):
+            waypoint_symbol = f'{symbol}-W{j}'
+            if j == 0:
+                waypoint_type = WaypointType.JUMP_GATE
+            elif j <= max(1, waypoint_count // 4):
+                waypoint_type = WaypointType.ASTEROID
+            else:
+                waypoint_type = random.choice((
+                    WaypointType.PLANET, WaypointType.MOON, WaypointType.ORBITAL_STATION
+                ))  # fmt: skip
+
+            has_market = j > 0 and random.random() < market_share
+            traits = [WaypointTraitSymbol.MARKETPLACE] if has_market else []
+            waypoint = fake(
+                WaypointShape,
+                symbol=waypoint_symbol,
+                type=waypoint_type.value,
+                systemSymbol=symbol,
+                x=random.randint(-80, 80),
+                y=random.randint(-80, 80),
+                traits=[
+                    {'symbol': trait.value, 'name': trait.name, 'description': ''}
+                    for trait in traits
+                ],
+            )
+            self.waypoints[waypoint_symbol] = waypoint
+            listed.append({key: waypoint[key] for key in _SYSTEM_WAYPOINT_KEYS})
+            if has_market:
+                self.markets[waypoint_symbol] = self.__market(random, waypoint_symbol)
+            if waypoint_type is WaypointType.JUMP_GATE:
+                self.jump_gates[waypoint_symbol] = fake(
+                    JumpgateShape, symbol=waypoint_symbol, connections=[]
+                )
+
+        self.systems[symbol] = fake(
+            SystemShape,
+            symbol=symbol,
+            sectorSymbol='X1',
+            constellation='MOCK',
+            name=symbol,
+            type=random.choice(list(SystemType)).value,
+            x=coordinate.x,
+            y=coordinate.y,
+            waypoints=listed,
+        )
+
+    def __connect_gates(self, connections: int = 3) -> None:
+        systems = list(self.systems.values())
+        for system in systems:
+            nearest = sorted(
+                (other for other in systems if other is not system),
+                key=lambda other: (other['x'] - system['x']) ** 2 + (other['y'] - system['y']) ** 2,
+            )[:connections]
+            gate = self.jump_gates[f'{system["symbol"]}-W0']
+            for other in nearest:
+                other_gate = self.jump_gates[f'{other["symbol"]}-W0']
+                if other_gate['symbol'] not in gate['connections']:
+                    gate['connections'].append(other_gate['symbol'])
+                    other_gate['connections'].append(gate['symbol'])
+
+    @staticmethod
+    def __market(random: Random, waypoint_symbol: str) -> JSON:
+        goods = [TradeSymbol.FUEL, *random.sample(GOODS, random.randint(3, 8))]
+        items: dict[MarketTradeGoodType, list[JSON]] = {kind: [] for kind in MarketTradeGoodType}
+        trade_goods: list[JSON] = []
+        for good in goods:
+            kind = (
+                MarketTradeGoodType.EXCHANGE
+                if good is TradeSymbol.FUEL
+                else random.choice(list(MarketTradeGoodType))
+            )
+            base = 72 if good is TradeSymbol.FUEL else random.randint(20, 4000)
+            purchase_price = int(base * random.uniform(0.9, 1.2))
+            items[kind].append({'symbol': good.value, 'name': good.name, 'description': ''})
+            trade_goods.append({
+                'symbol': good.value,
+                'type': kind.value,
+                'tradeVolume': random.choice((10, 20, 40, 60)),
+                'supply': random.choice(list(SupplyLevel)).value,
+                'activity': random.choice(list(ActivityLevel)).value,
+                'purchasePrice': purchase_price,
+                'sellPrice': int(purchase_price * random.uniform(0.85, 0.98)),
+            })  # fmt: skip
+
+        return fake(
+            MarketShape,
+            symbol=waypoint_symbol,
+            exports=items[MarketTradeGoodType.EXPORT],
+            imports=items[MarketTradeGoodType.IMPORT],
+            exchange=items[MarketTradeGoodType.EXCHANGE],
+            tradeGoods=trade_goods,
+        )
+
+    def __add_ship(self, symbol: str, waypoint: JSON) -> None:
+        ship = fake(ShipShape, symbol=symbol)
+        location = {key: waypoint[key] for key in ('symbol', 'type', 'systemSymbol', 'x', 'y')}
+        ship['registration'] |= {'name': symbol, 'factionSymbol': 'COSMIC', 'role': 'HAULER'}
+        ship['nav'] |= {
+            'systemSymbol': waypoint['systemSymbol'],
+            'waypointSymbol': waypoint['symbol'],
+            'status': ShipNavStatus.DOCKED.value,
+            'flightMode': ShipNavFlightMode.CRUISE.value,
+        }
+        ship['nav']['route'] |= {'origin': location, 'destination': dict(location)}
+        ship['engine']['speed'] = SHIP_ENGINE_SPEED
+        ship['fuel'] |= {'current': SHIP_FUEL_CAPACITY, 'capacity': SHIP_FUEL_CAPACITY}
+        ship['cargo'] |= {'capacity': SHIP_CARGO_CAPACITY, 'units': 0, 'inventory': []}
+        ship['cooldown'] |= {'shipSymbol': symbol, 'totalSeconds': 0, 'remainingSeconds': 0}
+        self.ships[symbol] = ship
+
+    def __add_contract(
+        self, random: Random, contract_id: str, market: JSON, system_symbol: str
+    ) -> None:
+        good = random.choice([g for g in market['tradeGoods'] if g['symbol'] != 'FUEL'])
+        destination = random.choice([s for s in self.markets if s.startswith(f'{system_symbol}-')])
+        contract = fake(ContractShape, id=contract_id, accepted=True, factionSymbol='COSMIC')
+        contract['terms']['deliver'] = [{
+            'tradeSymbol': good['symbol'],
+            'destinationSymbol': destination,
+            'unitsRequired': random.randint(20, 120),
+            'unitsFulfilled': 0,
+        }]  # fmt: skip
+        contract['terms']['payment'] = {'onAccepted': 10_000, 'onFulfilled': 50_000}
+        contract['terms']['deadline'] = (datetime.now(tz=UTC) + CONTRACT_DURATION).isoformat()
+        self.contracts[contract_id] = contract
+
+
+# The keys of a waypoint listed in its system
+_SYSTEM_WAYPOINT_KEYS: tuple[str, ...] = (
+    'symbol', 'type', 'systemSymbol', 'x', 'y', 'orbitals', 'orbits'
+)  # fmt: skip
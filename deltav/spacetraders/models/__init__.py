@@ -1,7 +1,13 @@
 # pyright: reportAny=false
 from __future__ import annotations
 
-from typing import TypeVar, override
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime
+from functools import reduce
+from http import HTTPStatus
+from importlib import import_module
+from pkgutil import iter_modules
+from typing import Any, ClassVar, TypeVar, override
 
 from deepmerge import always_merger
 from pydantic import AliasGenerator, BaseModel, ConfigDict
@@ -29,7 +35,8 @@ class SpaceTradersAPIReqShape(BaseModel):
     model_config = ConfigDict(  # pyright: ignore[reportUnannotatedClassAttribute]
         alias_generator=AliasGenerator(validation_alias=to_camel, serialization_alias=to_camel),
         revalidate_instances='always',
-        serialize_by_alias=True
+        serialize_by_alias=True,
+        validate_by_name=True,
     )  # fmt: skip
 
     @property
@@ -52,11 +59,16 @@ class SpaceTradersAPIResShape(BaseModel):
     Inherits from pydantic.BaseModel.
     """
 
+    # Instances are only ever built by validation, so nested instances (e.g. the items
+    # of pages combined by `concat_models()`) are trusted rather than validated again
     model_config = ConfigDict(  # pyright: ignore[reportUnannotatedClassAttribute]
         alias_generator=to_camel,
-        revalidate_instances='always',
+        revalidate_instances='never',
         validate_by_alias=True,
     )  # fmt: skip
+    # Whether the shape is sent as the 'data' of the response body, rather than as the
+    # whole body (e.g. `ServerStatusShape`)
+    wrapped: ClassVar[bool] = True
 
     @property
     def pretty(self) -> str:
@@ -98,3 +110,65 @@ def merge_models(base: T, nxt: T) -> T:
     next_dict = nxt.model_dump(exclude_unset=True)
     merged_dict = always_merger.merge(base_dict, next_dict)
     return base.model_validate(merged_dict, by_name=True)
+
+
+def paged_field(shape: type[SpaceTradersAPIResShape]) -> str | None:
+    """The name of the list field of a paged list shape (e.g. `ShipsShape.ships`).
+
+    Paged list shapes have a single field, validated from the top level 'data' key
+    of the response. Returns None for any other shape.
+    """
+    if len(shape.model_fields) != 1:
+        return None
+
+    name, field = next(iter(shape.model_fields.items()))
+    return name if field.alias == 'data' else None
+
+
+def concat_models(models: Sequence[T]) -> T:
+    """Combine the pages of a paged response into one model instance.
+
+    For paged list shapes the already validated items of every page are appended to one
+    list, which is validated once, so combining N pages is linear in the number of items.
+    Any other shape is folded together with `merge_models`.
+    """
+    base = models[0]
+    name = paged_field(type(base))
+    if name is None:
+        return reduce(merge_models, models)
+
+    items = [item for model in models for item in getattr(model, name)]
+    return base.model_validate({name: items}, by_name=True)
+
+
+def resolve_shapes() -> None:
+    """Resolve the field annotations of every shape.
+
+    Shape modules import the types of their fields only for type checking, to avoid
+    import cycles between them, so pydantic cannot resolve the annotations when the
+    classes are created. Once every shape and enum module is imported the names are
+    resolved here, otherwise validating most shapes raises `PydanticUserError`.
+    """
+    from deltav.spacetraders import enums, models  # noqa: PLC0415
+
+    namespace: dict[str, Any] = {
+        'date': date,
+        'datetime': datetime,
+        'HTTPStatus': HTTPStatus,
+        'Mapping': Mapping,
+        'Sequence': Sequence,
+    }
+    for package in (models, enums):
+        for info in iter_modules(package.__path__):
+            module = import_module(f'{package.__name__}.{info.name}')
+            namespace.update(
+                (name, value)
+                for name, value in vars(module).items()
+                if isinstance(value, type) and value.__module__ == module.__name__
+            )
+
+    def subclasses(cls: type[BaseModel]) -> list[type[BaseModel]]:
+        return [sub for child in cls.__subclasses__() for sub in (child, *subclasses(child))]
+
+    for shape in (*subclasses(SpaceTradersAPIReqShape), *subclasses(SpaceTradersAPIResShape)):
+        _ = shape.model_rebuild(_types_namespace=namespace)
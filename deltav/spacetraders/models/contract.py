@@ -14,6 +14,7 @@ if TYPE_CHECKING:
     from deltav.spacetraders.enums.faction import FactionSymbol
     from deltav.spacetraders.enums.market import TradeSymbol
     from deltav.spacetraders.models.agent import AgentShape
+    from deltav.spacetraders.models.ship import ShipCargoShape
 
 
 class ContractShape(SpaceTradersAPIResShape):
@@ -57,6 +58,21 @@ class ContractAcceptShape(SpaceTradersAPIResShape):
     agent: AgentShape
 
 
+class ContractDeliverGoodShape(SpaceTradersAPIResShape):
+    """
+
+    trade_symbol: TradeSymbol
+    destination_symbol: str
+    units_required: int
+    units_fulfilled: int
+    """
+
+    trade_symbol: TradeSymbol
+    destination_symbol: str
+    units_required: int
+    units_fulfilled: int
+
+
 class ContractDeliverReqShape(SpaceTradersAPIReqShape):
     """
 
@@ -73,16 +89,12 @@ class ContractDeliverReqShape(SpaceTradersAPIReqShape):
 class ContractDeliverResShape(SpaceTradersAPIResShape):
     """
 
-    trade_symbol: TradeSymbol
-    destination_symbol: str
-    units_required: int
-    units_fulfilled: int
+    contract: ContractShape
+    cargo: ShipCargoShape
     """
 
-    trade_symbol: TradeSymbol
-    destination_symbol: str
-    units_required: int
-    units_fulfilled: int
+    contract: ContractShape
+    cargo: ShipCargoShape
 
 
 class ContractPaymentShape(SpaceTradersAPIResShape):
@@ -101,9 +113,9 @@ class ContractTermsShape(SpaceTradersAPIResShape):
 
     deadline: datetime
     payment: ContractPaymentShape
-    deliver: list[ContractDeliverResShape]
+    deliver: list[ContractDeliverGoodShape]
     """
 
     deadline: datetime
     payment: ContractPaymentShape
-    deliver: list[ContractDeliverResShape]
+    deliver: list[ContractDeliverGoodShape]
@@ -56,4 +56,6 @@ class ErrorCodesShape(SpaceTradersAPIResShape):
     error_codes: list[ErrorCodeShape]
     """
 
+    wrapped = False
+
     error_codes: list[ErrorCodeShape]
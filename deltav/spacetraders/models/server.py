@@ -143,6 +143,8 @@ class ServerStatusShape(SpaceTradersAPIResShape):
     links: list[LinkShape]
     """
 
+    wrapped = False
+
     status: str
     version: str
     reset_date: date
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
+from functools import partial
 
 from deltav.spacetraders.api.client import SpaceTradersAPIClient
 from deltav.spacetraders.api.error import SpaceTradersAPIError
@@ -8,6 +9,7 @@ from deltav.spacetraders.api.request import SpaceTradersAPIRequest
 from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
 from deltav.spacetraders.enums.faction import FactionSymbol
 from deltav.spacetraders.enums.ship import ShipCrewRotationShape, ShipRole
+from deltav.spacetraders.market import market_index
 from deltav.spacetraders.models import NoDataResShape
 from deltav.spacetraders.models.contract import ContractShape
 from deltav.spacetraders.models.endpoint import ChartCreateShape
@@ -41,6 +43,8 @@ from deltav.spacetraders.models.ship import (
 )
 from deltav.spacetraders.models.waypoint import WaypointSymbolReqShape
 from deltav.spacetraders.token import AgentToken
+from deltav.store.db import writer
+from deltav.store.db.market import record_transactions
 
 
 class Ship:
@@ -240,7 +244,7 @@ class Ship:
     def _purchase_cargo(
         self, purchase: CargoItemReqShape
     ) -> MarketTransactionShape | SpaceTradersAPIError:
-        return SpaceTradersAPIClient.call(
+        res = SpaceTradersAPIClient.call(
             SpaceTradersAPIRequest[MarketTransactionShape]()
             .builder()
             .endpoint(SpaceTradersAPIEndpoint.PURCHASE_CARGO)
@@ -250,10 +254,15 @@ class Ship:
             .build()
         ).unwrap()
 
+        if isinstance(res, MarketTransactionShape):
+            market_index.record_transaction(res)
+            writer.call(partial(record_transactions, shapes=[res]))
+        return res
+
     def _sell_cargo(
         self, cargo: CargoItemReqShape
     ) -> MarketTransactionShape | SpaceTradersAPIError:
-        return SpaceTradersAPIClient.call(
+        res = SpaceTradersAPIClient.call(
             SpaceTradersAPIRequest[MarketTransactionShape]()
             .builder()
             .endpoint(SpaceTradersAPIEndpoint.SELL_CARGO)
@@ -263,6 +272,11 @@ class Ship:
             .build()
         ).unwrap()
 
+        if isinstance(res, MarketTransactionShape):
+            market_index.record_transaction(res)
+            writer.call(partial(record_transactions, shapes=[res]))
+        return res
+
     def _jettison_cargo(self, cargo: CargoItemReqShape) -> ShipCargoShape | SpaceTradersAPIError:
         return SpaceTradersAPIClient.call(
             SpaceTradersAPIRequest[ShipCargoShape]()
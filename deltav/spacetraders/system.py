@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import UTC, datetime
+from functools import partial
 
+from deltav.planning.galaxy import galaxy
 from deltav.spacetraders import Coordinate
 from deltav.spacetraders.api import DEFAULT_PAGE_LIMIT
 from deltav.spacetraders.api.client import SpaceTradersAPIClient
@@ -11,8 +13,10 @@ from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
 from deltav.spacetraders.enums.system import SystemType
 from deltav.spacetraders.enums.waypoint import WaypointTraitSymbol, WaypointType
 from deltav.spacetraders.faction import Faction
-from deltav.spacetraders.models.systems import SystemShape, SystemWaypointsShape
+from deltav.spacetraders.models.systems import SystemShape, SystemsShape, SystemWaypointsShape
 from deltav.spacetraders.waypoint import Waypoint
+from deltav.store.db import writer
+from deltav.store.db.universe import upsert_systems, upsert_waypoints
 
 
 # TODO: Convert methods to right types
@@ -23,6 +27,9 @@ class System:
 
         self.__data: SystemShape
         self.__data_timestamp: datetime
+        if data is not None:
+            self.__data = data
+            self.__data_timestamp = datetime.now(tz=UTC)
 
         self._coordinate: Coordinate
         self._factions: list[Faction]
@@ -70,24 +77,34 @@ class System:
         return self._waypoints
 
     def _fetch_system(self) -> SystemShape | SpaceTradersAPIError:
-        return SpaceTradersAPIClient.call(
+        res = SpaceTradersAPIClient.call(
             SpaceTradersAPIRequest[SystemShape]()
             .builder()
-            .endpoint(SpaceTradersAPIEndpoint.GET_ALL_SYSTEMS)
+            .endpoint(SpaceTradersAPIEndpoint.GET_SYSTEM)
             .path_params(self.symbol)
             .token()
             .build()
         ).unwrap()
 
-    def _fetch_systems(self) -> SystemShape | SpaceTradersAPIError:
-        return SpaceTradersAPIClient.call(
-            SpaceTradersAPIRequest[SystemShape]()
+        if isinstance(res, SystemShape):
+            galaxy.update_systems([res])
+            writer.call(partial(upsert_systems, shapes=[res]))
+        return res
+
+    def _fetch_systems(self) -> SystemsShape | SpaceTradersAPIError:
+        res = SpaceTradersAPIClient.call(
+            SpaceTradersAPIRequest[SystemsShape]()
             .builder()
             .endpoint(SpaceTradersAPIEndpoint.GET_ALL_SYSTEMS)
             .token()
             .build()
         ).unwrap()
 
+        if isinstance(res, SystemsShape):
+            galaxy.update_systems(res.systems)
+            writer.call(partial(upsert_systems, shapes=res.systems))
+        return res
+
     def _fetch_waypoints(
         self,
         waypoint_type: WaypointType | None = None,
@@ -96,7 +113,7 @@ class System:
         end_page: int | None = None,
         limit: int = DEFAULT_PAGE_LIMIT,
     ) -> SystemWaypointsShape | SpaceTradersAPIError:
-        return SpaceTradersAPIClient.call(
+        res = SpaceTradersAPIClient.call(
             SpaceTradersAPIRequest[SystemWaypointsShape]()
             .builder()
             .endpoint(SpaceTradersAPIEndpoint.GET_ALL_SYSTEM_WAYPOINTS)
@@ -108,6 +125,11 @@ class System:
             .build()
         ).unwrap()
 
+        if isinstance(res, SystemWaypointsShape):
+            galaxy.update_waypoints(res.waypoints)
+            writer.call(partial(upsert_waypoints, shapes=res.waypoints))
+        return res
+
     def __handle_fetch_system_err(self, err: SpaceTradersAPIError) -> ValueError: ...
 
     def __handle_fetch_systems_err(self, err: SpaceTradersAPIError) -> ValueError: ...
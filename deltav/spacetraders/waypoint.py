@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import UTC, datetime
+from functools import partial
 
+from deltav.planning.galaxy import galaxy
 from deltav.spacetraders import Coordinate
 from deltav.spacetraders.api.client import SpaceTradersAPIClient
 from deltav.spacetraders.api.error import SpaceTradersAPIError
@@ -14,6 +16,7 @@ from deltav.spacetraders.enums.waypoint import (
     WaypointType,
 )
 from deltav.spacetraders.faction import Faction
+from deltav.spacetraders.market import market_index
 from deltav.spacetraders.models.construction import ConstructionShape
 from deltav.spacetraders.models.market import MarketShape
 from deltav.spacetraders.models.systems import JumpgateShape, ShipyardShape
@@ -22,6 +25,9 @@ from deltav.spacetraders.models.waypoint import (
     WaypointShape,
     WaypointTraitShape,
 )
+from deltav.store.db import writer
+from deltav.store.db.market import record_markets
+from deltav.store.db.universe import upsert_waypoints
 
 
 class Waypoint:
@@ -31,6 +37,9 @@ class Waypoint:
 
         self.__data: WaypointShape
         self.__data_timestamp: datetime
+        if data is not None:
+            self.__data = data
+            self.__data_timestamp = datetime.now(tz=UTC)
 
         self._chart: Chart
         self._coordinate: Coordinate
@@ -147,7 +156,7 @@ class Waypoint:
         ).unwrap()
 
     def _fetch_market(self) -> MarketShape | SpaceTradersAPIError:
-        return SpaceTradersAPIClient.call(
+        res = SpaceTradersAPIClient.call(
             SpaceTradersAPIRequest[MarketShape]()
             .builder()
             .endpoint(SpaceTradersAPIEndpoint.GET_MARKET)
@@ -155,6 +164,12 @@ class Waypoint:
             .build()
         ).unwrap()
 
+        if isinstance(res, MarketShape):
+            observed_at = datetime.now(tz=UTC)
+            market_index.update(res, observed_at)
+            writer.call(partial(record_markets, shapes=[res], observed_at=observed_at))
+        return res
+
     def _fetch_jumpgate(self) -> JumpgateShape | SpaceTradersAPIError:
         return SpaceTradersAPIClient.call(
             SpaceTradersAPIRequest[JumpgateShape]()
@@ -174,7 +189,7 @@ class Waypoint:
         ).unwrap()
 
     def _fetch_waypoint(self) -> WaypointShape | SpaceTradersAPIError:
-        return SpaceTradersAPIClient.call(
+        res = SpaceTradersAPIClient.call(
             SpaceTradersAPIRequest[WaypointShape]()
             .builder()
             .endpoint(SpaceTradersAPIEndpoint.GET_WAYPOINT)
@@ -182,6 +197,12 @@ class Waypoint:
             .build()
         ).unwrap()
 
+        # GET_WAYPOINT validates into `WaypointShape`, so its traits are stored too
+        if isinstance(res, WaypointShape):
+            galaxy.update_waypoints([res])
+            writer.call(partial(upsert_waypoints, shapes=[res]))
+        return res
+
     def __handle_fetch_construction_site_err(self, err: SpaceTradersAPIError) -> ValueError: ...
 
     def __handle_fetch_market_err(self, err: SpaceTradersAPIError) -> ValueError: ...
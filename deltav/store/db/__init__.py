@@ -1,12 +1,121 @@
 from __future__ import annotations
 
-from sqlalchemy import Engine, create_engine
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
+from deltav.config import (
+    DEFAULT_DB_BUSY_TIMEOUT,
+    DEFAULT_DB_CACHE_SIZE,
+    DEFAULT_DB_JOURNAL_MODE,
+    DEFAULT_DB_MMAP_SIZE,
+    DEFAULT_DB_POOL_SIZE,
+    DEFAULT_DB_SYNCHRONOUS,
+    get_default_db_path,
+)
+from deltav.store.db.writer import WriteBehindQueue
+
+if TYPE_CHECKING:
+    from sqlite3 import Connection
+
+    from sqlalchemy.pool import ConnectionPoolEntry
+
+    from deltav.config.config import DeltavConfig
+
+DB_FILE_NAME: str = 'deltav.db'
+# Where earlier versions created the database, regardless of `db_directory`
+LEGACY_DB_PATH: Path = Path(DB_FILE_NAME)
+
 
 class Base(DeclarativeBase):
     pass
 
 
-engine: Engine = create_engine('sqlite:///deltav.db', echo=True)
+def create_store_engine(
+    directory: Path,
+    *,
+    journal_mode: str = DEFAULT_DB_JOURNAL_MODE,
+    synchronous: str = DEFAULT_DB_SYNCHRONOUS,
+    mmap_size: int = DEFAULT_DB_MMAP_SIZE,
+    cache_size: int = DEFAULT_DB_CACHE_SIZE,
+    busy_timeout: float = DEFAULT_DB_BUSY_TIMEOUT,
+    pool_size: int = DEFAULT_DB_POOL_SIZE,
+    echo: bool = False,
+) -> Engine:
+    """Create the engine for `deltav.db` in `directory`.
+
+    Every connection is set up with the given journal mode, synchronous mode, memory
+    map size (bytes), page cache size (KiB) and busy timeout (seconds). The pool holds
+    `pool_size` connections for readers and one for the writer.
+    """
+    path = directory / DB_FILE_NAME
+    engine = create_engine(
+        f'sqlite:///{path}',
+        echo=echo,
+        pool_size=pool_size + 1,
+        max_overflow=0,
+        connect_args={'timeout': busy_timeout},
+    )
+    pragmas = {
+        'journal_mode': journal_mode,
+        'synchronous': synchronous,
+        'mmap_size': int(mmap_size),
+        # Negative sizes are in KiB rather than pages
+        'cache_size': -int(cache_size),
+        'busy_timeout': int(busy_timeout * 1000),
+    }
+    event.listen(engine, 'do_connect', lambda *_: path.parent.mkdir(parents=True, exist_ok=True))
+    event.listen(engine, 'connect', partial(_set_pragmas, pragmas))
+    return engine
+
+
+def _set_pragmas(
+    pragmas: dict[str, str | int], conn: Connection, _: ConnectionPoolEntry
+) -> None:
+    cursor = conn.cursor()
+    for pragma, value in pragmas.items():
+        _ = cursor.execute(f'PRAGMA {pragma}={value}')
+    cursor.close()
+
+
+def db_directory(directory: Path) -> Path:
+    """The directory to open `deltav.db` in, normally `directory`.
+
+    A database left in the working directory by an earlier version is kept in use
+    until it is moved to `directory`, rather than silently starting an empty one.
+    """
+    if (directory / DB_FILE_NAME).exists() or not LEGACY_DB_PATH.is_file():
+        return directory
+
+    legacy = LEGACY_DB_PATH.resolve()
+    logger.warning(f'Using {legacy}, move it (and any -wal/-shm files) to {directory}')
+    return legacy.parent
+
+
+def configure(config: DeltavConfig) -> None:
+    """Replace the engine with one using the database settings of `config`."""
+    global engine  # noqa: PLW0603
+    old, engine = engine, create_store_engine(
+        db_directory(config.db_directory),
+        journal_mode=config.db_journal_mode,
+        synchronous=config.db_synchronous,
+        mmap_size=config.db_mmap_size,
+        cache_size=config.db_cache_size,
+        busy_timeout=config.db_busy_timeout,
+        pool_size=config.db_pool_size,
+        echo=config.db_echo,
+    )
+
+    writer.close()
+    writer.engine = engine
+    Session.configure(bind=engine)
+    old.dispose()
+
+
+engine: Engine = create_store_engine(db_directory(get_default_db_path()))
 Session = sessionmaker(engine)
+writer: WriteBehindQueue = WriteBehindQueue(engine)
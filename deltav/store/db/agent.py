@@ -4,7 +4,7 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from deltav.store.db import Base
@@ -53,6 +53,10 @@ class AgentRecord(Base):
 
 class AgentEventRecord(Base):
     __tablename__: str = 'agent_events'
+    __table_args__: tuple[Index, ...] = (
+        Index('ix_agent_events_agent_id_created_at', 'agent_id', 'created_at'),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True)
     created_at: Mapped[datetime] = mapped_column()
     data: Mapped[str | None] = mapped_column()
@@ -0,0 +1,63 @@
+"""Helpers for writing and resolving many rows at once with SQLAlchemy Core."""
+
+from __future__ import annotations
+
+from itertools import batched
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Connection, Table
+
+# Bound parameters per `IN (...)` lookup, well below SQLite's limit of 32766
+LOOKUP_BATCH_SIZE: int = 5000
+
+Row = dict[str, Any]
+
+
+def upsert(conn: Connection, table: Table, key: tuple[str, ...], rows: list[Row]) -> None:
+    """Insert `rows` into `table`, updating the columns given in them on a conflict on `key`.
+
+    All rows must have the same columns. Columns that are not given keep their value.
+    """
+    if not rows:
+        return
+
+    stmt = insert(table)
+    columns = [column for column in rows[0] if column not in key]
+    if not columns:
+        executemany(conn, stmt.on_conflict_do_nothing(index_elements=key), rows)
+        return
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=key, set_={column: stmt.excluded[column] for column in columns}
+    )
+    executemany(conn, stmt, rows)
+
+
+def executemany(conn: Connection, stmt: Any, rows: list[Row]) -> None:
+    """Execute `stmt` for every row with the DB-API's executemany.
+
+    SQLAlchemy processes the parameters of each row in Python, which takes most of the
+    time for large batches. The rows here only hold plain values, so the statement is
+    compiled once and the rows are passed to the driver as tuples.
+    """
+    if not rows:
+        return
+
+    compiled = stmt.compile(dialect=conn.dialect, column_keys=list(rows[0]))
+    order = compiled.positiontup or []
+    _ = conn.exec_driver_sql(str(compiled), [tuple(row[key] for key in order) for row in rows])
+
+
+def lookup_ids(conn: Connection, table: Table, symbols: Iterable[str]) -> dict[str, int]:
+    """The ids of the rows of `table` with the given symbols, by symbol."""
+    ids: dict[str, int] = {}
+    for chunk in batched(set(symbols), LOOKUP_BATCH_SIZE):
+        query = select(table.c.symbol, table.c.id).where(table.c.symbol.in_(chunk))
+        ids.update(conn.execute(query).all())
+    return ids
@@ -17,7 +17,7 @@ class ChartRecord(Base):
     __tablename__: str = 'charts'
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    waypoint_symbol: Mapped[str] = mapped_column()
+    waypoint_symbol: Mapped[str] = mapped_column(unique=True, index=True)
     submitted_by: Mapped[str] = mapped_column()
     submitted_on: Mapped[datetime] = mapped_column()
 
@@ -1,21 +1,21 @@
 from __future__ import annotations
 
+from datetime import datetime  # noqa: TC003
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from deltav.store.db import Base
 
 if TYPE_CHECKING:
-    from datetime import datetime
-
     from deltav.store.db.agent import AgentRecord
     from deltav.store.db.market import TradeGoodRecord
 
 
 class ContractRecord(Base):
     __tablename__: str = 'contracts'
+    __table_args__: tuple[Index, ...] = (Index('ix_contracts_agent_id', 'agent_id'),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     accepted: Mapped[bool] = mapped_column()
@@ -37,6 +37,15 @@ class ContractRecord(Base):
 
 class ContractDeliverableRecord(Base):
     __tablename__: str = 'contract_deliverables'
+    __table_args__: tuple[Index, ...] = (
+        Index(
+            'ix_contract_deliverables_contract_id_trade_symbol_destination_symbol',
+            'contract_id',
+            'trade_symbol',
+            'destination_symbol',
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     trade_symbol: Mapped[str] = mapped_column()
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+
+class MigrationError(Exception):
+    def __init__(self, message: str) -> None:
+        self.message: str = message
+        super().__init__(self.message)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from deltav.store.db import Base
@@ -30,6 +30,14 @@ class FactionRecord(Base):
 
 class FactionReputationRecord(Base):
     __tablename__: str = 'faction_reputations'
+    __table_args__: tuple[Index, ...] = (
+        Index(
+            'ix_faction_reputations_agent_id_faction_symbol',
+            'agent_id',
+            'faction_symbol',
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     faction_symbol: Mapped[str] = mapped_column()
@@ -53,6 +61,9 @@ class FactionTraitTypeRecord(Base):
 
 class FactionTraitRecord(Base):
     __tablename__: str = 'faction_traits'
+    __table_args__: tuple[Index, ...] = (
+        Index('ix_faction_traits_faction_id_trait_id', 'faction_id', 'trait_id', unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -1,15 +1,12 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from datetime import datetime  # noqa: TC003
 
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from deltav.store.db import Base
 
-if TYPE_CHECKING:
-    from datetime import datetime
-
 
 class ServerStatusRecord(Base):
     __tablename__: str = 'server_status'
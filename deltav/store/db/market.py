@@ -0,0 +1,409 @@
+"""Market history: the trade goods and transactions observed at every market over time.
+
+Markets and trade goods are interned, so the history refers to them by integer id. Price
+observations are run-length encoded: a new row is only written when something about a
+good changed, otherwise the `last_observed_at` of its latest row is moved forward. Times
+are stored as Unix timestamps (seconds).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from itertools import batched
+from typing import TYPE_CHECKING
+
+from sqlalchemy import ForeignKey, Index, and_, bindparam, func, select, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+
+from deltav.spacetraders.enums.market import ActivityLevel, MarketTradeGoodType, SupplyLevel
+from deltav.store.db import Base
+from deltav.store.db.bulk import LOOKUP_BATCH_SIZE, Row, executemany, lookup_ids, upsert
+from deltav.store.db.waypoint import WaypointRecord
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Connection, Select, Table
+
+    from deltav.spacetraders.models.market import MarketShape, MarketTransactionShape
+
+
+class TradeGoodRecord(Base):
+    __tablename__: str = 'trade_goods'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    symbol: Mapped[str] = mapped_column(unique=True, index=True)
+    name: Mapped[str | None] = mapped_column()
+    description: Mapped[str | None] = mapped_column()
+
+
+class MarketRecord(Base):
+    __tablename__: str = 'markets'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    symbol: Mapped[str] = mapped_column(unique=True)
+
+    waypoint_id: Mapped[int | None] = mapped_column(ForeignKey('waypoints.id'))
+
+
+class MarketPriceRecord(Base):
+    __tablename__: str = 'market_prices'
+    __table_args__: tuple[Index | dict[str, bool], ...] = (
+        Index('ix_market_prices_trade_good_id_observed_at', 'trade_good_id', 'observed_at'),
+        # Rows are stored in primary key order, so the history of a good at a market is
+        # one contiguous range
+        {'sqlite_with_rowid': False},
+    )
+
+    market_id: Mapped[int] = mapped_column(ForeignKey('markets.id'), primary_key=True)
+    trade_good_id: Mapped[int] = mapped_column(ForeignKey('trade_goods.id'), primary_key=True)
+    observed_at: Mapped[int] = mapped_column(primary_key=True)
+    last_observed_at: Mapped[int] = mapped_column()
+    type: Mapped[str] = mapped_column()
+    supply: Mapped[str] = mapped_column()
+    activity: Mapped[str | None] = mapped_column()
+    trade_volume: Mapped[int] = mapped_column()
+    purchase_price: Mapped[int] = mapped_column()
+    sell_price: Mapped[int] = mapped_column()
+
+
+class MarketLatestPriceRecord(Base):
+    __tablename__: str = 'market_latest_prices'
+    __table_args__: tuple[dict[str, bool], ...] = ({'sqlite_with_rowid': False},)
+
+    # Points to the latest row in market_prices of every good at every market
+    market_id: Mapped[int] = mapped_column(ForeignKey('markets.id'), primary_key=True)
+    trade_good_id: Mapped[int] = mapped_column(ForeignKey('trade_goods.id'), primary_key=True)
+    observed_at: Mapped[int] = mapped_column()
+
+
+class MarketTransactionRecord(Base):
+    __tablename__: str = 'market_transactions'
+    __table_args__: tuple[dict[str, bool], ...] = ({'sqlite_with_rowid': False},)
+
+    # Markets list their recent transactions every time, the key drops repeats
+    market_id: Mapped[int] = mapped_column(ForeignKey('markets.id'), primary_key=True)
+    timestamp: Mapped[int] = mapped_column(primary_key=True)
+    ship_symbol: Mapped[str] = mapped_column(primary_key=True)
+    trade_good_id: Mapped[int] = mapped_column(ForeignKey('trade_goods.id'), primary_key=True)
+    type: Mapped[str] = mapped_column(primary_key=True)
+    units: Mapped[int] = mapped_column()
+    price_per_unit: Mapped[int] = mapped_column()
+    total_price: Mapped[int] = mapped_column()
+
+
+@dataclass(frozen=True, slots=True)
+class MarketPrice:
+    """A trade good at a market, unchanged from `observed_at` until `last_observed_at`."""
+
+    waypoint_symbol: str
+    trade_symbol: str
+    type: MarketTradeGoodType
+    supply: SupplyLevel
+    activity: ActivityLevel | None
+    trade_volume: int
+    purchase_price: int
+    sell_price: int
+    observed_at: datetime
+    last_observed_at: datetime
+
+
+trade_goods: Table = TradeGoodRecord.__table__
+markets: Table = MarketRecord.__table__
+prices: Table = MarketPriceRecord.__table__
+latest: Table = MarketLatestPriceRecord.__table__
+transactions: Table = MarketTransactionRecord.__table__
+
+# The columns that make two observations of a good the same
+_OBSERVED = ('type', 'supply', 'activity', 'trade_volume', 'purchase_price', 'sell_price')
+
+
+def record_markets(
+    conn: Connection, shapes: Iterable[MarketShape], observed_at: datetime | None = None
+) -> None:
+    """Add the trade goods and transactions of markets to the history.
+
+    Markets only list trade goods (with prices) while a ship is present. Markets without
+    any are still interned, along with the goods they import, export and exchange.
+    """
+    shapes = list(shapes)
+    if not shapes:
+        return
+
+    now = _timestamp(observed_at or datetime.now(tz=UTC))
+    market_ids = intern_markets(conn, (market.symbol for market in shapes))
+    good_ids = _intern_trade_goods(conn, shapes)
+
+    observations: dict[tuple[int, int], Row] = {}
+    for market in shapes:
+        for good in market.trade_goods or ():
+            key = (market_ids[market.symbol], good_ids[good.symbol])
+            observations[key] = {
+                'market_id': key[0],
+                'trade_good_id': key[1],
+                'observed_at': now,
+                'last_observed_at': now,
+                'type': good.type.value,
+                'supply': good.supply.value,
+                'activity': good.activity.value if good.activity else None,
+                'trade_volume': good.trade_volume,
+                'purchase_price': good.purchase_price,
+                'sell_price': good.sell_price,
+            }
+    _record_prices(conn, observations)
+
+    executemany(
+        conn,
+        insert(transactions).on_conflict_do_nothing(),
+        [
+            _transaction_row(market_ids[market.symbol], good_ids, transaction)
+            for market in shapes
+            for transaction in market.transactions or ()
+        ],
+    )
+
+
+def record_transactions(conn: Connection, shapes: Iterable[MarketTransactionShape]) -> None:
+    """Add purchases and sales made by our own ships to the history of their markets."""
+    shapes = list(shapes)
+    if not shapes:
+        return
+
+    market_ids = intern_markets(conn, (transaction.waypoint_symbol for transaction in shapes))
+    symbols = {transaction.trade_symbol.value for transaction in shapes}
+    upsert(conn, trade_goods, ('symbol',), [{'symbol': symbol} for symbol in symbols])
+    good_ids = lookup_ids(conn, trade_goods, symbols)
+
+    executemany(
+        conn,
+        insert(transactions).on_conflict_do_nothing(),
+        [
+            _transaction_row(market_ids[transaction.waypoint_symbol], good_ids, transaction)
+            for transaction in shapes
+        ],
+    )
+
+
+def intern_markets(conn: Connection, symbols: Iterable[str]) -> dict[str, int]:
+    """Store each market once, linked to its waypoint if that is stored.
+
+    Returns:
+        The id of every given market, by waypoint symbol.
+    """
+    symbols = set(symbols)
+    waypoint_ids = lookup_ids(conn, WaypointRecord.__table__, symbols)
+    stmt = insert(markets)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=('symbol',),
+        set_={'waypoint_id': func.coalesce(stmt.excluded.waypoint_id, markets.c.waypoint_id)},
+    )
+    executemany(
+        conn,
+        stmt,
+        [{'symbol': symbol, 'waypoint_id': waypoint_ids.get(symbol)} for symbol in symbols],
+    )
+    return lookup_ids(conn, markets, symbols)
+
+
+def latest_prices(
+    conn: Connection, waypoint_symbols: Iterable[str] | None = None
+) -> list[MarketPrice]:
+    """The latest observation of every good at the given markets, or at every market."""
+    query = _observations().join(
+        latest,
+        and_(
+            latest.c.market_id == prices.c.market_id,
+            latest.c.trade_good_id == prices.c.trade_good_id,
+            latest.c.observed_at == prices.c.observed_at,
+        ),
+    )
+    if waypoint_symbols is None:
+        return _prices(conn, query)
+
+    result: list[MarketPrice] = []
+    for chunk in batched(set(waypoint_symbols), LOOKUP_BATCH_SIZE):
+        result += _prices(conn, query.where(markets.c.symbol.in_(chunk)))
+    return result
+
+
+def price_history(
+    conn: Connection,
+    trade_symbol: str,
+    waypoint_symbol: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list[MarketPrice]:
+    """The observations of a good at one or every market that overlap `start` to `end`."""
+    query = _observations().where(trade_goods.c.symbol == trade_symbol)
+    if waypoint_symbol is not None:
+        query = query.where(markets.c.symbol == waypoint_symbol)
+    if start is not None:
+        query = query.where(prices.c.last_observed_at >= _timestamp(start))
+    if end is not None:
+        query = query.where(prices.c.observed_at <= _timestamp(end))
+    return _prices(conn, query.order_by(prices.c.observed_at))
+
+
+def _intern_trade_goods(conn: Connection, shapes: list[MarketShape]) -> dict[str, int]:
+    described: dict[str, Row] = {}
+    for market in shapes:
+        for item in (*market.exports, *market.imports, *market.exchange):
+            described[item.symbol.value] = {
+                'symbol': item.symbol.value,
+                'name': item.name,
+                'description': item.description,
+            }
+
+    listed = {good.symbol for market in shapes for good in market.trade_goods or ()}
+    listed |= {t.trade_symbol.value for market in shapes for t in market.transactions or ()}
+
+    upsert(conn, trade_goods, ('symbol',), list(described.values()))
+    upsert(conn, trade_goods, ('symbol',), [{'symbol': symbol} for symbol in listed])
+    return lookup_ids(conn, trade_goods, described.keys() | listed)
+
+
+def _transaction_row(
+    market_id: int, good_ids: dict[str, int], transaction: MarketTransactionShape
+) -> Row:
+    return {
+        'market_id': market_id,
+        'timestamp': _timestamp(transaction.timestamp),
+        'ship_symbol': transaction.ship_symbol,
+        'trade_good_id': good_ids[transaction.trade_symbol.value],
+        'type': transaction.type.value,
+        'units': transaction.units,
+        'price_per_unit': transaction.price_per_unit,
+        'total_price': transaction.total_price,
+    }
+
+
+def _record_prices(conn: Connection, observations: dict[tuple[int, int], Row]) -> None:
+    if not observations:
+        return
+
+    market_ids = {market_id for market_id, _ in observations}
+    previous: dict[tuple[int, int], tuple[object, ...]] = {}
+    for chunk in batched(market_ids, LOOKUP_BATCH_SIZE):
+        query = (
+            select(
+                latest.c.market_id,
+                latest.c.trade_good_id,
+                latest.c.observed_at,
+                *(prices.c[column] for column in _OBSERVED),
+            )
+            .select_from(latest)
+            .join(
+                prices,
+                and_(
+                    prices.c.market_id == latest.c.market_id,
+                    prices.c.trade_good_id == latest.c.trade_good_id,
+                    prices.c.observed_at == latest.c.observed_at,
+                ),
+            )
+            .where(latest.c.market_id.in_(chunk))
+        )
+        for market_id, trade_good_id, *values in conn.execute(query):
+            previous[market_id, trade_good_id] = tuple(values)
+
+    unchanged: list[Row] = []
+    changed: list[Row] = []
+    for key, observation in observations.items():
+        last = previous.get(key)
+        if (
+            last is not None
+            and last[0] <= observation['observed_at']
+            and last[1:] == tuple(observation[column] for column in _OBSERVED)
+        ):
+            unchanged.append(
+                {
+                    'key_market_id': key[0],
+                    'key_trade_good_id': key[1],
+                    'key_observed_at': last[0],
+                    'last_observed_at': observation['observed_at'],
+                }
+            )
+        else:
+            changed.append(observation)
+
+    stmt = (
+        update(prices)
+        .where(
+            prices.c.market_id == bindparam('key_market_id'),
+            prices.c.trade_good_id == bindparam('key_trade_good_id'),
+            prices.c.observed_at == bindparam('key_observed_at'),
+            prices.c.last_observed_at < bindparam('last_observed_at'),
+        )
+        .values(last_observed_at=bindparam('last_observed_at'))
+    )
+    executemany(conn, stmt, unchanged)
+    executemany(conn, insert(prices).on_conflict_do_nothing(), changed)
+
+    # Observations can arrive out of order, the pointer only moves forward
+    stmt = insert(latest)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=('market_id', 'trade_good_id'),
+        set_={'observed_at': func.max(stmt.excluded.observed_at, latest.c.observed_at)},
+    )
+    executemany(
+        conn,
+        stmt,
+        [
+            {
+                'market_id': row['market_id'],
+                'trade_good_id': row['trade_good_id'],
+                'observed_at': row['observed_at'],
+            }
+            for row in changed
+        ],
+    )
+
+
+def _observations() -> Select[tuple[object, ...]]:
+    """Select full observations, with the symbols of their market and good."""
+    return (
+        select(
+            markets.c.symbol,
+            trade_goods.c.symbol,
+            *(prices.c[column] for column in _OBSERVED),
+            prices.c.observed_at,
+            prices.c.last_observed_at,
+        )
+        .select_from(prices)
+        .join(markets, markets.c.id == prices.c.market_id)
+        .join(trade_goods, trade_goods.c.id == prices.c.trade_good_id)
+    )
+
+
+def _prices(conn: Connection, query: Select[tuple[object, ...]]) -> list[MarketPrice]:
+    return [
+        MarketPrice(
+            waypoint_symbol=waypoint_symbol,
+            trade_symbol=trade_symbol,
+            type=MarketTradeGoodType(type_),
+            supply=SupplyLevel(supply),
+            activity=ActivityLevel(activity) if activity else None,
+            trade_volume=trade_volume,
+            purchase_price=purchase_price,
+            sell_price=sell_price,
+            observed_at=datetime.fromtimestamp(observed_at, tz=UTC),
+            last_observed_at=datetime.fromtimestamp(last_observed_at, tz=UTC),
+        )
+        for (
+            waypoint_symbol,
+            trade_symbol,
+            type_,
+            supply,
+            activity,
+            trade_volume,
+            purchase_price,
+            sell_price,
+            observed_at,
+            last_observed_at,
+        ) in conn.execute(query)
+    ]
+
+
+def _timestamp(time: datetime) -> int:
+    return int(time.timestamp())
@@ -0,0 +1,171 @@
+"""Versioned schema migrations for deltav.db.
+
+`Base.metadata.create_all()` creates missing tables with all of their indexes, but
+never changes tables that already exist. Migrations bring existing databases up to
+date. The schema version is kept in SQLite's `user_version` header field. Every
+migration must be safe to run on a database created with the current models, since a
+new database starts at version 0 as well.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from loguru import logger
+from sqlalchemy import MetaData, inspect
+
+# Import every record module so that all tables are part of Base.metadata
+from deltav.store.db import (  # noqa: F401
+    Base,
+    account,
+    agent,
+    chart,
+    contract,
+    faction,
+    game,
+    market,
+    ship,
+    system,
+    transaction,
+    waypoint,
+)
+from deltav.store.db.errors import MigrationError
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy import Connection, Engine, Table
+
+# Duplicate keys named in the error of a unique index that cannot be added
+MAX_REPORTED_DUPLICATES: int = 5
+
+
+def _add_lookup_indexes(conn: Connection) -> None:
+    tables = set(inspect(conn).get_table_names())
+
+    if 'ship_routes' in tables:
+        columns = {column['name'] for column in inspect(conn).get_columns('ship_routes')}
+        if 'ship_id' not in columns:
+            _ = conn.exec_driver_sql(
+                'ALTER TABLE ship_routes ADD COLUMN ship_id INTEGER REFERENCES ships (id)'
+            )
+
+    for table in Base.metadata.tables.values():
+        if table.name not in tables:
+            continue
+
+        for index in table.indexes:
+            if index.unique:
+                _check_duplicates(conn, table, [column.name for column in index.columns])
+            index.create(conn, checkfirst=True)
+
+
+def _check_duplicates(conn: Connection, table: Table, columns: list[str]) -> None:
+    """Raise if rows of `table` share the key a new unique index is created on.
+
+    Rows are never deleted by a migration, the duplicates may be referred to by other
+    tables. Rows with a NULL in the key are distinct to a unique index, so they are fine.
+    """
+    cols = ', '.join(columns)
+    not_null = ' AND '.join(f'{column} IS NOT NULL' for column in columns)
+    duplicates = conn.exec_driver_sql(
+        f'SELECT {cols}, COUNT(*) FROM {table.name} WHERE {not_null} '  # noqa: S608
+        f'GROUP BY {cols} HAVING COUNT(*) > 1 LIMIT {MAX_REPORTED_DUPLICATES}'
+    ).all()
+    if duplicates:
+        keys = '; '.join(
+            f'{", ".join(map(str, row[:-1]))} ({row[-1]} rows)' for row in duplicates
+        )
+        msg = (
+            f'Cannot add a unique index on {table.name} ({cols}), rows share the keys: '
+            f'{keys}. Remove the duplicates from the database and start again.'
+        )
+        raise MigrationError(msg)
+
+
+def _rebuild_table(conn: Connection, table: Table) -> None:
+    """Recreate `table` from its current model, keeping the rows.
+
+    SQLite cannot change the constraints of a column, so the table is copied into a new
+    one. The copy is renamed only after the old table is dropped, so that foreign keys
+    of other tables keep referring to `table` by name.
+    """
+    columns = {column['name'] for column in inspect(conn).get_columns(table.name)}
+    shared = ', '.join(column.name for column in table.columns if column.name in columns)
+
+    for index in table.indexes:
+        index.drop(conn, checkfirst=True)
+
+    # The copy needs the tables its foreign keys refer to in its metadata
+    metadata = MetaData()
+    for other in Base.metadata.tables.values():
+        _ = other.to_metadata(metadata)
+    new = table.to_metadata(metadata, name=f'_{table.name}_new')
+    new.indexes.clear()
+    new.create(conn)
+    _ = conn.exec_driver_sql(
+        f'INSERT INTO {new.name} ({shared}) SELECT {shared} FROM {table.name}'  # noqa: S608
+    )
+    _ = conn.exec_driver_sql(f'DROP TABLE {table.name}')
+    _ = conn.exec_driver_sql(f'ALTER TABLE {new.name} RENAME TO {table.name}')
+
+    for index in table.indexes:
+        index.create(conn)
+
+
+def _needs_rebuild(conn: Connection, table: Table) -> bool:
+    """Whether a column of `table` became nullable or got a default since it was created."""
+    if not inspect(conn).has_table(table.name):
+        return False
+
+    stored = {column['name']: column for column in inspect(conn).get_columns(table.name)}
+    return any(
+        (column.nullable and not stored[column.name]['nullable'])
+        or (column.server_default is not None and stored[column.name]['default'] is None)
+        for column in table.columns
+        if column.name in stored
+    )
+
+
+def _allow_partial_universe_rows(conn: Connection) -> None:
+    # Systems and waypoints are loaded in bulk before their charts and factions, and
+    # waypoints listed in a system do not tell whether they are under construction
+    for table in (system.SystemRecord.__table__, waypoint.WaypointRecord.__table__):
+        if _needs_rebuild(conn, table):
+            _rebuild_table(conn, table)
+
+
+def _allow_undescribed_trade_goods(conn: Connection) -> None:
+    # Market prices only name the symbol of a good
+    if _needs_rebuild(conn, market.TradeGoodRecord.__table__):
+        _rebuild_table(conn, market.TradeGoodRecord.__table__)
+
+
+MIGRATIONS: list[tuple[str, Callable[[Connection], None]]] = [
+    ('Add indexes and unique keys for hot lookups', _add_lookup_indexes),
+    ('Make the foreign keys of systems and waypoints optional', _allow_partial_universe_rows),
+    ('Make the name and description of trade goods optional', _allow_undescribed_trade_goods),
+]
+"""Migration `n` (from 1) brings the schema from version `n - 1` to version `n`."""
+
+
+def schema_version(conn: Connection) -> int:
+    return conn.exec_driver_sql('PRAGMA user_version').scalar_one()
+
+
+def migrate(engine: Engine) -> int:
+    """Apply all pending migrations in one transaction.
+
+    Returns:
+        The schema version of the database.
+    """
+    with engine.begin() as conn:
+        version = schema_version(conn)
+        for target, (description, migration) in enumerate(
+            MIGRATIONS[version:], start=version + 1
+        ):
+            logger.info(f'Migrating database to version {target}: {description}')
+            migration(conn)
+            _ = conn.exec_driver_sql(f'PRAGMA user_version = {target}')
+
+        return schema_version(conn)
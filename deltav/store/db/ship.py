@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime  # noqa: TC003
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey, select
+from sqlalchemy import ForeignKey, Index, select
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from deltav.store.db import Base, Session
@@ -14,6 +14,7 @@ if TYPE_CHECKING:
 
 class ShipRecord(Base):
     __tablename__: str = 'ships'
+    __table_args__: tuple[Index, ...] = (Index('ix_ships_agent_id', 'agent_id'),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     cargo_capacity: Mapped[int] = mapped_column()
@@ -69,6 +70,9 @@ class ShipRecord(Base):
 
 class FuelConsumedRecord(Base):
     __tablename__: str = 'ship_fuel_consumed'
+    __table_args__: tuple[Index, ...] = (
+        Index('ix_ship_fuel_consumed_ship_id_timestamp', 'ship_id', 'timestamp'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     amount: Mapped[int] = mapped_column()
@@ -81,6 +85,7 @@ class FuelConsumedRecord(Base):
 
 class ShipCargoRecord(Base):
     __tablename__: str = 'ship_cargo'
+    __table_args__: tuple[Index, ...] = (Index('ix_ship_cargo_ship_id', 'ship_id'),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
     units: Mapped[int] = mapped_column()
@@ -103,7 +108,7 @@ class ShipEngineTypeRecord(Base):
     power: Mapped[int | None] = mapped_column()
     slots: Mapped[int | None] = mapped_column()
     speed: Mapped[int] = mapped_column()
-    symbol: Mapped[str] = mapped_column()
+    symbol: Mapped[str] = mapped_column(unique=True, index=True)
 
 
 class ShipEngineRecord(Base):
@@ -133,7 +138,7 @@ class ShipFrameTypeRecord(Base):
     name: Mapped[str] = mapped_column()
     power: Mapped[int | None] = mapped_column()
     slots: Mapped[int | None] = mapped_column()
-    symbol: Mapped[str] = mapped_column()
+    symbol: Mapped[str] = mapped_column(unique=True, index=True)
 
 
 class ShipFrameRecord(Base):
@@ -162,11 +167,12 @@ class ShipModuleTypesRecord(Base):
     power: Mapped[int | None] = mapped_column()
     range: Mapped[int] = mapped_column()
     slots: Mapped[int | None] = mapped_column()
-    symbol: Mapped[str] = mapped_column()
+    symbol: Mapped[str] = mapped_column(unique=True, index=True)
 
 
 class ShipModuleRecord(Base):
     __tablename__: str = 'ship_modules'
+    __table_args__: tuple[Index, ...] = (Index('ix_ship_modules_ship_id', 'ship_id'),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -187,12 +193,13 @@ class ShipMountTypesRecord(Base):
     range: Mapped[int] = mapped_column()
     slots: Mapped[int | None] = mapped_column()
     strength: Mapped[int] = mapped_column()
-    symbol: Mapped[str] = mapped_column()
+    symbol: Mapped[str] = mapped_column(unique=True, index=True)
     # deposits
 
 
 class ShipMountRecord(Base):
     __tablename__: str = 'ship_mounts'
+    __table_args__: tuple[Index, ...] = (Index('ix_ship_mounts_ship_id', 'ship_id'),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -204,6 +211,10 @@ class ShipMountRecord(Base):
 
 class ShipRouteRecord(Base):
     __tablename__: str = 'ship_routes'
+    __table_args__: tuple[Index, ...] = (
+        Index('ix_ship_routes_ship_id_arrival', 'ship_id', 'arrival'),
+        Index('ix_ship_routes_destination_waypoint_arrival', 'destination_waypoint', 'arrival'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     arrival: Mapped[datetime] = mapped_column()
@@ -219,6 +230,8 @@ class ShipRouteRecord(Base):
     origin_x: Mapped[int] = mapped_column()
     origin_y: Mapped[int] = mapped_column()
 
+    ship_id: Mapped[int] = mapped_column(ForeignKey('ships.id'))
+
     ship: Mapped[ShipRecord] = relationship(back_populates='nav_routes')
 
 
@@ -233,7 +246,7 @@ class ShipReactorTypeRecord(Base):
     power_output: Mapped[int] = mapped_column()
     range: Mapped[int] = mapped_column()
     slots: Mapped[int] = mapped_column()
-    symbol: Mapped[str] = mapped_column()
+    symbol: Mapped[str] = mapped_column(unique=True, index=True)
 
 
 class ShipReactorRecord(Base):
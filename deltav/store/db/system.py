@@ -25,9 +25,9 @@ class SystemRecord(Base):
     x: Mapped[int] = mapped_column()
     y: Mapped[int] = mapped_column()
 
-    chart_id: Mapped[int] = mapped_column(ForeignKey('charts.id'))
-    faction_id: Mapped[int] = mapped_column(ForeignKey('factions.id'))
-    waypoint_id: Mapped[int] = mapped_column(ForeignKey('waypoints.id'))
+    chart_id: Mapped[int | None] = mapped_column(ForeignKey('charts.id'))
+    faction_id: Mapped[int | None] = mapped_column(ForeignKey('factions.id'))
+    waypoint_id: Mapped[int | None] = mapped_column(ForeignKey('waypoints.id'))
 
     charts: Mapped[list[ChartRecord]] = relationship(back_populates='system')
     factions: Mapped[list[FactionRecord]] = relationship(back_populates='systems')
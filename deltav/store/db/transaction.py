@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime  # noqa: TC003
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from deltav.store.db import Base
@@ -12,11 +12,16 @@ from deltav.store.db.waypoint import WaypointRecord  # noqa: TC001
 
 if TYPE_CHECKING:
     from deltav.store.db.agent import AgentRecord
+    from deltav.store.db.market import TradeGoodRecord
     from deltav.store.db.ship import ShipRecord
 
 
 class TransactionRecord(Base):
     __tablename__: str = 'transactions'
+    __table_args__: tuple[Index, ...] = (
+        Index('ix_transactions_ship_symbol_timestamp', 'ship_symbol', 'timestamp'),
+        Index('ix_transactions_waypoint_symbol_timestamp', 'waypoint_symbol', 'timestamp'),
+    )
 
     # NOTE: agent_symbol is not a part of any transaction shape except ShipyardTransactionShape,
     # but since ship_symbol is a part of all the others, we can get the agent symbol for every
@@ -56,11 +61,3 @@ class TransactionRecord(Base):
     trade_good: Mapped[TradeGoodRecord] = relationship()
     waypoint: Mapped[WaypointRecord] = relationship(back_populates='transactions')
 
-
-class TradeGoodRecord(Base):
-    __tablename__: str = 'trade_goods'
-
-    id: Mapped[int] = mapped_column(primary_key=True)
-    symbol: Mapped[str] = mapped_column()
-    name: Mapped[str] = mapped_column()
-    description: Mapped[str] = mapped_column()
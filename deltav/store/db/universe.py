@@ -0,0 +1,238 @@
+"""Bulk ingest of universe data (systems, waypoints and their traits) into deltav.db.
+
+Rows are written with executemany `INSERT ... ON CONFLICT DO UPDATE` statements
+through SQLAlchemy Core, never through ORM objects. Trait and modifier types are
+interned: each symbol is stored once in its type table, and waypoints refer to it by id.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import bindparam, delete
+from sqlalchemy.dialects.sqlite import insert
+
+from deltav.spacetraders.models.waypoint import WaypointShape
+from deltav.store.db.bulk import Row, executemany, lookup_ids, upsert
+from deltav.store.db.faction import FactionRecord
+from deltav.store.db.system import SystemRecord
+from deltav.store.db.waypoint import (
+    WaypointModifierRecord,
+    WaypointModifierTypeRecord,
+    WaypointOrbitalRecord,
+    WaypointRecord,
+    WaypointTraitRecord,
+    WaypointTraitTypeRecord,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Connection, Engine, Table
+
+    from deltav.spacetraders.models.systems import SystemShape, SystemWaypointShape
+    from deltav.spacetraders.models.waypoint import WaypointModifierShape, WaypointTraitShape
+
+systems: Table = SystemRecord.__table__
+waypoints: Table = WaypointRecord.__table__
+orbitals: Table = WaypointOrbitalRecord.__table__
+traits: Table = WaypointTraitRecord.__table__
+trait_types: Table = WaypointTraitTypeRecord.__table__
+modifiers: Table = WaypointModifierRecord.__table__
+modifier_types: Table = WaypointModifierTypeRecord.__table__
+
+
+def ingest(
+    engine: Engine,
+    system_shapes: Iterable[SystemShape] = (),
+    waypoint_shapes: Iterable[SystemWaypointShape | WaypointShape] = (),
+) -> None:
+    """Upsert systems (with their waypoints) and waypoints in one transaction."""
+    with engine.begin() as conn:
+        _ = upsert_systems(conn, system_shapes)
+        _ = upsert_waypoints(conn, waypoint_shapes)
+
+
+def upsert_systems(conn: Connection, shapes: Iterable[SystemShape]) -> dict[str, int]:
+    """Insert or update systems and the waypoints listed in them.
+
+    Returns:
+        The id of every system, by symbol.
+    """
+    shapes = list(shapes)
+    if not shapes:
+        return {}
+
+    upsert(
+        conn,
+        systems,
+        ('symbol',),
+        [
+            {
+                'constellation': system.constellation,
+                'name': system.name,
+                'sector_symbol': system.sector_symbol,
+                'symbol': system.symbol,
+                'type': system.type.value,
+                'x': system.x,
+                'y': system.y,
+            }
+            for system in shapes
+        ],
+    )
+    ids = lookup_ids(conn, systems, {system.symbol for system in shapes})
+    _ = upsert_waypoints(conn, (waypoint for system in shapes for waypoint in system.waypoints))
+    return ids
+
+
+def upsert_waypoints(
+    conn: Connection, shapes: Iterable[SystemWaypointShape | WaypointShape]
+) -> dict[str, int]:
+    """Insert or update waypoints with their orbitals, traits and modifiers.
+
+    `SystemWaypointShape`s (as listed in a system) do not include traits, modifiers,
+    factions or the construction state, so those are left as they are for waypoints
+    that are already stored. The orbitals, traits and modifiers of a waypoint are
+    replaced by the ones given.
+
+    Returns:
+        The id of every waypoint, by symbol.
+    """
+    # A later shape of the same waypoint replaces an earlier one
+    by_symbol = {waypoint.symbol: waypoint for waypoint in shapes}
+    if not by_symbol:
+        return {}
+
+    system_ids = lookup_ids(conn, systems, {w.system_symbol for w in by_symbol.values()})
+    detailed = [w for w in by_symbol.values() if isinstance(w, WaypointShape)]
+    listed = [w for w in by_symbol.values() if not isinstance(w, WaypointShape)]
+    faction_ids = lookup_ids(
+        conn, FactionRecord.__table__, {w.faction.symbol.value for w in detailed if w.faction}
+    )
+
+    if listed:
+        upsert(
+            conn,
+            waypoints,
+            ('symbol',),
+            [_waypoint_row(waypoint, system_ids) for waypoint in listed],
+        )
+    if detailed:
+        upsert(
+            conn,
+            waypoints,
+            ('symbol',),
+            [
+                _waypoint_row(waypoint, system_ids)
+                | {
+                    'faction_id': faction_ids.get(waypoint.faction.symbol.value)
+                    if waypoint.faction
+                    else None,
+                    'is_under_construction': waypoint.is_under_construction,
+                }
+                for waypoint in detailed
+            ],
+        )
+
+    ids = lookup_ids(conn, waypoints, set(by_symbol))
+
+    _replace(
+        conn,
+        orbitals,
+        [ids[symbol] for symbol in by_symbol],
+        [
+            {'waypoint_id': ids[waypoint.symbol], 'symbol': orbital.symbol}
+            for waypoint in by_symbol.values()
+            for orbital in waypoint.orbitals
+        ],
+    )
+
+    if detailed:
+        detailed_ids = [ids[waypoint.symbol] for waypoint in detailed]
+        trait_ids = intern_trait_types(conn, (t for w in detailed for t in w.traits))
+        modifier_ids = intern_modifier_types(conn, (m for w in detailed for m in w.modifiers))
+        _replace(
+            conn,
+            traits,
+            detailed_ids,
+            [
+                {'waypoint_id': ids[waypoint.symbol], 'trait_id': trait_ids[trait.symbol.value]}
+                for waypoint in detailed
+                for trait in waypoint.traits
+            ],
+        )
+        _replace(
+            conn,
+            modifiers,
+            detailed_ids,
+            [
+                {
+                    'waypoint_id': ids[waypoint.symbol],
+                    'modifier_id': modifier_ids[modifier.symbol.value],
+                }
+                for waypoint in detailed
+                for modifier in waypoint.modifiers
+            ],
+        )
+
+    return ids
+
+
+def intern_trait_types(conn: Connection, shapes: Iterable[WaypointTraitShape]) -> dict[str, int]:
+    """Store each distinct waypoint trait once.
+
+    Returns:
+        The id of every given trait, by symbol.
+    """
+    return _intern(conn, trait_types, shapes)
+
+
+def intern_modifier_types(
+    conn: Connection, shapes: Iterable[WaypointModifierShape]
+) -> dict[str, int]:
+    """Store each distinct waypoint modifier once.
+
+    Returns:
+        The id of every given modifier, by symbol.
+    """
+    return _intern(conn, modifier_types, shapes)
+
+
+def _intern(
+    conn: Connection, table: Table, shapes: Iterable[WaypointTraitShape | WaypointModifierShape]
+) -> dict[str, int]:
+    unique: dict[str, Row] = {}
+    for shape in shapes:
+        symbol = shape.symbol.value
+        if symbol not in unique:
+            unique[symbol] = {
+                'symbol': symbol,
+                'name': shape.name,
+                'description': shape.description,
+            }
+
+    if not unique:
+        return {}
+
+    upsert(conn, table, ('symbol',), list(unique.values()))
+    return lookup_ids(conn, table, set(unique))
+
+
+def _waypoint_row(waypoint: SystemWaypointShape | WaypointShape, system_ids: dict[str, int]) -> Row:
+    return {
+        'symbol': waypoint.symbol,
+        'system_symbol': waypoint.system_symbol,
+        'type': waypoint.type.value,
+        'x': waypoint.x,
+        'y': waypoint.y,
+        'orbits': waypoint.orbits,
+        'system_id': system_ids.get(waypoint.system_symbol),
+    }
+
+
+def _replace(conn: Connection, table: Table, waypoint_ids: list[int], rows: list[Row]) -> None:
+    """Replace the rows of `table` belonging to `waypoint_ids` with `rows`."""
+    stmt = delete(table).where(table.c.waypoint_id == bindparam('id'))
+    executemany(conn, stmt, [{'id': waypoint_id} for waypoint_id in waypoint_ids])
+    if rows:
+        executemany(conn, insert(table), rows)
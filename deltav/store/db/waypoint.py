@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from deltav.store.db import Base
@@ -15,6 +15,9 @@ if TYPE_CHECKING:
 
 class WaypointRecord(Base):
     __tablename__: str = 'waypoints'
+    __table_args__: tuple[Index, ...] = (
+        Index('ix_waypoints_system_symbol_type', 'system_symbol', 'type'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     symbol: Mapped[str] = mapped_column(unique=True)
@@ -23,11 +26,11 @@ class WaypointRecord(Base):
     x: Mapped[int] = mapped_column()
     y: Mapped[int] = mapped_column()
     orbits: Mapped[str | None] = mapped_column()
-    is_under_construction: Mapped[bool] = mapped_column()
+    is_under_construction: Mapped[bool] = mapped_column(server_default=false())
 
-    chart_id: Mapped[int] = mapped_column(ForeignKey('charts.id'))
-    faction_id: Mapped[int] = mapped_column(ForeignKey('factions.id'))
-    system_id: Mapped[int] = mapped_column(ForeignKey('systems.id'))
+    chart_id: Mapped[int | None] = mapped_column(ForeignKey('charts.id'))
+    faction_id: Mapped[int | None] = mapped_column(ForeignKey('factions.id'))
+    system_id: Mapped[int | None] = mapped_column(ForeignKey('systems.id'))
 
     chart: Mapped[ChartRecord] = relationship(back_populates='waypoint')
     faction: Mapped[FactionRecord] = relationship(back_populates='waypoints')
@@ -48,6 +51,14 @@ class WaypointModifierTypeRecord(Base):
 
 class WaypointModifierRecord(Base):
     __tablename__: str = 'waypoint_modifiers'
+    __table_args__: tuple[Index, ...] = (
+        Index(
+            'ix_waypoint_modifiers_waypoint_id_modifier_id',
+            'waypoint_id',
+            'modifier_id',
+            unique=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -60,6 +71,9 @@ class WaypointModifierRecord(Base):
 
 class WaypointOrbitalRecord(Base):
     __tablename__: str = 'waypoint_orbitals'
+    __table_args__: tuple[Index, ...] = (
+        Index('ix_waypoint_orbitals_waypoint_id_symbol', 'waypoint_id', 'symbol', unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     symbol: Mapped[str] = mapped_column()
@@ -80,6 +94,9 @@ class WaypointTraitTypeRecord(Base):
 
 class WaypointTraitRecord(Base):
     __tablename__: str = 'waypoint_traits'
+    __table_args__: tuple[Index, ...] = (
+        Index('ix_waypoint_traits_waypoint_id_trait_id', 'waypoint_id', 'trait_id', unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
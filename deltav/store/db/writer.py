@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import threading
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import TYPE_CHECKING
+
+from loguru import logger
+from sqlalchemy.dialects.sqlite import insert
+
+from deltav.store.db.bulk import executemany, upsert
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from sqlalchemy import Connection, Engine, Table
+
+    from deltav.store.db.bulk import Row
+
+DEFAULT_BATCH_SIZE: int = 1000
+DEFAULT_FLUSH_INTERVAL: float = 0.5
+
+
+@dataclass
+class _Write:
+    table: Table
+    rows: list[Row]
+    key: tuple[str, ...] | None  # Columns of the unique constraint to upsert on
+
+    @property
+    def group(self) -> tuple[str, tuple[str, ...] | None, tuple[str, ...]]:
+        return self.table.name, self.key, tuple(self.rows[0])
+
+
+@dataclass
+class _Call:
+    fn: Callable[[Connection], object]
+
+
+@dataclass
+class _Flush:
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+class WriteBehindQueue:
+    """Writes rows to the database from a background thread.
+
+    Writes are queued without touching the database, so callers (e.g. the API client)
+    never wait on disk I/O. The worker collects writes for up to `flush_interval`
+    seconds or `batch_size` rows, and commits them in one transaction, in the order they
+    were queued. Consecutive writes to the same table and columns are sent as a single
+    executemany insert or upsert.
+
+    Account updates, market observations, our own market transactions and waypoints are
+    written through the shared `store.db.writer`. Ships are not persisted yet: a ship
+    row needs the ids of its engine, frame and reactor records, which nothing stores.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.engine: Engine = engine
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.__queue: queue.SimpleQueue[_Write | _Call | _Flush | None] = queue.SimpleQueue()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__worker: threading.Thread | None = None
+
+    def insert(self, table: Table, rows: Sequence[Row]) -> None:
+        """Queue plain inserts of `rows` into `table`. All rows must have the same columns."""
+        self.__submit(_Write(table, list(rows), None))
+
+    def upsert(self, table: Table, rows: Sequence[Row], key: Sequence[str]) -> None:
+        """Queue inserts of `rows` into `table`, updating rows that conflict on `key`.
+
+        All rows must have the same columns. `key` must be the columns of a primary key or
+        unique constraint of `table`.
+        """
+        self.__submit(_Write(table, list(rows), tuple(key)))
+
+    def call(self, fn: Callable[[Connection], object]) -> None:
+        """Queue `fn` to be called with the connection of a write transaction.
+
+        For writes that need more than inserts and upserts of known rows, e.g. ones that
+        resolve ids first. Its return value is ignored.
+        """
+        self.__start()
+        self.__queue.put(_Call(fn))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every write queued before the call has been committed.
+
+        Returns:
+            False if the timeout expired first.
+        """
+        if self.__worker is None:
+            return True
+
+        marker = _Flush()
+        self.__queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Commit all queued writes and stop the worker."""
+        with self.__lock:
+            worker, self.__worker = self.__worker, None
+        if worker is None:
+            return
+
+        self.__queue.put(None)
+        worker.join(timeout)
+
+    def __submit(self, write: _Write) -> None:
+        if not write.rows:
+            return
+
+        self.__start()
+        self.__queue.put(write)
+
+    def __start(self) -> None:
+        if self.__worker is not None:
+            return
+
+        with self.__lock:
+            if self.__worker is None:
+                self.__worker = threading.Thread(
+                    target=self.__run, name='deltav-db-writer', daemon=True
+                )
+                self.__worker.start()
+                _ = atexit.register(self.close)
+
+    def __run(self) -> None:
+        running = True
+        while running:
+            batch: list[_Write | _Call] = []
+            markers: list[_Flush] = []
+            rows = 0
+            deadline: float | None = None
+
+            # Block until there is work, then collect more until the batch is full,
+            # the flush interval has passed, or a flush was requested.
+            while rows < self.batch_size:
+                timeout = None if deadline is None else max(deadline - monotonic(), 0)
+                try:
+                    item = self.__queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+                if item is None:
+                    running = False
+                    break
+                if isinstance(item, _Flush):
+                    markers.append(item)
+                    break
+
+                batch.append(item)
+                # A call counts as one row, whatever it writes
+                rows += len(item.rows) if isinstance(item, _Write) else 1
+                if deadline is None:
+                    deadline = monotonic() + self.flush_interval
+
+            if batch:
+                self.__write(batch)
+            for marker in markers:
+                marker.done.set()
+
+        # Drain anything queued after the stop request
+        remaining: list[_Write | _Call] = []
+        while True:
+            try:
+                item = self.__queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, (_Write, _Call)):
+                remaining.append(item)
+            elif isinstance(item, _Flush):
+                item.done.set()
+        if remaining:
+            self.__write(remaining)
+
+    def __write(self, batch: list[_Write | _Call]) -> None:
+        # Consecutive writes to the same table and columns share one statement, anything
+        # else keeps its place, so writes are committed in the order they were queued
+        runs: list[list[_Write] | _Call] = []
+        for item in batch:
+            if isinstance(item, _Call):
+                runs.append(item)
+            elif runs and isinstance(runs[-1], list) and runs[-1][0].group == item.group:
+                runs[-1].append(item)
+            else:
+                runs.append([item])
+
+        try:
+            with self.engine.begin() as conn:
+                for run in runs:
+                    WriteBehindQueue.__execute(conn, run)
+        except Exception:  # noqa: BLE001
+            logger.warning('Batched write failed, retrying each write separately')
+        else:
+            writes = [item for item in batch if isinstance(item, _Write)]
+            logger.trace(f'Wrote {len(_rows(writes))} rows in {len(runs)} batches')
+            return
+
+        # Isolate the failing writes so they do not take the rest of the batch with them
+        for run in runs:
+            try:
+                with self.engine.begin() as conn:
+                    WriteBehindQueue.__execute(conn, run)
+            except Exception:  # noqa: BLE001
+                if isinstance(run, _Call):
+                    logger.exception(f'Dropped write {run.fn}')
+                else:
+                    logger.exception(f'Dropped {len(_rows(run))} rows for {run[0].table.name}')
+
+    @staticmethod
+    def __execute(conn: Connection, run: list[_Write] | _Call) -> None:
+        if isinstance(run, _Call):
+            _ = run.fn(conn)
+            return
+
+        write = run[0]
+        if write.key is None:
+            executemany(conn, insert(write.table), _rows(run))
+        else:
+            upsert(conn, write.table, write.key, _rows(run))
+
+
+def _rows(writes: list[_Write]) -> list[Row]:
+    return [row for write in writes for row in write.rows]
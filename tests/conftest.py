@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import create_engine
+
+# Resolves the annotations of every shape, as importing the client does
+import deltav.spacetraders.enums.endpoints  # noqa: F401
+
+# Every record module, so the foreign keys between their tables resolve
+import deltav.store.db.account
+import deltav.store.db.agent
+import deltav.store.db.chart
+import deltav.store.db.contract
+import deltav.store.db.faction
+import deltav.store.db.game
+import deltav.store.db.market
+import deltav.store.db.ship
+import deltav.store.db.system
+import deltav.store.db.transaction
+import deltav.store.db.waypoint  # noqa: F401
+from deltav.store.db import Base
+from deltav.store.db.migrations import migrate
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from sqlalchemy import Engine
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Engine:
+    """A store with the current schema, in a file so the writer thread can share it."""
+    engine = create_engine(f'sqlite:///{tmp_path / "deltav.db"}')
+    Base.metadata.create_all(engine)
+    _ = migrate(engine)
+    return engine
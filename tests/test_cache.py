@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import gzip
+import json
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+import httpx
+import pytest
+
+from deltav.spacetraders.api.cache import ResponseCache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+BODY = {'data': {'symbol': 'X1-TEST'}}
+
+
+def send_gzipped(request: httpx.Request) -> httpx.Response:
+    content = gzip.compress(json.dumps(BODY).encode())
+    return httpx.Response(
+        200,
+        headers={'Content-Encoding': 'gzip', 'Content-Type': 'application/json'},
+        content=content,
+        request=request,
+    )
+
+
+@pytest.fixture
+def response() -> httpx.Response:
+    with httpx.Client(transport=httpx.MockTransport(send_gzipped)) as client:
+        return client.get('https://api.spacetraders.io/v2/systems/X1-TEST')
+
+
+def test_compressed_response_from_memory(response: httpx.Response) -> None:
+    cache = ResponseCache()
+    cache.put(response.request, response, timedelta(minutes=1))
+
+    hit = cache.get(response.request)
+    assert hit is not None
+    assert hit.json() == BODY
+
+
+def test_compressed_response_from_disk(response: httpx.Response, tmp_path: Path) -> None:
+    ResponseCache(directory=tmp_path).put(response.request, response, timedelta(minutes=1))
+
+    # A new cache starts with an empty memory tier, so the hit is read from disk
+    cache = ResponseCache(directory=tmp_path)
+    hit = cache.get(response.request)
+    assert hit is not None
+    assert hit.json() == BODY
+    assert 'content-encoding' not in hit.headers
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from deltav.automation import ship as ship_module
+from deltav.automation.behaviors import ContractHaulingBehavior, ScoutingBehavior
+from deltav.automation.fleet import Fleet
+from deltav.planning.pathfinding import Pathfinder
+from deltav.spacetraders import Coordinate
+from deltav.spacetraders.api.client import AsyncSpaceTradersAPIClient
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.market import market_index
+from deltav.spacetraders.mock.server import MockSpaceTradersServer
+from deltav.spacetraders.mock.universe import MockUniverse
+from deltav.spacetraders.models.contract import ContractShape
+from deltav.spacetraders.models.market import MarketShape
+from deltav.spacetraders.models.ship import ShipShape
+from deltav.spacetraders.models.systems import JumpgateShape
+from deltav.store.db.writer import WriteBehindQueue
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sqlalchemy import Engine
+
+    from deltav.automation.behaviors import Behavior
+
+# Flights and cooldowns take a thousandth of their time
+TIME_SCALE: float = 0.001
+
+
+@pytest.fixture
+def server(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> Iterator[MockSpaceTradersServer]:
+    writer = WriteBehindQueue(engine)
+    monkeypatch.setattr(ship_module, 'writer', writer)
+    universe = MockUniverse.generate(systems=4, waypoints_per_system=8, ships=1)
+    server = MockSpaceTradersServer(
+        universe, limit_per_second=1000, limit_burst=1000, time_scale=TIME_SCALE
+    )
+    with server.install():
+        yield server
+    writer.close()
+
+
+def pathfinder(universe: MockUniverse) -> Pathfinder:
+    """Every system and jump gate of the universe, refuelling at every market."""
+    pathfinder = Pathfinder()
+    for system_symbol, system in universe.systems.items():
+        waypoints = {w['symbol']: Coordinate(w['x'], w['y']) for w in system['waypoints']}
+        refuel = [symbol for symbol in waypoints if symbol in universe.markets]
+        coordinate = Coordinate(system['x'], system['y'])
+        pathfinder.add_system(system_symbol, coordinate, waypoints, refuel)
+    for gate in universe.jump_gates.values():
+        pathfinder.add_jump_gate(JumpgateShape.model_validate(gate))
+    return pathfinder
+
+
+def run(server: MockSpaceTradersServer, behavior: Behavior) -> None:
+    ship = ShipShape.model_validate(next(iter(server.universe.ships.values())))
+    fleet = Fleet(server.token(), pathfinder(server.universe))
+    _ = fleet.assign(ship, behavior)
+
+    async def main() -> None:
+        try:
+            await asyncio.wait_for(fleet.run(), timeout=30)
+        finally:
+            await AsyncSpaceTradersAPIClient.aclose()
+
+    asyncio.run(main())
+
+
+def test_scouting_refuels_and_jumps_on_the_way(server: MockSpaceTradersServer) -> None:
+    universe = server.universe
+    ship = next(iter(universe.ships.values()))
+    home = ship['nav']['systemSymbol']
+    gate = universe.jump_gates[f'{home}-W0']
+    other = MockUniverse.system_symbol(gate['connections'][0])
+    start = ship['nav']['waypointSymbol']
+    markets = [
+        next(s for s in universe.markets if s.startswith(f'{home}-') and s != start),
+        next(s for s in universe.markets if s.startswith(f'{other}-')),
+    ]
+    # Too little fuel to leave without refuelling first
+    ship['fuel']['current'] = 1
+
+    run(server, ScoutingBehavior(markets, once=True))
+
+    assert ship['nav']['waypointSymbol'] == markets[-1]
+    assert server.requests[SpaceTradersAPIEndpoint.REFUEL_SHIP.name] >= 1
+    assert server.requests[SpaceTradersAPIEndpoint.JUMP_SHIP.name] >= 1
+    assert server.requests[SpaceTradersAPIEndpoint.UPDATE_NAV_STATUS.name] >= 1
+    assert market_index.listings(other)
+
+
+def test_contract_hauling_delivers_and_fulfills(server: MockSpaceTradersServer) -> None:
+    universe = server.universe
+    universe.agent['credits'] = 10**9
+    for symbol, market in universe.markets.items():
+        if symbol.startswith(f'{next(iter(universe.systems))}-'):
+            market_index.update(MarketShape.model_validate(market))
+    contract_id, contract = next(iter(universe.contracts.items()))
+    behavior = ContractHaulingBehavior(ContractShape.model_validate(contract))
+
+    run(server, behavior)
+
+    assert universe.contracts[contract_id]['fulfilled']
+    assert behavior.contract.fulfilled
+    (term,) = behavior.contract.terms.deliver
+    assert term.units_fulfilled == term.units_required
+    ship = next(iter(universe.ships.values()))
+    assert all(item['symbol'] != term.trade_symbol.value for item in ship['cargo']['inventory'])
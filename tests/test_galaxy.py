@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from math import hypot
+from typing import TYPE_CHECKING
+
+from deltav.planning.galaxy import Galaxy
+from deltav.spacetraders import Coordinate
+from deltav.spacetraders import system as system_module
+from deltav.spacetraders import waypoint as waypoint_module
+from deltav.spacetraders.enums.waypoint import WaypointTraitSymbol
+from deltav.spacetraders.mock.server import MockSpaceTradersServer
+from deltav.spacetraders.mock.universe import MockUniverse
+from deltav.spacetraders.models.systems import SystemShape, SystemWaypointShape
+from deltav.spacetraders.models.waypoint import WaypointShape
+from deltav.spacetraders.system import System
+from deltav.spacetraders.waypoint import Waypoint
+from deltav.store.db.universe import ingest
+from deltav.store.db.writer import WriteBehindQueue
+
+if TYPE_CHECKING:
+    import pytest
+    from sqlalchemy import Engine
+
+SHIPYARD = [{'symbol': 'SHIPYARD', 'name': 'Shipyard', 'description': ''}]
+
+
+def system_shapes(universe: MockUniverse) -> list[SystemShape]:
+    return [SystemShape.model_validate(data) for data in universe.systems.values()]
+
+
+def test_load_and_query_systems(engine: Engine) -> None:
+    shapes = system_shapes(MockUniverse.generate(systems=30, waypoints_per_system=3))
+    ingest(engine, system_shapes=shapes)
+    galaxy = Galaxy()
+    galaxy.load(engine)
+
+    assert set(galaxy.systems) == {shape.symbol for shape in shapes}
+    assert sum(len(systems) for systems in galaxy.sectors.values()) == len(shapes)
+    assert sum(len(systems) for systems in galaxy.constellations.values()) == len(shapes)
+    assert len(galaxy.waypoints(shapes[0].symbol)) == 3
+
+    center = Coordinate(0, 0)
+    by_distance = sorted(shapes, key=lambda shape: hypot(shape.x, shape.y))
+    nearest = galaxy.nearest_systems(center, n=5)
+    assert [system.symbol for system in nearest] == [shape.symbol for shape in by_distance[:5]]
+
+    radius = hypot(by_distance[9].x, by_distance[9].y)
+    within = galaxy.systems_within(center, radius)
+    assert [system.symbol for system in within] == [shape.symbol for shape in by_distance[:10]]
+
+
+def test_trait_grids_follow_replaced_waypoints() -> None:
+    universe = MockUniverse.generate(systems=3, waypoints_per_system=2)
+    galaxy = Galaxy()
+    galaxy.update_systems(system_shapes(universe))
+    symbol, data = next(iter(universe.waypoints.items()))
+    system_symbol = data['systemSymbol']
+    origin = Coordinate(0, 0)
+
+    def shipyard_systems() -> list[str]:
+        found = galaxy.nearest_systems(origin, n=3, trait=WaypointTraitSymbol.SHIPYARD)
+        return [system.symbol for system in found]
+
+    assert shipyard_systems() == []
+
+    galaxy.update_waypoints([WaypointShape.model_validate({**data, 'traits': SHIPYARD})])
+    assert shipyard_systems() == [system_symbol]
+    found = galaxy.nearest_waypoints(system_symbol, origin, trait=WaypointTraitSymbol.SHIPYARD)
+    assert [waypoint.symbol for waypoint in found] == [symbol]
+
+    # Listed in its system again, without traits, the waypoint keeps the known ones
+    galaxy.update_waypoints([SystemWaypointShape.model_validate(data)])
+    assert shipyard_systems() == [system_symbol]
+
+    # Fetched again without the trait, the system leaves the trait grid
+    galaxy.update_waypoints([WaypointShape.model_validate({**data, 'traits': []})])
+    assert shipyard_systems() == []
+    assert galaxy.nearest_waypoints(system_symbol, origin, trait=WaypointTraitSymbol.SHIPYARD) == []
+
+
+def test_fetches_update_the_galaxy(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    galaxy = Galaxy()
+    writer = WriteBehindQueue(engine)
+    for module in (system_module, waypoint_module):
+        monkeypatch.setattr(module, 'galaxy', galaxy)
+        monkeypatch.setattr(module, 'writer', writer)
+    server = MockSpaceTradersServer(MockUniverse.generate(systems=2, waypoints_per_system=2))
+    system_symbol, system_data = next(iter(server.universe.systems.items()))
+    symbol = system_data['waypoints'][0]['symbol']
+    server.universe.waypoints[symbol]['traits'] = SHIPYARD
+
+    with server.install():
+        system = System(data=SystemShape.model_validate(system_data))
+        assert isinstance(system._fetch_system(), SystemShape)
+        _ = system._fetch_waypoints()
+        waypoint = WaypointShape.model_validate(server.universe.waypoints[symbol])
+        assert isinstance(Waypoint(data=waypoint)._fetch_waypoint(), WaypointShape)
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    assert set(galaxy.systems) == {system_symbol}
+    assert len(galaxy.waypoints(system_symbol)) == 2
+    found = galaxy.waypoint(symbol)
+    assert found is not None
+    assert found.traits == {WaypointTraitSymbol.SHIPYARD}
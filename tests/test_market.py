@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from deltav.spacetraders.enums.market import MarketTradeGoodType, SupplyLevel
+from deltav.spacetraders.market import MarketIndex, MarketSide
+from deltav.store.db.market import MarketPrice
+
+
+def price(waypoint_symbol: str, purchase_price: int) -> MarketPrice:
+    now = datetime.now(tz=UTC)
+    return MarketPrice(
+        waypoint_symbol=waypoint_symbol,
+        trade_symbol='FUEL',
+        type=MarketTradeGoodType.EXCHANGE,
+        supply=SupplyLevel.MODERATE,
+        activity=None,
+        trade_volume=100,
+        purchase_price=purchase_price,
+        sell_price=purchase_price - 1,
+        observed_at=now,
+        last_observed_at=now,
+    )
+
+
+def test_clear_forgets_every_market() -> None:
+    index = MarketIndex()
+    index.load([price('X1-A1-A1', 10), price('X1-A1-A2', 20)])
+    index.clear()
+    assert index.listings() == []
+    assert index.listing('X1-A1-A1', 'FUEL') is None
+
+    # Markets are interned again from scratch and still order correctly
+    index.load([price('X1-A1-A2', 30), price('X1-A1-A3', 5)])
+    best = index.best(MarketSide.BUY, 'FUEL', 'X1-A1')
+    assert best is not None
+    assert best.waypoint_symbol == 'X1-A1-A3'
+    assert [listing.waypoint_symbol for listing in index.top(MarketSide.BUY, 'FUEL', 3)] == [
+        'X1-A1-A3',
+        'X1-A1-A2',
+    ]
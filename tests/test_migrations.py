@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import MetaData, create_engine, func, insert, select
+
+from deltav.store.db import Base
+from deltav.store.db.errors import MigrationError
+from deltav.store.db.migrations import migrate, schema_version
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from sqlalchemy import Engine, Table
+
+
+def legacy_store(tmp_path: Path) -> tuple[Engine, Table]:
+    """A store at version 0 whose engine types have no unique index, nor NOT NULLs."""
+    engine = create_engine(f'sqlite:///{tmp_path / "deltav.db"}')
+    Base.metadata.create_all(engine)
+    legacy = Base.metadata.tables['ship_engine_types'].to_metadata(MetaData())
+    legacy.indexes.clear()
+    for column in legacy.columns:
+        column.nullable = not column.primary_key
+    with engine.begin() as conn:
+        _ = conn.exec_driver_sql('DROP TABLE ship_engine_types')
+        legacy.create(conn)
+    return engine, legacy
+
+
+def count(engine: Engine, table: Table) -> int:
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(table)).scalar_one()
+
+
+def test_duplicate_keys_fail_the_migration_without_losing_rows(tmp_path: Path) -> None:
+    engine, engines = legacy_store(tmp_path)
+    with engine.begin() as conn:
+        _ = conn.execute(insert(engines), [{'symbol': 'ENGINE_IMPULSE_DRIVE_I'}] * 2)
+
+    with pytest.raises(MigrationError, match='ENGINE_IMPULSE_DRIVE_I'):
+        _ = migrate(engine)
+
+    assert count(engine, engines) == 2
+    with engine.connect() as conn:
+        assert schema_version(conn) == 0
+
+
+def test_null_keys_are_kept(tmp_path: Path) -> None:
+    engine, engines = legacy_store(tmp_path)
+    with engine.begin() as conn:
+        _ = conn.execute(
+            insert(engines), [{'symbol': None}, {'symbol': None}, {'symbol': 'ENGINE_ION_DRIVE_I'}]
+        )
+
+    assert migrate(engine) > 0
+    assert count(engine, engines) == 3
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import httpx
+
+from deltav.spacetraders.api.client import AsyncSpaceTradersAPIClient, SpaceTradersAPIClient
+from deltav.spacetraders.api.error import SpaceTradersAPIError
+from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.mock.server import MockSpaceTradersServer
+from deltav.spacetraders.mock.universe import MockUniverse
+
+# Page 2 never connects and page 3 returns a body that does not validate
+FAILING_PAGES = {2, 3}
+
+
+def faulty(server: MockSpaceTradersServer, request: httpx.Request) -> httpx.Response:
+    match request.url.params.get('page'):
+        case '2':
+            msg = 'connection refused'
+            raise httpx.ConnectError(msg, request=request)
+        case '3':
+            return httpx.Response(200, json={'data': [{'symbol': 1}]}, request=request)
+        case _:
+            return server.handle(request)
+
+
+def ships_request(server: MockSpaceTradersServer) -> SpaceTradersAPIRequest[Any]:
+    return (
+        SpaceTradersAPIRequest[Any]()
+        .builder()
+        .endpoint(SpaceTradersAPIEndpoint.GET_SHIPS)
+        .token(server.token())
+        .all_pages()
+        .page_limit(2)
+        .concurrent_pages(2)
+        .build()
+    )
+
+
+def check(res: Any) -> None:
+    assert res.is_partial
+    assert set(res.page_errors) == FAILING_PAGES
+    assert all(isinstance(err, SpaceTradersAPIError) for err in res.page_errors.values())
+    assert isinstance(res.page_errors[2].exception, httpx.ConnectError)
+    # 10 ships in pages of 2, with two pages missing
+    assert len(res.data.ships) == 6
+
+
+def test_failed_pages_do_not_abort_the_crawl() -> None:
+    server = MockSpaceTradersServer(MockUniverse.generate(ships=10))
+    client = SpaceTradersAPIClient.http_client
+    transport = httpx.MockTransport(lambda request: faulty(server, request))
+    with httpx.Client(transport=transport) as http_client:
+        SpaceTradersAPIClient.http_client = http_client
+        try:
+            check(SpaceTradersAPIClient.call(ships_request(server)))
+        finally:
+            SpaceTradersAPIClient.http_client = client
+
+
+def test_failed_pages_do_not_abort_the_async_crawl() -> None:
+    server = MockSpaceTradersServer(MockUniverse.generate(ships=10))
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        return faulty(server, request)
+
+    async def crawl() -> Any:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as http_client:
+            AsyncSpaceTradersAPIClient.http_client = http_client
+            return await AsyncSpaceTradersAPIClient.call(ships_request(server))
+
+    client = AsyncSpaceTradersAPIClient.http_client
+    try:
+        check(asyncio.run(crawl()))
+    finally:
+        AsyncSpaceTradersAPIClient.http_client = client
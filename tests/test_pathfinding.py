@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from deltav.planning.pathfinding import Pathfinder, RouteLegType, SystemGraph
+from deltav.spacetraders import Coordinate
+from deltav.spacetraders.enums.ship import ShipNavFlightMode
+from deltav.spacetraders.models.systems import JumpgateShape
+
+WAYPOINTS = {
+    'X1-A-A1': Coordinate(0, 0),
+    'X1-A-A2': Coordinate(60, 0),
+    'X1-A-A3': Coordinate(120, 0),
+}
+
+
+def test_refuels_on_the_way_when_the_tank_is_too_small() -> None:
+    graph = SystemGraph(WAYPOINTS, refuel=['X1-A-A2'])
+
+    route = graph.path('X1-A-A1', 'X1-A-A3', fuel=70, fuel_capacity=70, speed=30)
+
+    assert route is not None
+    assert [(leg.destination, leg.mode, leg.refuel) for leg in route.legs] == [
+        ('X1-A-A2', ShipNavFlightMode.CRUISE, False),
+        ('X1-A-A3', ShipNavFlightMode.CRUISE, True),
+    ]
+    assert route.fuel == 120
+
+
+def test_drifts_only_when_no_other_mode_is_affordable() -> None:
+    graph = SystemGraph(WAYPOINTS)
+
+    route = graph.path('X1-A-A1', 'X1-A-A3', fuel=70, fuel_capacity=70, speed=30)
+
+    assert route is not None
+    assert [(leg.destination, leg.mode) for leg in route.legs] == [
+        ('X1-A-A2', ShipNavFlightMode.CRUISE),
+        ('X1-A-A3', ShipNavFlightMode.DRIFT),
+    ]
+    assert route.fuel == 61
+
+    route = graph.path('X1-A-A1', 'X1-A-A2', fuel=200, fuel_capacity=200, speed=30)
+    assert route is not None
+    assert [leg.mode for leg in route.legs] == [ShipNavFlightMode.BURN]
+
+
+def test_unreachable_destinations() -> None:
+    pathfinder = Pathfinder()
+    pathfinder.add_system('X1-A', Coordinate(0, 0), WAYPOINTS)
+
+    assert pathfinder.route('X1-A-A1', 'X1-A-A3', fuel=0, fuel_capacity=70, speed=30) is None
+    assert pathfinder.route('X1-A-A1', 'X1-B-B1', fuel=70, fuel_capacity=70, speed=30) is None
+
+
+def test_jumps_across_systems_and_replans_when_gates_change() -> None:
+    pathfinder = Pathfinder()
+    pathfinder.add_system('X1-A', Coordinate(0, 0), WAYPOINTS | {'X1-A-G': Coordinate(0, 10)})
+    pathfinder.add_system(
+        'X1-B', Coordinate(500, 0), {'X1-B-G': Coordinate(0, 0), 'X1-B-B1': Coordinate(30, 0)}
+    )
+
+    # No gates are known yet, and that result is kept until they are
+    assert pathfinder.route('X1-A-A1', 'X1-B-B1', fuel=65, fuel_capacity=65, speed=30) is None
+    pathfinder.add_jump_gate(JumpgateShape(symbol='X1-A-G', connections=['X1-B-G']))
+
+    route = pathfinder.route('X1-A-A1', 'X1-B-B1', fuel=65, fuel_capacity=65, speed=30)
+    assert route is not None
+    assert [(leg.type, leg.origin, leg.destination) for leg in route.legs] == [
+        (RouteLegType.NAVIGATE, 'X1-A-A1', 'X1-A-G'),
+        (RouteLegType.JUMP, 'X1-A-G', 'X1-B-G'),
+        (RouteLegType.NAVIGATE, 'X1-B-G', 'X1-B-B1'),
+    ]
+    assert route.jumps == 1
+    # Burning to the gate leaves 45 fuel, too little to burn the 60 of the last leg
+    assert [leg.mode for leg in route.legs] == [
+        ShipNavFlightMode.BURN,
+        None,
+        ShipNavFlightMode.CRUISE,
+    ]
+
+    # Connections are used in both directions
+    back = pathfinder.route('X1-B-B1', 'X1-A-A1', fuel=50, fuel_capacity=50, speed=30)
+    assert back is not None
+    assert back.jumps == 1
+
+
+def test_replacing_a_system_drops_its_cached_paths() -> None:
+    pathfinder = Pathfinder()
+    pathfinder.add_system('X1-A', Coordinate(0, 0), WAYPOINTS)
+    before = pathfinder.route('X1-A-A1', 'X1-A-A3', fuel=70, fuel_capacity=70, speed=30)
+    assert before is not None
+    assert ShipNavFlightMode.DRIFT in [leg.mode for leg in before.legs]
+
+    pathfinder.add_system('X1-A', Coordinate(0, 0), WAYPOINTS, refuel=['X1-A-A2'])
+    after = pathfinder.route('X1-A-A1', 'X1-A-A3', fuel=70, fuel_capacity=70, speed=30)
+    assert after is not None
+    assert [leg.refuel for leg in after.legs] == [False, True]
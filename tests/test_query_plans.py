@@ -0,0 +1,142 @@
+"""The hot store lookups are served by the index meant for them, never a table scan."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import select
+
+from deltav.store.db.agent import AgentRecord
+from deltav.store.db.faction import FactionReputationRecord
+from deltav.store.db.market import MarketLatestPriceRecord, MarketPriceRecord
+from deltav.store.db.ship import ShipRecord, ShipRouteRecord
+from deltav.store.db.transaction import TransactionRecord
+from deltav.store.db.waypoint import WaypointRecord, WaypointTraitRecord
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine, Select
+
+now = datetime.now(tz=UTC)
+day_ago = now - timedelta(days=1)
+
+ships = ShipRecord.__table__
+agents = AgentRecord.__table__
+routes = ShipRouteRecord.__table__
+transactions = TransactionRecord.__table__
+waypoints = WaypointRecord.__table__
+reputations = FactionReputationRecord.__table__
+traits = WaypointTraitRecord.__table__
+prices = MarketPriceRecord.__table__
+latest_prices = MarketLatestPriceRecord.__table__
+
+# Each query with the table it searches and the index it must search it with. Unique
+# constraints are served by the automatic index SQLite creates for them.
+HOT_QUERIES: dict[str, tuple[Select[tuple[object, ...]], str, str]] = {
+    'ship owner token': (
+        select(agents.c.token)
+        .join(ships, ships.c.agent_id == agents.c.id)
+        .where(ships.c.symbol == 'SHIP-1'),
+        'ships',
+        'INDEX sqlite_autoindex_ships_1 (symbol=?)',
+    ),
+    'agent by token': (
+        select(agents).where(agents.c.token == 'token'),
+        'agents',
+        'INDEX sqlite_autoindex_agents_2 (token=?)',
+    ),
+    'ships of agent': (
+        select(ships).where(ships.c.agent_id == 1),
+        'ships',
+        'INDEX ix_ships_agent_id',
+    ),
+    'waypoints in system': (
+        select(waypoints).where(waypoints.c.system_symbol == 'X1-A1'),
+        'waypoints',
+        'INDEX ix_waypoints_system_symbol_type',
+    ),
+    'waypoints in system by type': (
+        select(waypoints).where(
+            waypoints.c.system_symbol == 'X1-A1', waypoints.c.type == 'PLANET'
+        ),
+        'waypoints',
+        'INDEX ix_waypoints_system_symbol_type (system_symbol=? AND type=?)',
+    ),
+    'route history of ship': (
+        select(routes).where(routes.c.ship_id == 1, routes.c.arrival.between(day_ago, now)),
+        'ship_routes',
+        'INDEX ix_ship_routes_ship_id_arrival',
+    ),
+    'arrivals at waypoint': (
+        select(routes).where(
+            routes.c.destination_waypoint == 'X1-A1-B2', routes.c.arrival >= day_ago
+        ),
+        'ship_routes',
+        'INDEX ix_ship_routes_destination_waypoint_arrival',
+    ),
+    'transactions of ship': (
+        select(transactions).where(
+            transactions.c.ship_symbol == 'SHIP-1',
+            transactions.c.timestamp.between(day_ago, now),
+        ),
+        'transactions',
+        'INDEX ix_transactions_ship_symbol_timestamp',
+    ),
+    'transactions at waypoint': (
+        select(transactions).where(
+            transactions.c.waypoint_symbol == 'X1-A1-B2', transactions.c.timestamp >= day_ago
+        ),
+        'transactions',
+        'INDEX ix_transactions_waypoint_symbol_timestamp',
+    ),
+    'reputation of agent': (
+        select(reputations.c.reputation).where(
+            reputations.c.agent_id == 1, reputations.c.faction_symbol == 'COSMIC'
+        ),
+        'faction_reputations',
+        'INDEX ix_faction_reputations_agent_id_faction_symbol',
+    ),
+    'traits of waypoint': (
+        select(traits).where(traits.c.waypoint_id == 1),
+        'waypoint_traits',
+        'INDEX ix_waypoint_traits_waypoint_id_trait_id',
+    ),
+    'price history at market': (
+        select(prices).where(
+            prices.c.market_id == 1,
+            prices.c.trade_good_id == 1,
+            prices.c.observed_at.between(int(day_ago.timestamp()), int(now.timestamp())),
+        ),
+        'market_prices',
+        'PRIMARY KEY (market_id=? AND trade_good_id=? AND observed_at>?',
+    ),
+    'price history of good': (
+        select(prices).where(
+            prices.c.trade_good_id == 1, prices.c.observed_at >= int(day_ago.timestamp())
+        ),
+        'market_prices',
+        'INDEX ix_market_prices_trade_good_id_observed_at',
+    ),
+    'latest prices at market': (
+        select(latest_prices).where(latest_prices.c.market_id == 1),
+        'market_latest_prices',
+        'PRIMARY KEY (market_id=?)',
+    ),
+}
+
+
+def query_plan(engine: Engine, query: Select[tuple[object, ...]]) -> list[str]:
+    compiled = query.compile(engine, compile_kwargs={'literal_binds': True})
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}')]
+
+
+@pytest.mark.parametrize(('query', 'table', 'index'), HOT_QUERIES.values(), ids=HOT_QUERIES)
+def test_hot_query_uses_its_index(
+    engine: Engine, query: Select[tuple[object, ...]], table: str, index: str
+) -> None:
+    plan = query_plan(engine, query)
+    assert not [step for step in plan if step.startswith('SCAN')], plan
+    searches = [step for step in plan if step.startswith(f'SEARCH {table} ')]
+    assert any(index in step for step in searches), plan
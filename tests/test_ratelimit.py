@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from deltav.spacetraders.api.ratelimit import Ratelimit, RatelimitHeaders
+
+
+def headers(reset: str) -> RatelimitHeaders:
+    return RatelimitHeaders(
+        x_ratelimit_limit_burst=30,
+        x_ratelimit_limit_per_second=2,
+        x_ratelimit_remaining=10,
+        x_ratelimit_reset=reset,
+        x_ratelimit_type='IP Address',
+    )
+
+
+def test_invalid_reset_keeps_the_previous_one() -> None:
+    ratelimit = Ratelimit()
+    reset = datetime.now(tz=UTC) + timedelta(seconds=30)
+    ratelimit.update(headers(reset.isoformat()))
+
+    ratelimit.update(headers('not a timestamp'))
+    assert ratelimit.reset == reset
+    assert ratelimit.remaining == 10
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from deltav.spacetraders.api.client import httpx_request
+from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+from deltav.spacetraders.api.response import SpaceTradersAPIResponse
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.mock.server import MockSpaceTradersServer
+from deltav.spacetraders.mock.universe import MockUniverse
+from deltav.spacetraders.models.server import ServerStatusShape
+
+
+def test_unwrapped_body_validates_as_a_whole() -> None:
+    server = MockSpaceTradersServer(MockUniverse.generate())
+    req = (
+        SpaceTradersAPIRequest[Any]()
+        .builder()
+        .endpoint(SpaceTradersAPIEndpoint.GET_SERVER_STATUS)
+        .build()
+    )
+    res = server.handle(httpx_request(req))
+    assert 'data' not in res.json()
+
+    response = SpaceTradersAPIResponse[Any](SpaceTradersAPIEndpoint.GET_SERVER_STATUS, res)
+    assert isinstance(response.unwrap(), ServerStatusShape)
+
+
+def test_invalid_body_raises_without_parsing_it_again(monkeypatch: pytest.MonkeyPatch) -> None:
+    def parse_again(_: httpx.Response) -> Any:
+        pytest.fail('the body was parsed again after failing to validate')
+
+    monkeypatch.setattr(httpx.Response, 'json', parse_again)
+    res = httpx.Response(200, content=b'{"data": {"symbol": 1}}')
+    with pytest.raises(ValidationError):
+        _ = SpaceTradersAPIResponse[Any](SpaceTradersAPIEndpoint.GET_MARKET, res)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from http import HTTPStatus
+from typing import Any
+
+import httpx
+import pytest
+
+from deltav.spacetraders.api.error import SpaceTradersAPIError
+from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+from deltav.spacetraders.api.retry import retry_delay
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.enums.error import SpaceTradersAPIErrorCodes
+from deltav.spacetraders.mock.server import MockSpaceTradersServer
+from deltav.spacetraders.mock.universe import MockUniverse
+
+server = MockSpaceTradersServer(MockUniverse.generate())
+
+
+def request(endpoint: SpaceTradersAPIEndpoint) -> SpaceTradersAPIRequest[Any]:
+    return (
+        SpaceTradersAPIRequest[Any]()
+        .builder()
+        .endpoint(endpoint)
+        .path_params('MOCK-1')
+        .token(server.token())
+        .retries(3)
+        .build()
+    )
+
+
+def game_error(code: SpaceTradersAPIErrorCodes, data: Any = None) -> SpaceTradersAPIError:
+    error = {'code': code.value, 'message': code.name, 'data': data or {}, 'requestId': '1'}
+    body = {'error': error}
+    return SpaceTradersAPIError(httpx.Response(HTTPStatus.CONFLICT, json=body))
+
+
+GET = request(SpaceTradersAPIEndpoint.GET_SHIP)
+POST = request(SpaceTradersAPIEndpoint.DOCK_SHIP)
+
+
+@pytest.mark.parametrize(
+    'failure',
+    [httpx.ReadTimeout('timeout'), httpx.RemoteProtocolError('closed')],
+)
+def test_mutating_requests_only_retry_errors_before_connecting(failure: Exception) -> None:
+    assert retry_delay(GET, 0, failure) is not None
+    assert retry_delay(POST, 0, failure) is None
+
+
+@pytest.mark.parametrize('failure', [httpx.ConnectError('refused'), httpx.ConnectTimeout('t')])
+def test_connect_errors_are_retried(failure: Exception) -> None:
+    assert retry_delay(POST, 0, failure) is not None
+
+
+@pytest.mark.parametrize('status', [HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.BAD_GATEWAY])
+def test_mutating_requests_do_not_retry_server_errors(status: HTTPStatus) -> None:
+    err = SpaceTradersAPIError(httpx.Response(status, text='error'))
+    assert retry_delay(GET, 0, err) is not None
+    assert retry_delay(POST, 0, err) is None
+
+
+def test_only_transient_game_errors_are_retried() -> None:
+    cooldown = game_error(
+        SpaceTradersAPIErrorCodes.COOLDOWN_CONFLICT_ERROR, {'cooldown': {'remainingSeconds': 7}}
+    )
+    assert retry_delay(POST, 0, cooldown) == 7
+    in_transit = game_error(SpaceTradersAPIErrorCodes.SHIP_IN_TRANSIT_ERROR)
+    assert retry_delay(GET, 0, in_transit) is None
+    assert retry_delay(POST, 0, in_transit) is None
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from math import hypot
+from random import Random
+
+from deltav.planning.spatial import SpatialGrid
+from deltav.spacetraders import Coordinate
+
+
+def test_queries_match_a_full_scan() -> None:
+    random = Random(0)
+    points = {
+        i: Coordinate(random.randint(-500, 500), random.randint(-500, 500)) for i in range(300)
+    }
+    grid: SpatialGrid[int] = SpatialGrid(50)
+    for key, coordinate in points.items():
+        grid.insert(key, coordinate)
+
+    for _ in range(20):
+        center = Coordinate(random.randint(-600, 600), random.randint(-600, 600))
+        scan = sorted((hypot(p.x - center.x, p.y - center.y), key) for key, p in points.items())
+
+        nearest = grid.nearest(center, n=7)
+        assert [dist for dist, _ in nearest] == [dist for dist, _ in scan[:7]]
+
+        within = grid.within(center, 120)
+        assert sorted(key for _, key in within) == sorted(key for dist, key in scan if dist <= 120)
+
+        even = grid.nearest(center, n=3, where=lambda key: key % 2 == 0)
+        assert [dist for dist, _ in even] == [dist for dist, key in scan if key % 2 == 0][:3]
+
+
+def test_insert_moves_and_remove_drops_keys() -> None:
+    grid: SpatialGrid[str] = SpatialGrid(10)
+    grid.insert('A', Coordinate(0, 0))
+    grid.insert('B', Coordinate(100, 100))
+
+    grid.insert('A', Coordinate(95, 95))
+    assert len(grid) == 2
+    assert grid.coordinate('A') == Coordinate(95, 95)
+    assert grid.nearest(Coordinate(0, 0)) == [(hypot(95, 95), 'A')]
+    assert grid.within(Coordinate(0, 0), 50) == []
+
+    grid.remove('A')
+    grid.remove('A')
+    assert 'A' not in grid
+    assert [key for _, key in grid.nearest(Coordinate(0, 0), n=5)] == ['B']
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING, Any
+
+import jwt
+import pytest
+
+from deltav.__main__ import configure
+from deltav.config.config import Config, DeltavConfig
+from deltav.spacetraders.api.client import AsyncSpaceTradersAPIClient, SpaceTradersAPIClient
+from deltav.spacetraders.api.request import SpaceTradersAPIRequest
+from deltav.spacetraders.enums.endpoints import SpaceTradersAPIEndpoint
+from deltav.spacetraders.token import AgentToken
+from deltav.store import db
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+ACCOUNTS = ('alpha', 'beta')
+
+
+def token(identifier: str, **claims: Any) -> str:
+    claims = {'identifier': identifier, 'version': 'v2', 'iat': int(time.time()), **claims}
+    return jwt.encode(claims, None, algorithm='none')
+
+
+def config_file(directory: Path) -> Path:
+    accounts = agents = ''
+    for name in ACCOUNTS:
+        account_token = token(name, sub='account-token')
+        agent_token = token(f'{name}-agent'.upper(), sub='agent-token', reset_date='2026-01-01')
+        accounts += f'[[spacetraders.accounts]]\nnickname = "{name}"\ntoken = "{account_token}"\n'
+        agents += (
+            f'[[spacetraders.agents]]\naccount = "{name}"\ncallsign = "{name}-agent"\n'
+            f'token = "{agent_token}"\n'
+        )
+
+    path = directory / 'config.toml'
+    _ = path.write_text(
+        '[deltav]\n\n'
+        '[deltav.log]\nlevel = "info"\n\n'
+        f'[deltav.db]\ndirectory = "{directory / "db"}"\n\n'
+        '[deltav.http]\nmax_connections = 4\n\n'
+        '[vantage]\ntheme = "dark"\n\n'
+        '[spacetraders.defaults]\nemail = "email@example.com"\n\n'
+        f'{accounts}{agents}'
+    )
+    return path
+
+
+@pytest.fixture
+def config(tmp_path: Path) -> Iterator[Config]:
+    config = Config(config_file(tmp_path))
+    configure(config)
+    yield config
+    SpaceTradersAPIClient.close()
+    asyncio.run(AsyncSpaceTradersAPIClient.aclose())
+    SpaceTradersAPIClient.configure(DeltavConfig())
+    db.configure(DeltavConfig())
+
+
+def agent_request(config: Config, account: str) -> SpaceTradersAPIRequest[Any]:
+    agent = config.get_agent(account, f'{account}-agent')
+    return (
+        SpaceTradersAPIRequest[Any]()
+        .builder()
+        .endpoint(SpaceTradersAPIEndpoint.GET_AGENT)
+        .token(AgentToken(agent.token.encoded))
+        .build()
+    )
+
+
+def test_every_account_gets_its_own_budget(config: Config) -> None:
+    dispatcher = SpaceTradersAPIClient.dispatcher
+    assert set(dispatcher.budgets) == set(ACCOUNTS)
+
+    alpha = dispatcher.route(agent_request(config, 'alpha'))
+    beta = dispatcher.route(agent_request(config, 'beta'))
+    assert alpha is not None
+    assert beta is not None
+    assert alpha.name == 'alpha'
+    assert beta.name == 'beta'
+    assert alpha.ratelimit is not beta.ratelimit
+    assert alpha.ratelimit is not SpaceTradersAPIClient.ratelimit
+
+
+def test_http_settings_are_applied(config: Config) -> None:
+    assert config.deltav.http_max_connections == 4
+    pool = SpaceTradersAPIClient.http_client._transport._pool  # noqa: SLF001  # pyright: ignore
+    assert pool._max_connections == 4  # noqa: SLF001  # pyright: ignore
+
+
+def test_store_uses_the_configured_directory(config: Config, tmp_path: Path) -> None:
+    assert db.engine.url.database == str(tmp_path / 'db' / db.DB_FILE_NAME)
+    assert db.writer.engine is db.engine
+
+
+def test_store_keeps_using_a_legacy_database(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    _ = (tmp_path / db.DB_FILE_NAME).write_bytes(b'')
+    assert db.db_directory(tmp_path / 'state') == tmp_path
+
+    # Once moved, the configured directory is used
+    (tmp_path / 'state').mkdir()
+    _ = (tmp_path / db.DB_FILE_NAME).rename(tmp_path / 'state' / db.DB_FILE_NAME)
+    assert db.db_directory(tmp_path / 'state') == tmp_path / 'state'
+
+
+def test_connection_pools_are_not_created_at_import() -> None:
+    code = (
+        'from deltav.spacetraders.api.client import '
+        'AsyncSpaceTradersAPIClient, SpaceTradersAPIClient\n'
+        'assert SpaceTradersAPIClient.http_client is None\n'
+        'assert AsyncSpaceTradersAPIClient.http_client is None\n'
+    )
+    _ = subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_async_configure_closes_the_replaced_pools(config: Config) -> None:
+    budgets = AsyncSpaceTradersAPIClient.dispatcher.budgets
+    accounts = config.spacetraders.accounts.values()
+    asyncio.run(AsyncSpaceTradersAPIClient.configure(config.deltav, accounts))
+
+    assert set(AsyncSpaceTradersAPIClient.dispatcher.budgets) == set(ACCOUNTS)
+    for budget in budgets.values():
+        assert budget.http_client.is_closed
+        assert budget.async_http_client.is_closed
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+from deltav.automation.behaviors import ContractHaulingBehavior
+from deltav.automation.ship import ShipController
+from deltav.automation.timers import WakeReason, WakeScheduler
+from deltav.spacetraders.api.client import AsyncSpaceTradersAPIClient
+from deltav.spacetraders.mock.server import MockSpaceTradersServer
+from deltav.spacetraders.mock.universe import MockUniverse
+from deltav.spacetraders.models.contract import ContractShape
+from deltav.spacetraders.models.ship import ShipShape
+
+
+def test_cancel_returns_waiters_without_cancelling_them() -> None:
+    async def run() -> tuple[bool, bool]:
+        scheduler = WakeScheduler()
+        cancelled = asyncio.create_task(scheduler.sleep('SHIP-1', 60, WakeReason.IDLE))
+        woken = asyncio.create_task(scheduler.sleep('SHIP-2', 0.01, WakeReason.COOLDOWN))
+        await asyncio.sleep(0)
+        scheduler.cancel('SHIP-1')
+        assert 'SHIP-1' not in scheduler
+        return await cancelled, await woken
+
+    assert asyncio.run(run()) == (False, True)
+
+
+def test_rescheduling_reorders_wake_ups() -> None:
+    async def run() -> list[str]:
+        scheduler = WakeScheduler()
+        order: list[str] = []
+
+        async def sleep(key: str, seconds: float) -> None:
+            assert await scheduler.sleep(key, seconds, WakeReason.ARRIVAL)
+            order.append(key)
+
+        tasks = [
+            asyncio.create_task(sleep('SHIP-1', 0.2)),
+            asyncio.create_task(sleep('SHIP-2', 0.05)),
+        ]
+        await asyncio.sleep(0)
+        # Moving the later wake-up ahead of the earlier one
+        scheduler.schedule('SHIP-1', datetime.now(tz=UTC), WakeReason.ARRIVAL)
+        _ = await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(run()) == ['SHIP-1', 'SHIP-2']
+
+
+def test_stale_entries_never_wake_after_compaction() -> None:
+    async def run() -> tuple[bool, float]:
+        scheduler = WakeScheduler()
+        start = datetime.now(tz=UTC)
+        task = asyncio.create_task(scheduler.sleep('SHIP-1', 0.01, WakeReason.COOLDOWN))
+        await asyncio.sleep(0)
+        # Enough reschedules to compact the heap, all but the last one due soon
+        for i in range(200):
+            scheduler.schedule('SHIP-1', start + timedelta(milliseconds=i % 20), WakeReason.IDLE)
+        scheduler.schedule('SHIP-1', start + timedelta(seconds=0.2), WakeReason.IDLE)
+
+        await asyncio.sleep(0.05)
+        assert not task.done()
+        assert len(scheduler) == 1
+        woken = await task
+        return woken, (datetime.now(tz=UTC) - start).total_seconds()
+
+    woken, elapsed = asyncio.run(run())
+    assert woken
+    assert elapsed >= 0.2
+
+
+def test_wake_wakes_now_with_the_pending_reason() -> None:
+    async def run() -> tuple[bool, WakeScheduler]:
+        scheduler = WakeScheduler()
+        task = asyncio.create_task(scheduler.sleep('SHIP-1', 60, WakeReason.COOLDOWN))
+        await asyncio.sleep(0)
+        scheduler.wake('SHIP-1')
+        scheduler.wake('SHIP-2')
+        return await asyncio.wait_for(task, timeout=1), scheduler
+
+    woken, scheduler = asyncio.run(run())
+    assert woken
+    assert len(scheduler) == 0
+    assert scheduler.wake_lateness[WakeReason.COOLDOWN].count == 1
+    assert scheduler.wake_lateness[WakeReason.IDLE].count == 0
+
+
+def test_wake_and_action_lateness_are_observed() -> None:
+    server = MockSpaceTradersServer(MockUniverse.generate(ships=1))
+    ship = ShipShape.model_validate(next(iter(server.universe.ships.values())))
+    controller = ShipController(ship, server.token())
+
+    async def run() -> None:
+        try:
+            due = datetime.now(tz=UTC) + timedelta(seconds=0.01)
+            assert await controller.wait_until(due, WakeReason.ARRIVAL)
+            await controller.refresh()
+            await controller.refresh()
+        finally:
+            await AsyncSpaceTradersAPIClient.aclose()
+
+    with server.install():
+        asyncio.run(run())
+
+    # Only the first action after the wake-up counts
+    scheduler = controller.scheduler
+    for stats in (scheduler.wake_lateness, scheduler.action_lateness):
+        assert [reason for reason in WakeReason if stats[reason].count] == [WakeReason.ARRIVAL]
+        assert stats[WakeReason.ARRIVAL].count == 1
+    woken = scheduler.wake_lateness[WakeReason.ARRIVAL]
+    acted = scheduler.action_lateness[WakeReason.ARRIVAL]
+    assert 0 <= woken.max <= acted.max < 5
+
+
+def test_contract_haulers_wake_at_the_deadline() -> None:
+    universe = MockUniverse.generate(ships=1)
+    data = next(iter(universe.ships.values()))
+    # No market is known in this system, so the hauler waits
+    data['nav']['systemSymbol'] = 'X9-NOWHERE'
+    contract = ContractShape.model_validate(next(iter(universe.contracts.values())))
+    contract.terms.deadline = datetime.now(tz=UTC) + timedelta(seconds=0.05)
+    token = MockSpaceTradersServer(universe).token()
+    controller = ShipController(ShipShape.model_validate(data), token)
+    behavior = ContractHaulingBehavior(contract)
+
+    async def run() -> tuple[bool, bool]:
+        return await behavior.step(controller), await behavior.step(controller)
+
+    assert asyncio.run(run()) == (True, False)
+    assert controller.scheduler.wake_lateness[WakeReason.DEADLINE].count == 1
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import UTC, datetime
+
+from deltav.planning.trade import TradePlanner, TradeShip
+from deltav.spacetraders import Coordinate
+from deltav.spacetraders.enums.market import MarketTradeGoodType, SupplyLevel
+from deltav.spacetraders.market import MarketListing
+
+WAYPOINTS = {'X1-A1-A1': Coordinate(0, 0), 'X1-A1-A2': Coordinate(10, 0)}
+
+
+def listing(waypoint_symbol: str, purchase_price: int, sell_price: int) -> MarketListing:
+    return MarketListing(
+        waypoint_symbol=waypoint_symbol,
+        trade_symbol='IRON_ORE',
+        type=MarketTradeGoodType.EXCHANGE,
+        supply=SupplyLevel.MODERATE,
+        activity=None,
+        trade_volume=10,
+        purchase_price=purchase_price,
+        sell_price=sell_price,
+        observed_at=datetime.now(tz=UTC),
+    )
+
+
+def test_zero_priced_listings_are_skipped() -> None:
+    planner = TradePlanner(WAYPOINTS, fuel_price=0)
+    planner.update([listing('X1-A1-A1', 0, 0), listing('X1-A1-A2', 50, 40)])
+    ship = TradeShip('S-1', 'X1-A1-A1', speed=30, fuel=0, fuel_capacity=0, cargo_space=10)
+
+    assert planner.routes(replace(ship, credit_limit=1000)) == []
+    assert planner.routes(ship) == []
+
+
+def test_routes_are_ranked_and_limited_by_credits() -> None:
+    planner = TradePlanner({**WAYPOINTS, 'X1-A1-A3': Coordinate(20, 0)}, fuel_price=0)
+    planner.update(
+        [listing('X1-A1-A1', 50, 40), listing('X1-A1-A2', 90, 80), listing('X1-A1-A3', 90, 70)]
+    )
+    ship = TradeShip('S-1', 'X1-A1-A1', speed=30, fuel=0, fuel_capacity=0, cargo_space=10)
+
+    routes = planner.routes(ship)
+    assert [route.sell_waypoint_symbol for route in routes] == ['X1-A1-A2', 'X1-A1-A3']
+    assert routes[0].profit_per_second > routes[1].profit_per_second
+    assert [route.units for route in routes] == [10, 10]
+
+    assert [route.units for route in planner.routes(replace(ship, credit_limit=120))] == [2, 2]
+    assert planner.routes(replace(ship, credit_limit=40)) == []
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy import select
+
+from deltav.spacetraders import waypoint as waypoint_module
+from deltav.spacetraders.mock.server import MockSpaceTradersServer
+from deltav.spacetraders.mock.universe import MockUniverse
+from deltav.spacetraders.models.waypoint import WaypointShape
+from deltav.spacetraders.waypoint import Waypoint
+from deltav.store.db.universe import traits, waypoints
+from deltav.store.db.writer import WriteBehindQueue
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+
+def test_fetched_waypoints_are_stored(engine: Engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    writer = WriteBehindQueue(engine)
+    monkeypatch.setattr(waypoint_module, 'writer', writer)
+    server = MockSpaceTradersServer(MockUniverse.generate())
+    symbol, data = next(iter(server.universe.waypoints.items()))
+    data['traits'] = [{'symbol': 'MARKETPLACE', 'name': 'Marketplace', 'description': ''}]
+
+    with server.install():
+        res = Waypoint(data=WaypointShape.model_validate(data))._fetch_waypoint()
+    assert isinstance(res, WaypointShape)
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    with engine.connect() as conn:
+        row = conn.execute(
+            select(waypoints.c.id, waypoints.c.type).where(waypoints.c.symbol == symbol)
+        ).one()
+        stored_traits = conn.execute(select(traits).where(traits.c.waypoint_id == row.id)).all()
+    assert row.type == data['type']
+    assert len(stored_traits) == 1
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from functools import partial
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Column, MetaData, String, Table, create_engine, select
+
+from deltav.spacetraders.enums.market import TradeSymbol, TransactionType
+from deltav.spacetraders.models.market import MarketTransactionShape
+from deltav.store.db.market import record_transactions, transactions
+from deltav.store.db.writer import WriteBehindQueue
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from sqlalchemy import Engine
+
+metadata = MetaData()
+ships = Table(
+    'ships',
+    metadata,
+    Column('symbol', String, primary_key=True),
+    Column('status', String),
+    Column('waypoint', String),
+)
+
+
+def test_writes_are_committed_in_submission_order(tmp_path: Path) -> None:
+    engine = create_engine(f'sqlite:///{tmp_path / "test.db"}')
+    metadata.create_all(engine)
+    writer = WriteBehindQueue(engine, flush_interval=60)
+
+    writer.upsert(ships, [{'symbol': 'S-1', 'status': 'DOCKED'}], key=['symbol'])
+    writer.upsert(
+        ships, [{'symbol': 'S-1', 'status': 'IN_ORBIT', 'waypoint': 'X1-A'}], key=['symbol']
+    )
+    writer.upsert(ships, [{'symbol': 'S-1', 'status': 'IN_TRANSIT'}], key=['symbol'])
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    with engine.connect() as conn:
+        row = conn.execute(select(ships.c.status, ships.c.waypoint)).one()
+    assert tuple(row) == ('IN_TRANSIT', 'X1-A')
+
+
+def test_transactions_are_recorded(engine: Engine) -> None:
+    writer = WriteBehindQueue(engine)
+
+    transaction = MarketTransactionShape.model_validate(
+        {
+            'waypointSymbol': 'X1-A1',
+            'shipSymbol': 'S-1',
+            'tradeSymbol': TradeSymbol.IRON_ORE.value,
+            'type': TransactionType.SELL.value,
+            'units': 10,
+            'pricePerUnit': 12,
+            'totalPrice': 120,
+            'timestamp': datetime.now(tz=UTC).isoformat(),
+        }
+    )
+    writer.call(partial(record_transactions, shapes=[transaction]))
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    with engine.connect() as conn:
+        row = conn.execute(select(transactions.c.units, transactions.c.total_price)).one()
+    assert tuple(row) == (10, 120)